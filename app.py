@@ -32,6 +32,7 @@ if prompt := st.chat_input("Ex: Quais os precedentes da súmula 70 vigente?"):
         details_expander = st.expander("🔎 **Detalhes da Busca (Self-Query)**")
         query_placeholder = details_expander.empty()
         filter_placeholder = details_expander.empty()
+        validation_placeholder = details_expander.empty()
         answer_placeholder = st.empty()
 
         full_answer = ""
@@ -46,11 +47,22 @@ if prompt := st.chat_input("Ex: Quais os precedentes da súmula 70 vigente?"):
                     f"**Filtro de Metadados:** `{data['filter']}`"
                 )
 
+            elif event["type"] == "validation":
+                data = event["data"]
+                validation_placeholder.markdown(
+                    f"**Validação:** {len(data['attempts'])} tentativa(s) em "
+                    f"{data['elapsed_ms'] / 1000:.1f}s"
+                )
+
             elif event["type"] == "token":
                 token = event["data"]
                 full_answer += token
                 answer_placeholder.markdown(full_answer + "▌")  # O ▌ simula um cursor
 
+            elif event["type"] == "truncated":
+                full_answer += "\n\n*(Resposta limitada a "
+                full_answer += f"{event['data']['max_length']} caracteres.)*"
+
             elif event["type"] == "sources":
                 answer_placeholder.markdown(full_answer)  # Resposta final sem o cursor
                 sources = event["data"]
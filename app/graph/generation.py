@@ -0,0 +1,89 @@
+"""
+Geração com tamanho limitado, alinhada ao ResponseLength do Guardrails.
+
+O ResponseLength corta respostas acima de `max_length` caracteres depois que
+o LLM já gerou (e cobrou) o texto inteiro. Aqui o limite é aplicado na
+geração: o `max_tokens` do LLM é derivado do limite de caracteres e o stream
+é interrompido na última fronteira de frase assim que o limite é atingido.
+Se o `max_tokens` cortar antes (`finish_reason == "length"`), a frase
+incompleta do final também é removida.
+"""
+
+from typing import Any, Iterable, Tuple
+import math
+import re
+
+# Caracteres por token em português (estimativa conservadora: o limite de
+# caracteres deve ser atingido antes do limite de tokens). Texto jurídico com
+# números, datas e citações ("Processo nº 12.345, sessão de 17/12/87") fica
+# abaixo de 3 caracteres por token
+CHARS_PER_TOKEN = 2.5
+
+# Pontuação que encerra uma frase
+_SENTENCE_END = ".!?:"
+
+# Fim de frase (pontuação seguida de espaço) ou quebra de linha
+_SENTENCE_BOUNDARY_REGEX = re.compile(r"[.!?:](?=\s)|\n")
+
+
+def max_tokens_for_length(max_length: int, chars_per_token: float = CHARS_PER_TOKEN) -> int:
+    """Limite de tokens de saída correspondente a `max_length` caracteres."""
+    return math.ceil(max_length / chars_per_token)
+
+
+def truncate_at_sentence(text: str, max_length: int) -> str:
+    """
+    Corta o texto em até `max_length` caracteres, na última fronteira de frase.
+
+    Sem fronteira de frase na segunda metade do limite, corta no último espaço.
+    """
+    if len(text) <= max_length:
+        return text
+
+    window = text[: max_length + 1]
+    boundaries = [m.end() for m in _SENTENCE_BOUNDARY_REGEX.finditer(window) if m.end() <= max_length]
+    if boundaries and boundaries[-1] >= max_length // 2:
+        return text[: boundaries[-1]].rstrip()
+
+    space = window.rfind(" ", 0, max_length)
+    return text[: space if space > 0 else max_length].rstrip()
+
+
+def drop_incomplete_sentence(text: str) -> str:
+    """Remove a frase incompleta do final (geração cortada pelo `max_tokens`)."""
+    text = text.rstrip()
+    if not text or text[-1] in _SENTENCE_END:
+        return text
+    return truncate_at_sentence(text, len(text) - 1)
+
+
+def stream_bounded(chunks: Iterable[Any], max_length: int) -> Tuple[str, bool]:
+    """
+    Consome o stream do LLM até `max_length` caracteres.
+
+    Ao passar do limite, fecha o stream (encerrando a requisição ao LLM) e
+    corta a resposta na última fronteira de frase. Aceita texto ou mensagens
+    (`AIMessageChunk`); com mensagens, um `finish_reason == "length"` (o
+    `max_tokens` cortou antes do limite de caracteres) também conta como
+    truncado.
+
+    Returns:
+        (texto, truncado)
+    """
+    text = ""
+    finish_reason = None
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            text += chunk if isinstance(chunk, str) else chunk.content
+            metadata = getattr(chunk, "response_metadata", None) or {}
+            finish_reason = metadata.get("finish_reason") or finish_reason
+            if len(text) > max_length:
+                return truncate_at_sentence(text, max_length), True
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    if finish_reason == "length":
+        return drop_incomplete_sentence(text), True
+    return text, False
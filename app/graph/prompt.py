@@ -24,3 +24,11 @@ Estruture sua resposta da seguinte maneira:
 - Fundamente TODA a sua resposta *exclusivamente* no contexto fornecido.
 - Não adicione opiniões, interpretações, exemplos ou informações externas de qualquer natureza. Apenas transcreva o que está no contexto.
 """
+
+REASK_PROMPT_JURIDICO = """
+Sua resposta anterior foi reprovada na validação pelos seguintes motivos:
+
+{issues}
+
+Reescreva a resposta corrigindo esses problemas. Cite apenas súmulas presentes no contexto, transcreva os trechos *exatamente* como aparecem no contexto e não inclua afirmações que não estejam nele.
+"""
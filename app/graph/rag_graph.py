@@ -1,9 +1,9 @@
+from functools import lru_cache
 from typing import Annotated, List, Dict, Any, Generator, TypedDict
 import re
 
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langchain_core.structured_query import StructuredQuery
@@ -11,8 +11,15 @@ from langfuse.langchain import CallbackHandler
 from langchain_core.runnables import RunnableConfig
 
 from app.ingest.embed_qdrant import EmbeddingSelfQuery
-from app.retrieval.retriever import build_self_query_retriever, SelfQueryConfig
-from app.graph.prompt import SYSTEM_PROMPT_JURIDICO
+from app.retrieval.retriever import (
+    build_self_query_retriever,
+    fetch_chunk_vectors,
+    SelfQueryConfig,
+)
+from app.graph.prompt import REASK_PROMPT_JURIDICO, SYSTEM_PROMPT_JURIDICO
+from app.graph.generation import max_tokens_for_length, stream_bounded
+from app.graph.reask import ReaskPolicy, run_reask_loop
+from app.utils.settings import settings
 
 langfuse_handler = CallbackHandler()
 
@@ -24,6 +31,7 @@ class RAGState(TypedDict):
     answer: Generator[str, None, None]
     generated_query: str
     generated_filter: str
+    validation: Dict[str, Any]
     messages: Annotated[list, add_messages]
 
 
@@ -57,11 +65,27 @@ def _format_docs(docs: List[Document]) -> str:
     return "\n\n---\n\n".join(parts)
 
 
+@lru_cache(maxsize=1)
+def _semantic_validation_pipeline():
+    """Pipeline de validação com base semântica (SEMANTIC_GROUNDING), construído uma vez."""
+    from app.guardrails.guards import ValidationPipeline
+
+    return ValidationPipeline(embeddings=EmbeddingSelfQuery().model)
+
+
+@lru_cache(maxsize=1)
+def _validation_cache():
+    """Cache de validações compartilhado (respostas repetidas não são revalidadas)."""
+    from app.guardrails.guards import ValidationCache
+
+    return ValidationCache(max_size=256)
+
+
 # --- Nós do Grafo ---
 def retrieve(
     state: RAGState,
     config: RunnableConfig,
-    collection_name: str = "sumulas_tcemg",
+    collection_name: str = settings.QDRANT_COLLECTION,
     k: int = 5,
 ) -> Dict[str, Any]:
     """Nó que executa o SelfQueryRetriever e extrai os detalhes da consulta gerada."""
@@ -79,8 +103,8 @@ def retrieve(
         print(f"⚠️ Erro no self-query: {e}")
         print("Executando busca simples sem filtros...")
         embedder = EmbeddingSelfQuery()
-        vectorstore = embedder.get_qdrant_vector_store(collection_name)
-        docs = vectorstore.similarity_search(state["question"], k=k)
+        vectorstore = embedder.get_qdrant_vector_store(collection_name, text_store=cfg.text_store())
+        docs = vectorstore.similarity_search(state["question"], **cfg.search_kwargs())
         structured_query = StructuredQuery(query=state["question"], filter=None)
 
     print(f"Busca finalizada. Encontrados {len(docs)} documentos.")
@@ -94,56 +118,122 @@ def retrieve(
 def generate_stream(state: RAGState, config: RunnableConfig) -> Dict[str, Any]:
     """Nó que gera a resposta final em formato de stream com validação Guardrails."""
     print("Executando o nó de geração...")
-    from app.guardrails.guards import validate_output
-
-    QA_PROMPT = ChatPromptTemplate.from_messages(
-        [
-            ("system", SYSTEM_PROMPT_JURIDICO),
-            (
-                "human",
-                "Pergunta: {question}\n\nContexto (trechos):\n{context}\n\nResponda de forma direta. Ao final, liste fontes no formato: (Status da Súmula: metadata.status_atual, Número da Súmula: metadata.num_sumula, Data da Publicação:  metadata.data_status).",
-            ),
-        ]
+    from app.guardrails.guards import get_validation_pipeline
+    from app.guardrails.registry import get_sumula_registry
+
+    QA_MESSAGES = [
+        ("system", SYSTEM_PROMPT_JURIDICO),
+        (
+            "human",
+            "Pergunta: {question}\n\nContexto (trechos):\n{context}\n\nResponda de forma direta. Ao final, liste fontes no formato: (Status da Súmula: metadata.status_atual, Número da Súmula: metadata.num_sumula, Data da Publicação:  metadata.data_status).",
+        ),
+    ]
+    QA_PROMPT = ChatPromptTemplate.from_messages(QA_MESSAGES)
+    # Regeneração: mesma conversa + resposta reprovada + problemas encontrados
+    REASK_PROMPT = ChatPromptTemplate.from_messages(
+        QA_MESSAGES + [("ai", "{previous_answer}"), ("human", REASK_PROMPT_JURIDICO)]
     )
 
     embedder = EmbeddingSelfQuery()
-    llm = embedder.llm
-    context = _format_docs(state.get("docs", []))
-    chain = QA_PROMPT | llm | StrOutputParser()
+    docs = state.get("docs", [])
+    context = _format_docs(docs)
+
+    pipeline = get_validation_pipeline()
+    # Limite de saída derivado do max_length do ResponseLength
+    max_length = pipeline.config["max_length"]
+    llm = embedder.llm.bind(max_tokens=max_tokens_for_length(max_length))
+    # Mensagens (e não texto) no stream: o finish_reason indica corte pelo max_tokens
+    chain = QA_PROMPT | llm
+    reask_chain = REASK_PROMPT | llm
+
+    # Registro de súmulas (existência/revogação), recarregado após re-ingestões
+    sumula_registry = None
+    try:
+        sumula_registry = get_sumula_registry(embedder.client, settings.QDRANT_COLLECTION)
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar o registro de súmulas: {e}")
+
+    chunk_vectors = None
+    if settings.SEMANTIC_GROUNDING and docs:
+        # Reutiliza os vetores armazenados dos chunks (sem re-embedding do contexto)
+        pipeline = _semantic_validation_pipeline()
+        try:
+            chunk_vectors = fetch_chunk_vectors(embedder.client, docs)
+        except Exception as e:
+            print(f"⚠️ Erro ao buscar vetores dos chunks: {e}")
+
+    truncated_attempts = []
+
+    def generate(previous_answer, issues):
+        """Gera a resposta completa (ou a regenera com os problemas apontados)."""
+        inputs = {"question": state["question"], "context": context}
+        stream_chain = chain
+        if previous_answer is not None:
+            print(f"🔁 Regenerando resposta (reask): {issues}")
+            inputs.update(
+                previous_answer=previous_answer,
+                issues="\n".join(f"- {issue}" for issue in issues),
+            )
+            stream_chain = reask_chain
+
+        # Para de gerar (e de pagar) ao atingir o limite, na última frase completa
+        answer, truncated = stream_bounded(stream_chain.stream(inputs, config=config), max_length)
+        truncated_attempts.append(truncated)
+        if truncated:
+            print(f"✂️  Geração interrompida em {len(answer)} caracteres (limite: {max_length})")
+        return answer
+
+    def validate(answer):
+        """Valida a resposta completa com detecção de alucinações."""
+        result = pipeline.validate(
+            answer,
+            context_docs=docs,
+            enable_hallucination_detection=True,
+            chunk_vectors=chunk_vectors,
+            cache=_validation_cache(),
+            sumula_registry=sumula_registry,
+        )
+        print(f"⏱️  Tempo dos validators (ms): {result['timings_ms']}")
+        return result
 
-    # Acumular resposta completa para validação
     print("🛡️  Guardrails ativado - validando resposta...")
-    full_answer = ""
-    for chunk in chain.stream(
-        {"question": state["question"], "context": context},
-        config=config,
-    ):
-        full_answer += chunk
-
-    # Validar resposta completa com detecção de alucinações
-    docs = state.get("docs", [])
-    validation_result = validate_output(
-        full_answer,
-        context_docs=docs,
-        enable_hallucination_detection=True
+    policy = ReaskPolicy(
+        max_attempts=settings.REASK_MAX_ATTEMPTS,
+        deadline_seconds=settings.REASK_DEADLINE_SECONDS,
     )
-    validated_answer = validation_result["cleaned_text"]
+    outcome = run_reask_loop(generate, validate, policy)
+    validation_result = outcome["validation"]
+    validated_answer = outcome["answer"]
 
     if not validation_result["is_valid"]:
         print(f"⚠️  Resposta ajustada pelo Guardrails: {validation_result['validation_info']}")
     else:
         print("✅ Resposta aprovada pelo Guardrails")
+    print(
+        f"🔁 Tentativas: {len(outcome['attempts'])} | "
+        f"Tempo: {outcome['elapsed_ms']} ms | Fim: {outcome['stop_reason']}"
+    )
 
     # Retornar como generator para manter compatibilidade
     def answer_generator():
         for char in validated_answer:
             yield char
 
-    return {"answer": answer_generator()}
+    return {
+        "answer": answer_generator(),
+        "validation": {
+            "is_valid": validation_result["is_valid"],
+            "attempts": outcome["attempts"],
+            "elapsed_ms": outcome["elapsed_ms"],
+            "stop_reason": outcome["stop_reason"],
+            "truncated": truncated_attempts[outcome["best_attempt"] - 1],
+            "max_length": max_length,
+        },
+    }
 
 
 # --- Construção do Grafo ---
-def build_streaming_graph(collection_name: str = "sumulas_tcemg", k: int = 5):
+def build_streaming_graph(collection_name: str = settings.QDRANT_COLLECTION, k: int = 5):
     """Compila o grafo LangGraph com os nós para streaming."""
     graph = StateGraph(RAGState)
     graph.add_node(
@@ -189,7 +279,7 @@ def run_streaming_rag(question: str) -> Generator[Dict[str, Any], None, None]:
         callbacks=[langfuse_handler],
         run_name="Chat",
         tags=["rag-tcemg", "sumulas"],
-        metadata={"collection": "sumulas_tcemg", "k": 5},
+        metadata={"collection": settings.QDRANT_COLLECTION, "k": 5},
     )
 
     initial_state: RAGState = {"question": question, "messages": []}
@@ -208,11 +298,19 @@ def run_streaming_rag(question: str) -> Generator[Dict[str, Any], None, None]:
             }
 
         if "generate" in event:
+            # Tentativas de geração (reask) e tempo gasto na validação
+            yield {"type": "validation", "data": event["generate"]["validation"]}
+
             answer_stream = event["generate"]["answer"]
             # Itera sobre o gerador de tokens da resposta
             for token in answer_stream:
                 yield {"type": "token", "data": token}
 
+            # Marca o fim antecipado da resposta (limite de tamanho atingido)
+            validation = event["generate"]["validation"]
+            if validation["truncated"]:
+                yield {"type": "truncated", "data": {"max_length": validation["max_length"]}}
+
         if END in event:
             final_state = event[END]
 
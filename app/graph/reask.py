@@ -0,0 +1,105 @@
+"""
+Regeneração corretiva ("reask") com orçamento de latência.
+
+Os validators com `on_fail="reask"` (alucinação, súmulas citadas fora do
+contexto, base semântica) não têm correção automática, e a correção das
+citações literais inventadas (trocadas por um aviso) é só paliativa: quando
+falham, a resposta é gerada de novo com os problemas específicos no prompt. O laço é
+limitado por número de tentativas e por um prazo por requisição, e retorna a
+melhor candidata (a primeira aprovada ou, se nenhuma passar, a com menos
+problemas).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import time
+
+from app.guardrails.guards import describe_reask_issues
+
+
+@dataclass
+class ReaskPolicy:
+    max_attempts: int = 2  # total de gerações, incluindo a primeira
+    deadline_seconds: float = 30.0  # prazo por requisição
+
+
+def _candidate_rank(validation: Dict[str, Any]) -> tuple:
+    """Ordenação das candidatas: aprovada, sem pedido de reask, menos problemas."""
+    return (
+        not validation["is_valid"],
+        validation["needs_reask"],
+        sum(1 for info in validation["validation_info"] if info["needs_reask"]),
+        len(validation["validation_info"]),
+    )
+
+
+def run_reask_loop(
+    generate: Callable[[Optional[str], List[str]], str],
+    validate: Callable[[str], Dict[str, Any]],
+    policy: Optional[ReaskPolicy] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> Dict[str, Any]:
+    """
+    Gera, valida e regenera a resposta até passar ou esgotar o orçamento.
+
+    Args:
+        generate: Função (resposta_anterior, problemas) -> nova resposta;
+            na primeira tentativa recebe (None, [])
+        validate: Função resposta -> resultado do `ValidationPipeline.validate`
+        policy: Máximo de tentativas e prazo
+        clock: Relógio (injetável nos testes)
+
+    Returns:
+        Dict com 'answer' (texto limpo da melhor candidata), 'validation'
+        (resultado da melhor candidata), 'best_attempt' (número da tentativa
+        escolhida), 'attempts' (histórico por tentativa), 'elapsed_ms' e
+        'stop_reason'
+    """
+    policy = policy or ReaskPolicy()
+    start = clock()
+    deadline = start + policy.deadline_seconds
+
+    attempts = []
+    best, best_attempt = None, 0
+    previous_answer, issues = None, []
+    stop_reason = "max_attempts"
+
+    for attempt in range(1, policy.max_attempts + 1):
+        attempt_start = clock()
+        answer = generate(previous_answer, issues)
+        validation = validate(answer)
+        attempt_end = clock()
+
+        issues = describe_reask_issues(validation["validation_info"])
+        attempts.append({
+            "attempt": attempt,
+            "is_valid": validation["is_valid"],
+            "needs_reask": validation["needs_reask"],
+            "issues": issues,
+            "elapsed_ms": round((attempt_end - attempt_start) * 1000, 1),
+        })
+
+        if best is None or _candidate_rank(validation) < _candidate_rank(best):
+            best, best_attempt = validation, attempt
+
+        if not validation["needs_reask"]:
+            stop_reason = "passed"
+            break
+        if attempt == policy.max_attempts:
+            break
+
+        # Só tenta de novo se uma geração tão demorada quanto a última cabe no prazo
+        if attempt_end + (attempt_end - attempt_start) > deadline:
+            stop_reason = "deadline"
+            break
+
+        previous_answer = answer
+
+    return {
+        "answer": best["cleaned_text"],
+        "validation": best,
+        "best_attempt": best_attempt,
+        "attempts": attempts,
+        "elapsed_ms": round((clock() - start) * 1000, 1),
+        "stop_reason": stop_reason,
+    }
@@ -0,0 +1,264 @@
+"""
+Validação em lote para avaliação offline dos Guardrails.
+
+Pontua muitos pares (resposta, contexto) — ex.: respostas registradas em
+produção — para calibrar limites como `HallucinationDetection(threshold=0.7)`:
+
+- Itens com o mesmo contexto (mesmos textos e súmulas) compartilham o
+  pré-processamento (`build_context_metadata`: súmulas, índice de radicais,
+  índice de citações)
+- Opcionalmente distribui os grupos de contexto entre processos
+- Saída colunar (scores e problemas por validator) em Parquet (com pyarrow;
+  sem ele, CSV ao lado) ou CSV
+
+Como executar:
+    uv run python -m app.guardrails.batch respostas.jsonl --output resultados.parquet --processes 4
+
+Cada linha do JSONL: {"id": ..., "answer": "...", "context": [{"page_content": "...", "metadata": {...}}]}
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import hashlib
+import json
+import time
+
+from langchain_core.documents import Document
+
+from app.guardrails.guards import ValidationPipeline, build_context_metadata
+
+# Grupo de itens com o mesmo contexto: (documentos, [(posição, id, resposta)])
+ContextGroup = Tuple[List[Document], List[Tuple[int, Any, str]]]
+
+# Colunas extraídas do metadata dos validators (além de passed/issues por validator);
+# listas viram texto separado por vírgula, exceto as contadas em COUNT_COLUMNS
+SCORE_COLUMNS = {
+    "hallucination_score": ("HallucinationDetection", "hallucination_score"),
+    "grounding_ratio": ("HallucinationDetection", "grounding_ratio"),
+    "assertive_count": ("HallucinationDetection", "assertive_count"),
+    "uncertainty_count": ("HallucinationDetection", "uncertainty_count"),
+    "cited_sumulas": ("HallucinationDetection", "cited_sumulas"),
+    "not_retrieved_sumulas": ("ValidSumulaReference", "not_retrieved_sumulas"),
+    "quotes_checked": ("VerbatimQuoteCheck", "quotes_checked"),
+    "fabricated_quotes": ("VerbatimQuoteCheck", "fabricated_quotes"),
+}
+COUNT_COLUMNS = {"fabricated_quotes"}
+
+
+def _as_document(doc: Any) -> Document:
+    """Aceita Document ou dict {"page_content", "metadata"} (respostas registradas em JSON)."""
+    if isinstance(doc, Document):
+        return doc
+    return Document(page_content=doc.get("page_content", ""), metadata=doc.get("metadata") or {})
+
+
+def context_key(docs: List[Document]) -> str:
+    """
+    Hash do que a validação usa de cada documento (texto e número da súmula).
+
+    Os ids dos pontos não entram: respostas registradas em momentos diferentes
+    podem ter os mesmos ids com outro texto (re-ingestão) e devem ser
+    validadas cada uma contra o próprio contexto.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for doc in docs:
+        num_sumula = (doc.metadata or {}).get("num_sumula")
+        digest.update(json.dumps([doc.page_content, num_sumula], ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _group_by_context(items: Iterable[Dict[str, Any]]) -> List[ContextGroup]:
+    """Agrupa os itens pelo conteúdo do contexto, mantendo a posição original."""
+    groups: Dict[str, ContextGroup] = {}
+    for position, item in enumerate(items):
+        docs = [_as_document(doc) for doc in item.get("context_docs") or item.get("context") or []]
+        key = context_key(docs)
+        if key not in groups:
+            groups[key] = (docs, [])
+        groups[key][1].append((position, item.get("id", position), item["answer"]))
+    return list(groups.values())
+
+
+def _column_value(column: str, value: Any) -> Any:
+    """Converte listas em texto ou contagem para caber em uma coluna."""
+    if isinstance(value, list):
+        if column in COUNT_COLUMNS:
+            return len(value)
+        return ", ".join(str(v) for v in value)
+    return value
+
+
+def _result_row(item_id: Any, context_id: str, answer: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Linha da saída colunar a partir do resultado do ValidationPipeline."""
+    validator_metadata = result["validator_metadata"]
+    row = {
+        "item_id": item_id,
+        "context_id": context_id,
+        "answer_length": len(answer),
+        "is_valid": result["is_valid"],
+        "needs_reask": result["needs_reask"],
+        "validation_ms": round(sum(result["timings_ms"].values()), 3),
+    }
+    for name, info in validator_metadata.items():
+        row[f"{name}_passed"] = info["outcome"] == "pass"
+        row[f"{name}_issues"] = info["error"] or ""
+    for column, (validator, key) in SCORE_COLUMNS.items():
+        value = validator_metadata.get(validator, {}).get("metadata", {}).get(key)
+        row[column] = _column_value(column, value)
+    return row
+
+
+def _validate_group(
+    group: ContextGroup, pipeline_config: Dict[str, Any]
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Valida todas as respostas de um contexto com um único pré-processamento."""
+    docs, entries = group
+    pipeline = _worker_pipeline(pipeline_config)
+    context_metadata = build_context_metadata(docs) if docs else None
+    context_id = context_key(docs)
+
+    rows = []
+    for position, item_id, answer in entries:
+        result = pipeline.validate(
+            answer,
+            context_docs=docs,
+            context_metadata=context_metadata,
+            include_metadata=True,
+        )
+        rows.append((position, _result_row(item_id, context_id, answer, result)))
+    return rows
+
+
+_PIPELINES: Dict[str, ValidationPipeline] = {}
+
+
+def _worker_pipeline(pipeline_config: Dict[str, Any]) -> ValidationPipeline:
+    """Pipeline por processo (os validators não são enviados entre processos)."""
+    key = json.dumps(pipeline_config, sort_keys=True)
+    if key not in _PIPELINES:
+        _PIPELINES[key] = ValidationPipeline(**pipeline_config)
+    return _PIPELINES[key]
+
+
+def validate_output_batch(
+    items: Iterable[Dict[str, Any]],
+    processes: int = 1,
+    output_path: Optional[str] = None,
+    **pipeline_config: Any,
+) -> Dict[str, List[Any]]:
+    """
+    Valida muitos pares (resposta, contexto) e retorna o resultado em colunas.
+
+    Args:
+        items: Dicts com 'answer', 'context_docs' (ou 'context', lista de dicts
+            {"page_content", "metadata"}) e, opcionalmente, 'id'
+        processes: Número de processos (1 = no processo atual)
+        output_path: Se informado, grava as colunas em .parquet ou .csv (ver `write_columns`)
+        **pipeline_config: Parâmetros do ValidationPipeline (ex.: hallucination_threshold=0.6)
+
+    Returns:
+        Dict coluna -> lista de valores, na ordem dos itens
+
+    Example:
+        >>> columns = validate_output_batch(itens, processes=4, output_path="resultados.parquet")
+        >>> columns["hallucination_score"][:3]
+        [0.0, 0.5, 0.8]
+    """
+    if "embeddings" in pipeline_config:
+        raise ValueError("A validação em lote não suporta SemanticGrounding (embeddings)")
+
+    groups = _group_by_context(items)
+
+    if processes > 1 and len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(
+                _validate_group,
+                groups,
+                [pipeline_config] * len(groups),
+                chunksize=max(1, len(groups) // (processes * 4)),
+            )
+            rows = [row for group_rows in results for row in group_rows]
+    else:
+        rows = [row for group in groups for row in _validate_group(group, pipeline_config)]
+
+    rows.sort(key=lambda row: row[0])
+    columns: Dict[str, List[Any]] = {}
+    for _, row in rows:
+        for name in row:
+            columns.setdefault(name, [None] * len(rows))
+    for index, (_, row) in enumerate(rows):
+        for name, value in row.items():
+            columns[name][index] = value
+
+    if output_path:
+        write_columns(columns, output_path)
+    return columns
+
+
+def write_columns(columns: Dict[str, List[Any]], output_path: str) -> str:
+    """
+    Grava as colunas em Parquet ou CSV, pela extensão do arquivo.
+
+    Parquet requer o pyarrow (opcional); sem ele, grava um CSV com o mesmo
+    nome (`resultados.parquet` → `resultados.csv`).
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    path = Path(output_path)
+    if path.suffix not in (".parquet", ".csv"):
+        raise ValueError(f"Formato de saída não suportado: {path.suffix} (use .parquet ou .csv)")
+
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            path = path.with_suffix(".csv")
+            print(f"⚠️ pyarrow não instalado: gravando CSV em '{path}'")
+        else:
+            pq.write_table(pa.table(columns), path)
+            return str(path)
+
+    names = list(columns)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(columns[name] for name in names)))
+    return str(path)
+
+
+def load_items(path: str) -> List[Dict[str, Any]]:
+    """Lê os itens de um arquivo JSONL."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validação em lote dos Guardrails")
+    parser.add_argument("entrada", help="Arquivo JSONL com id, answer e context")
+    parser.add_argument("--output", required=True, help="Arquivo de saída (.parquet ou .csv)")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--hallucination-threshold", type=float, default=0.7)
+    parser.add_argument("--max-length", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = load_items(args.entrada)
+    start = time.perf_counter()
+    columns = validate_output_batch(
+        items,
+        processes=args.processes,
+        hallucination_threshold=args.hallucination_threshold,
+        max_length=args.max_length,
+    )
+    elapsed = time.perf_counter() - start
+    output = write_columns(columns, args.output)
+
+    valid = sum(1 for v in columns.get("is_valid", []) if v)
+    print(f"✅ {len(items)} respostas validadas em {elapsed:.1f}s ({len(items) / elapsed:.0f}/s)")
+    print(f"   Aprovadas: {valid} | Reprovadas: {len(items) - valid}")
+    print(f"   Resultado gravado em '{output}'")
@@ -7,12 +7,179 @@ Fase 2: Validators avançados (alucinações, súmulas citadas, tom jurídico)
 
 from guardrails import Guard
 from guardrails.validator_base import (
+    FailResult,
+    PassResult,
     Validator,
     register_validator,
     ValidationResult,
 )
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import copy
+import hashlib
+import json
 import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from app.ingest.payload import canonical_sumula_number
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char: str) -> str:
+    """Minúscula sem acento, preservando o tamanho (1 caractere -> 1 caractere)."""
+    return unicodedata.normalize("NFD", char.lower())[:1] or char
+
+
+def fold_text(text: str) -> str:
+    """Normaliza o texto (minúsculas, sem acentos) mantendo os mesmos offsets."""
+    return "".join(map(_fold_char, text))
+
+
+# Letra base -> variantes minúsculas acentuadas (Latin-1 e Latin Extended-A/B)
+_ACCENT_VARIANTS: Dict[str, str] = {}
+for _codepoint in range(0xC0, 0x250):
+    _char = chr(_codepoint)
+    if _char == _char.lower() and _fold_char(_char) != _char:
+        _ACCENT_VARIANTS[_fold_char(_char)] = (
+            _ACCENT_VARIANTS.get(_fold_char(_char), "") + _char
+        )
+
+
+def _char_pattern(char: str) -> str:
+    """Padrão de um caractere do termo, aceitando variantes acentuadas."""
+    if char == " ":
+        return r"\s+"
+    if char in _ACCENT_VARIANTS:
+        return "[" + char + _ACCENT_VARIANTS[char] + "]"
+    return re.escape(char)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Monta uma alternação fatorada por prefixo (trie) para os termos.
+
+    Em cada posição o regex percorre no máximo um caminho da trie, em vez de
+    testar todos os termos. Os termos devem estar normalizados (`fold_text`).
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # fim de termo
+
+    def build(node: Dict[str, Any]) -> str:
+        end = "" in node
+        branches = [
+            _char_pattern(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+# Palavras mais curtas são ignoradas; as demais são comparadas pelo radical (prefixo)
+GROUNDING_MIN_WORD_LENGTH = 5
+GROUNDING_STEM_LENGTH = 6
+
+# Palavras (somente letras) e fronteiras de frase, para a verificação de base no contexto
+_GROUNDING_WORD_REGEX = re.compile(r"[a-z]{%d,}" % GROUNDING_MIN_WORD_LENGTH)
+_SENTENCE_SPLIT_REGEX = re.compile(r"[.!?;\n]+")
+
+
+def grounding_terms(text: str) -> List[str]:
+    """Radicais das palavras relevantes do texto (minúsculas, sem acentos)."""
+    # NFD + ASCII remove os acentos em C, sem percorrer o texto em Python
+    ascii_text = unicodedata.normalize("NFD", text.lower()).encode("ascii", "ignore").decode()
+    return [
+        word[:GROUNDING_STEM_LENGTH]
+        for word in _GROUNDING_WORD_REGEX.findall(ascii_text)
+    ]
+
+
+def build_context_terms(context_text: str) -> frozenset:
+    """
+    Índice (conjunto com hash) dos radicais do contexto recuperado.
+
+    Construído uma única vez por resposta: cada consulta custa O(1), então a
+    verificação é linear no tamanho da resposta mais o do contexto.
+    """
+    return frozenset(grounding_terms(context_text))
+
+
+class TermMatcher:
+    """
+    Localiza e substitui uma lista de termos em uma única passada.
+
+    Os termos são comparados sem diferenciar maiúsculas nem acentos, sempre
+    como palavras inteiras: "cu" não casa dentro de "circunstância" nem de
+    "acumulação". O regex é compilado uma vez, na construção, e as variantes
+    acentuadas ficam no próprio padrão: o texto só precisa de `lower()`.
+
+    Example:
+        >>> matcher = TermMatcher(["merda", "vai tomar no cu"])
+        >>> matcher.redact("Que MERDA!")
+        ('Que [removido]!', ['merda'])
+    """
+
+    def __init__(self, terms: Iterable[str], replacement: str = "[removido]"):
+        self.replacement = replacement
+        # Termo normalizado -> termo original (para reportar)
+        self._canonical = {
+            re.sub(r"\s+", " ", fold_text(term).strip()): term for term in terms
+        }
+        self._pattern = re.compile(
+            r"(?<!\w)" + _trie_pattern(self._canonical) + r"(?!\w)"
+        )
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Retorna (início, fim, termo) de cada ocorrência, sem sobreposição."""
+        if not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Raro: lower() mudou o tamanho (ex.: "İ"); normaliza caractere a caractere
+            lowered = fold_text(text)
+        return [
+            (
+                m.start(),
+                m.end(),
+                self._canonical[re.sub(r"\s+", " ", fold_text(m.group()))],
+            )
+            for m in self._pattern.finditer(lowered)
+        ]
+
+    def terms_found(self, text: str) -> List[str]:
+        """Termos encontrados, sem repetição, na ordem em que aparecem."""
+        return list(dict.fromkeys(term for _, _, term in self.find(text)))
+
+    def redact(self, text: str) -> Tuple[str, List[str]]:
+        """Substitui todas as ocorrências; retorna (texto limpo, termos encontrados)."""
+        matches = self.find(text)
+        if not matches:
+            return text, []
+
+        parts = []
+        last = 0
+        for start, end, _ in matches:
+            parts.append(text[last:start])
+            parts.append(self.replacement)
+            last = end
+        parts.append(text[last:])
+
+        return "".join(parts), list(dict.fromkeys(term for _, _, term in matches))
 
 
 @register_validator(name="basic_toxic_language", data_type="string")
@@ -30,6 +197,9 @@ class BasicToxicLanguage(Validator):
         "fdp", "pqp", "vsf", "vai tomar no cu"
     ]
 
+    # Compilado uma vez por classe (todas as instâncias compartilham)
+    MATCHER = TermMatcher(TOXIC_TERMS)
+
     def __init__(self, threshold: float = 0.5, on_fail: str = "fix", **kwargs):
         super().__init__(on_fail=on_fail, **kwargs)
         self.threshold = threshold
@@ -38,35 +208,22 @@ class BasicToxicLanguage(Validator):
         """Valida se o texto contém linguagem tóxica."""
 
         if not value:
-            return ValidationResult(
-                outcome="pass",
+            return PassResult(
                 metadata={"checked": False, "reason": "empty_input"}
             )
 
-        value_lower = value.lower()
-        found_toxic = []
-
-        for term in self.TOXIC_TERMS:
-            if term in value_lower:
-                found_toxic.append(term)
+        # Localiza e remove todos os termos em uma única passada
+        clean_value, found_toxic = self.MATCHER.redact(value)
 
         if found_toxic:
-            # Remove termos tóxicos
-            clean_value = value
-            for term in found_toxic:
-                pattern = re.compile(re.escape(term), re.IGNORECASE)
-                clean_value = pattern.sub("[removido]", clean_value)
-
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_spans=None,
-                fixed_value=clean_value,
+                fix_value=clean_value,
                 error_message=f"Linguagem tóxica detectada: {', '.join(found_toxic)}",
                 metadata={"toxic_terms_found": found_toxic}
             )
 
-        return ValidationResult(
-            outcome="pass",
+        return PassResult(
             metadata={"toxic_terms_found": []}
         )
 
@@ -82,6 +239,8 @@ class ProfanityCheck(Validator):
         "cu", "foder", "foda", "fdp", "pqp", "vsf"
     ]
 
+    MATCHER = TermMatcher(PROFANITY_WORDS)
+
     def __init__(self, on_fail: str = "exception", **kwargs):
         super().__init__(on_fail=on_fail, **kwargs)
 
@@ -89,25 +248,18 @@ class ProfanityCheck(Validator):
         """Valida se o texto contém palavrões."""
 
         if not value:
-            return ValidationResult(outcome="pass")
-
-        value_lower = value.lower()
-        found_profanity = []
+            return PassResult()
 
-        for word in self.PROFANITY_WORDS:
-            if word in value_lower:
-                found_profanity.append(word)
+        found_profanity = self.MATCHER.terms_found(value)
 
         if found_profanity:
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_spans=None,
                 error_message=f"Palavrões detectados: {', '.join(found_profanity)}",
                 metadata={"profanity_found": found_profanity}
             )
 
-        return ValidationResult(
-            outcome="pass",
+        return PassResult(
             metadata={"profanity_found": []}
         )
 
@@ -133,32 +285,28 @@ class ResponseLength(Validator):
         """Valida o tamanho da resposta."""
 
         if not value:
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_message="Resposta vazia"
             )
 
         length = len(value)
 
         if length < self.min_length:
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_spans=None,
                 error_message=f"Resposta muito curta ({length} chars). Mínimo: {self.min_length}",
                 metadata={"length": length, "min": self.min_length, "max": self.max_length}
             )
 
         if length > self.max_length:
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_spans=None,
-                fixed_value=value[:self.max_length] + "...",
+                fix_value=value[:self.max_length] + "...",
                 error_message=f"Resposta muito longa ({length} chars). Máximo: {self.max_length}",
                 metadata={"length": length, "min": self.min_length, "max": self.max_length}
             )
 
-        return ValidationResult(
-            outcome="pass",
+        return PassResult(
             metadata={"length": length, "min": self.min_length, "max": self.max_length}
         )
 
@@ -191,6 +339,18 @@ class HallucinationDetection(Validator):
         r"está previsto na súmula",
     ]
 
+    # Padrões compilados uma vez por classe (reutilizados a cada resposta)
+    ASSERTIVE_REGEXES = [re.compile(pattern) for pattern in ASSERTIVE_PATTERNS]
+
+    # Padrões: "Súmula 70", "súmula nº 112", "Súmula N° 85"
+    SUMULA_NUMBER_REGEXES = [
+        re.compile(r'súmula\s+n?º?\s*(\d+)', re.IGNORECASE),
+        re.compile(r'sumula\s+n?º?\s*(\d+)', re.IGNORECASE),
+    ]
+
+    # Fração mínima de palavras no contexto para a frase contar como fundamentada
+    SENTENCE_GROUNDING_THRESHOLD = 0.5
+
     # Palavras que indicam incerteza (BOAS - reduzem chance de alucinação)
     UNCERTAINTY_MARKERS = [
         "possivelmente", "provavelmente", "aparentemente",
@@ -217,8 +377,7 @@ class HallucinationDetection(Validator):
         """
 
         if not value:
-            return ValidationResult(
-                outcome="pass",
+            return PassResult(
                 metadata={"checked": False, "reason": "empty_response"}
             )
 
@@ -232,11 +391,12 @@ class HallucinationDetection(Validator):
         issues = []
         hallucination_score = 0.0
 
-        # 1. Verifica súmulas citadas vs recuperadas
+        # 1. Verifica súmulas citadas vs recuperadas (números canônicos: "07" == "7")
         if cited_sumulas:
+            retrieved_numbers = {canonical_sumula_number(s) for s in retrieved_sumulas}
             fabricated_sumulas = [
                 s for s in cited_sumulas
-                if s not in retrieved_sumulas
+                if canonical_sumula_number(s) not in retrieved_numbers
             ]
 
             if fabricated_sumulas:
@@ -247,41 +407,31 @@ class HallucinationDetection(Validator):
 
         # 2. Verifica afirmações categóricas
         assertive_count = 0
-        for pattern in self.ASSERTIVE_PATTERNS:
-            matches = re.findall(pattern, value.lower())
-            assertive_count += len(matches)
+        value_lower = value.lower()
+        for regex in self.ASSERTIVE_REGEXES:
+            assertive_count += len(regex.findall(value_lower))
 
         # 3. Verifica marcadores de incerteza (BONS)
         uncertainty_count = sum(
             1 for marker in self.UNCERTAINTY_MARKERS
-            if marker in value.lower()
+            if marker in value_lower
         )
 
-        # 4. Calcula score de confiança baseado em contexto
-        if context_text:
-            # Verifica se trechos da resposta aparecem no contexto
-            response_sentences = [
-                s.strip() for s in value.split('.')
-                if len(s.strip()) > 20
-            ]
-
-            grounded_sentences = 0
-            for sentence in response_sentences[:5]:  # Verifica primeiras 5 frases
-                # Remove números de súmulas para comparação mais genérica
-                clean_sentence = re.sub(r'súmula \d+', 'súmula', sentence.lower())
-                clean_context = re.sub(r'súmula \d+', 'súmula', context_text.lower())
-
-                # Verifica se palavras-chave da frase estão no contexto
-                words = [w for w in clean_sentence.split() if len(w) > 4]
-                if words:
-                    words_in_context = sum(
-                        1 for w in words if w in clean_context
-                    )
-                    if words_in_context / len(words) > 0.5:
-                        grounded_sentences += 1
-
-            if response_sentences:
-                grounding_ratio = grounded_sentences / len(response_sentences[:5])
+        # 4. Calcula score de confiança baseado em contexto (todas as frases)
+        context_terms = metadata.get("context_terms")
+        if context_terms is None and context_text:
+            context_terms = build_context_terms(context_text)
+
+        sentence_scores = []
+        grounding_ratio = None
+        if context_terms:
+            sentence_scores = self.score_sentences(value, context_terms)
+            if sentence_scores:
+                grounded_sentences = sum(
+                    1 for s in sentence_scores
+                    if s["score"] > self.SENTENCE_GROUNDING_THRESHOLD
+                )
+                grounding_ratio = grounded_sentences / len(sentence_scores)
                 if grounding_ratio < 0.3:
                     issues.append("Resposta parece não ter base no contexto recuperado")
                     hallucination_score += 0.3
@@ -298,34 +448,50 @@ class HallucinationDetection(Validator):
             "hallucination_score": round(hallucination_score, 2),
             "assertive_count": assertive_count,
             "uncertainty_count": uncertainty_count,
+            "grounding_ratio": None if grounding_ratio is None else round(grounding_ratio, 2),
+            "sentence_scores": sentence_scores,
             "issues": issues
         }
 
         if hallucination_score >= self.threshold:
-            return ValidationResult(
-                outcome="fail",
+            return FailResult(
                 error_spans=None,
                 error_message=f"Possível alucinação detectada (score: {hallucination_score:.2f}). {'; '.join(issues)}",
                 metadata=validation_metadata
             )
 
-        return ValidationResult(
-            outcome="pass",
+        return PassResult(
             metadata=validation_metadata
         )
 
+    def score_sentences(
+        self, text: str, context_terms: frozenset
+    ) -> List[Dict[str, Any]]:
+        """
+        Pontua, em uma passada, cada frase da resposta pela fração de palavras
+        presentes no contexto (números de súmulas são ignorados).
+
+        Returns:
+            Lista com {"sentence": início da frase, "score": 0.0 a 1.0}
+        """
+        scores = []
+        for sentence in _SENTENCE_SPLIT_REGEX.split(text):
+            sentence = sentence.strip()
+            if len(sentence) <= 20:
+                continue
+            terms = grounding_terms(sentence)
+            score = (
+                sum(1 for term in terms if term in context_terms) / len(terms)
+                if terms else 0.0
+            )
+            scores.append({"sentence": sentence[:80], "score": round(score, 2)})
+        return scores
+
     def _extract_sumula_numbers(self, text: str) -> List[str]:
         """Extrai números de súmulas mencionadas no texto."""
-        # Padrões: "Súmula 70", "súmula nº 112", "Súmula N° 85"
-        patterns = [
-            r'súmula\s+n?º?\s*(\d+)',
-            r'sumula\s+n?º?\s*(\d+)',
-        ]
-
         numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            numbers.extend(matches)
+        for regex in self.SUMULA_NUMBER_REGEXES:
+            numbers.extend(regex.findall(text))
 
         return list(set(numbers))  # Remove duplicatas
 
@@ -338,24 +504,60 @@ class ValidSumulaReference(Validator):
     Verifica:
     1. Números de súmulas válidos (1-200 para TCEMG)
     2. Formato correto de citação
-    3. Súmulas existem no banco de dados recuperado
+    3. Súmulas citadas estão entre as recuperadas (falha se não estiverem)
+    4. Com registro (`SumulaRegistry`): súmulas existentes e citações de
+       súmulas REVOGADAS sem menção à revogação na mesma frase
+       (consultas O(1))
 
     Parâmetros:
         min_sumula (int): Número mínimo válido de súmula (padrão: 1)
-        max_sumula (int): Número máximo válido de súmula (padrão: 200)
+        max_sumula (int): Número máximo válido de súmula (padrão: 200; com
+            registro, o maior número registrado)
+        registry (SumulaRegistry): Registro das súmulas e status (opcional;
+            também aceito no metadata como 'sumula_registry')
         on_fail (str): Ação ao falhar ("exception", "reask", "fix")
     """
 
+    # Menção à revogação: citar uma súmula revogada é legítimo se a resposta a
+    # reconhece na mesma frase da citação
+    REVOKED_MENTION_REGEX = re.compile(r'revogad', re.IGNORECASE)
+
+    # Fim de frase: pontuação seguida de espaço e de algo que não é número
+    # (não separa "Súm. 70" nem "Súmula n. 70") ou quebra de linha
+    CITATION_SENTENCE_SPLIT_REGEX = re.compile(r'[.!?;](?=\s+[^\d\s])|\n+')
+
+    # Padrões compilados uma vez por classe (reutilizados a cada resposta)
+    SUMULA_NUMBER_REGEXES = [
+        re.compile(r'súmula\s+n?º?\s*(\d+)', re.IGNORECASE),
+        re.compile(r'sumula\s+n?º?\s*(\d+)', re.IGNORECASE),
+        re.compile(r'súm\.\s*(\d+)', re.IGNORECASE),
+    ]
+
+    # Padrões incorretos comuns de citação e a sugestão de correção
+    CITATION_FORMAT_REGEXES = [
+        (re.compile(r'sumula\s+\d+', re.IGNORECASE), "Usar 'Súmula' com acento"),
+        (
+            re.compile(r'súmula\s+numero\s+\d+', re.IGNORECASE),
+            "Usar 'Súmula nº' ao invés de 'Súmula numero'",
+        ),
+        (
+            re.compile(r'súmula\s+n\.\s+\d+', re.IGNORECASE),
+            "Usar 'Súmula nº' ao invés de 'Súmula n.'",
+        ),
+    ]
+
     def __init__(
         self,
         min_sumula: int = 1,
         max_sumula: int = 200,
+        registry: Optional[Any] = None,
         on_fail: str = "reask",
         **kwargs
     ):
         super().__init__(on_fail=on_fail, **kwargs)
         self.min_sumula = min_sumula
         self.max_sumula = max_sumula
+        self.registry = registry
 
     def validate(self, value: str, metadata: Dict[str, Any]) -> ValidationResult:
         """
@@ -364,11 +566,11 @@ class ValidSumulaReference(Validator):
         Metadata esperado:
             - retrieved_sumulas: Lista de números de súmulas recuperadas
             - all_valid_sumulas: Lista de todas as súmulas válidas no sistema (opcional)
+            - sumula_registry: SumulaRegistry (opcional; substitui all_valid_sumulas)
         """
 
         if not value:
-            return ValidationResult(
-                outcome="pass",
+            return PassResult(
                 metadata={"checked": False, "reason": "empty_response"}
             )
 
@@ -377,48 +579,66 @@ class ValidSumulaReference(Validator):
 
         if not cited_sumulas:
             # Sem súmulas citadas, não há o que validar
-            return ValidationResult(
-                outcome="pass",
+            return PassResult(
                 metadata={"cited_sumulas": [], "validation": "no_sumulas_cited"}
             )
 
-        retrieved_sumulas = metadata.get("retrieved_sumulas", [])
-        all_valid_sumulas = metadata.get("all_valid_sumulas", [])
+        # Números canônicos dos dois lados ("Súmula nº 07" x "7" recuperada)
+        retrieved_sumulas = {canonical_sumula_number(s) for s in metadata.get("retrieved_sumulas", [])}
+        all_valid_sumulas = {canonical_sumula_number(s) for s in metadata.get("all_valid_sumulas", [])}
+        registry = metadata.get("sumula_registry") or self.registry
+        max_sumula = registry.max_number if registry is not None and len(registry) else self.max_sumula
 
         issues = []
         invalid_sumulas = []
         out_of_range_sumulas = []
         not_retrieved_sumulas = []
+        revoked_sumulas = []
 
         for num_str in cited_sumulas:
             try:
                 num = int(num_str)
 
                 # Verifica se está no range válido
-                if num < self.min_sumula or num > self.max_sumula:
+                if num < self.min_sumula or num > max_sumula:
                     out_of_range_sumulas.append(num_str)
                     issues.append(
-                        f"Súmula {num_str} fora do range válido ({self.min_sumula}-{self.max_sumula})"
+                        f"Súmula {num_str} fora do range válido ({self.min_sumula}-{max_sumula})"
+                    )
+                    continue
+
+                # Verifica se existe no sistema (registro ou lista, se fornecidos)
+                if registry is not None and len(registry):
+                    if not registry.exists(num):
+                        invalid_sumulas.append(num_str)
+                        issues.append(f"Súmula {num_str} não existe no sistema")
+                        continue
+                    if registry.is_revoked(num):
+                        revoked_sumulas.append(num_str)
+                elif all_valid_sumulas and str(num) not in all_valid_sumulas:
+                    invalid_sumulas.append(num_str)
+                    issues.append(
+                        f"Súmula {num_str} não existe no sistema"
                     )
+                    continue
 
                 # Verifica se foi recuperada
-                elif retrieved_sumulas and num_str not in retrieved_sumulas:
+                if retrieved_sumulas and str(num) not in retrieved_sumulas:
                     not_retrieved_sumulas.append(num_str)
                     issues.append(
                         f"Súmula {num_str} citada mas não foi recuperada"
                     )
 
-                # Verifica se existe no sistema (se fornecido)
-                elif all_valid_sumulas and num_str not in all_valid_sumulas:
-                    invalid_sumulas.append(num_str)
-                    issues.append(
-                        f"Súmula {num_str} não existe no sistema"
-                    )
-
             except ValueError:
                 invalid_sumulas.append(num_str)
                 issues.append(f"Número de súmula inválido: {num_str}")
 
+        # Súmulas revogadas citadas sem mencionar a revogação na mesma frase
+        acknowledged = self._revocation_acknowledged(value) if revoked_sumulas else set()
+        unacknowledged_revoked = [n for n in revoked_sumulas if n not in acknowledged]
+        for num_str in unacknowledged_revoked:
+            issues.append(f"Súmula {num_str} está REVOGADA")
+
         # Verifica formato de citação
         citation_issues = self._check_citation_format(value, cited_sumulas)
         issues.extend(citation_issues)
@@ -426,51 +646,57 @@ class ValidSumulaReference(Validator):
         # Metadados de validação
         validation_metadata = {
             "cited_sumulas": cited_sumulas,
-            "retrieved_sumulas": retrieved_sumulas,
+            "retrieved_sumulas": sorted(retrieved_sumulas),
             "invalid_sumulas": invalid_sumulas,
             "out_of_range_sumulas": out_of_range_sumulas,
             "not_retrieved_sumulas": not_retrieved_sumulas,
+            "revoked_sumulas": revoked_sumulas,
+            "unacknowledged_revoked": unacknowledged_revoked,
             "citation_format_issues": citation_issues,
             "total_issues": len(issues)
         }
 
-        # Decide se passou ou falhou
-        has_critical_issues = bool(
-            invalid_sumulas or out_of_range_sumulas
-        )
-
-        if has_critical_issues:
-            return ValidationResult(
-                outcome="fail",
+        # Decide se passou ou falhou (súmula citada fora do contexto recuperado é
+        # provável alucinação: o conteúdo atribuído a ela não veio dos documentos)
+        if invalid_sumulas or out_of_range_sumulas or unacknowledged_revoked:
+            return FailResult(
                 error_spans=None,
                 error_message=f"Súmulas inválidas detectadas. {'; '.join(issues[:3])}",
                 metadata=validation_metadata
             )
 
-        # Aviso se citou súmulas não recuperadas (menos crítico)
         if not_retrieved_sumulas:
-            validation_metadata["warning"] = f"Súmulas citadas não recuperadas: {', '.join(not_retrieved_sumulas)}"
+            return FailResult(
+                error_spans=None,
+                error_message=f"Súmulas citadas não recuperadas: {', '.join(not_retrieved_sumulas)}",
+                metadata=validation_metadata
+            )
 
-        return ValidationResult(
-            outcome="pass",
+        return PassResult(
             metadata=validation_metadata
         )
 
     def _extract_sumula_numbers(self, text: str) -> List[str]:
         """Extrai números de súmulas mencionadas no texto."""
-        patterns = [
-            r'súmula\s+n?º?\s*(\d+)',
-            r'sumula\s+n?º?\s*(\d+)',
-            r'súm\.\s*(\d+)',
-        ]
-
         numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            numbers.extend(matches)
+        for regex in self.SUMULA_NUMBER_REGEXES:
+            numbers.extend(regex.findall(text))
 
         return list(set(numbers))  # Remove duplicatas
 
+    def _revocation_acknowledged(self, text: str) -> set:
+        """
+        Números de súmulas citadas em frases que mencionam a revogação.
+
+        Ex.: em "A Súmula 10 revogou a anterior. Conforme a Súmula 70, ..." a
+        menção não vale para a Súmula 70.
+        """
+        acknowledged = set()
+        for sentence in self.CITATION_SENTENCE_SPLIT_REGEX.split(text):
+            if self.REVOKED_MENTION_REGEX.search(sentence):
+                acknowledged.update(self._extract_sumula_numbers(sentence))
+        return acknowledged
+
     def _check_citation_format(self, text: str, cited_sumulas: List[str]) -> List[str]:
         """
         Verifica se as citações estão formatadas corretamente.
@@ -481,19 +707,388 @@ class ValidSumulaReference(Validator):
         issues = []
 
         # Verifica padrões incorretos comuns
-        incorrect_patterns = [
-            (r'sumula\s+\d+', "Usar 'Súmula' com acento"),
-            (r'súmula\s+numero\s+\d+', "Usar 'Súmula nº' ao invés de 'Súmula numero'"),
-            (r'súmula\s+n\.\s+\d+', "Usar 'Súmula nº' ao invés de 'Súmula n.'"),
-        ]
-
-        for pattern, suggestion in incorrect_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
+        for regex, suggestion in self.CITATION_FORMAT_REGEXES:
+            if regex.search(text):
                 issues.append(f"Formato incorreto detectado. Sugestão: {suggestion}")
 
         return issues
 
 
+# Palavras normalizadas das citações e do contexto (pontuação e markdown ignorados)
+_QUOTE_TOKEN_REGEX = re.compile(r"\w+")
+
+# Blocos de citação markdown (linhas consecutivas iniciadas por ">")
+_BLOCKQUOTE_REGEX = re.compile(r"(?:^[ \t]*>[^\n]*(?:\n|$))+", re.MULTILINE)
+_BLOCKQUOTE_MARKER_REGEX = re.compile(r"^[ \t]*>[ \t]?", re.MULTILINE)
+
+# Trechos entre aspas: "...", “...” e «...»
+_QUOTED_SPAN_REGEX = re.compile(r'"([^"\n]+)"|“([^”\n]+)”|«([^»\n]+)»')
+
+# Supressões dentro da citação ("...", "(...)", "[...]") separam trechos independentes
+_ELLIPSIS_REGEX = re.compile(r"[\(\[]?(?:\.\.\.|…)[\)\]]?")
+
+
+def quote_tokens(text: str) -> List[str]:
+    """Palavras do texto normalizadas para comparação literal (NFC, minúsculas)."""
+    return _QUOTE_TOKEN_REGEX.findall(unicodedata.normalize("NFC", text).lower())
+
+
+class QuoteIndex:
+    """
+    Autômato de sufixos sobre as palavras normalizadas do contexto.
+
+    Construído uma vez por requisição em tempo linear no contexto; depois,
+    verificar se uma citação aparece literalmente no contexto custa
+    O(palavras da citação), independentemente do tamanho do contexto.
+
+    Example:
+        >>> index = QuoteIndex("A falta de aplicação anual pelo Município")
+        >>> index.contains("aplicação anual pelo")
+        True
+    """
+
+    def __init__(self, context_text: str = ""):
+        # Estado inicial 0: transições, link de sufixo e maior comprimento
+        self._next: List[Dict[str, int]] = [{}]
+        self._link: List[int] = [-1]
+        self._len: List[int] = [0]
+        self._last = 0
+        self.size = 0
+        self.documents = 0
+        if context_text:
+            self.add_document(context_text)
+
+    def add_document(self, text: str) -> None:
+        """Indexa um documento; citações não casam através de dois documentos."""
+        self.add_tokens(quote_tokens(text))
+
+    def add_tokens(self, tokens: List[str]) -> None:
+        """Indexa um documento já dividido em palavras (ver `quote_tokens`)."""
+        if self.documents:
+            self.extend([f"\x00{self.documents}"])  # separador único entre documentos
+        self.extend(tokens)
+        self.documents += 1
+
+    def extend(self, tokens: Iterable[str]) -> None:
+        """Acrescenta palavras ao final do texto indexado."""
+        for token in tokens:
+            self._add(token)
+            self.size += 1
+
+    def _add(self, token: str) -> None:
+        nxt, link, length = self._next, self._link, self._len
+
+        cur = len(nxt)
+        nxt.append({})
+        link.append(0)
+        length.append(length[self._last] + 1)
+
+        p = self._last
+        while p != -1 and token not in nxt[p]:
+            nxt[p][token] = cur
+            p = link[p]
+
+        if p != -1:
+            q = nxt[p][token]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(nxt)
+                nxt.append(dict(nxt[q]))
+                link.append(link[q])
+                length.append(length[p] + 1)
+                while p != -1 and nxt[p].get(token) == q:
+                    nxt[p][token] = clone
+                    p = link[p]
+                link[q] = clone
+                link[cur] = clone
+
+        self._last = cur
+
+    def longest_match(self, tokens: List[str]) -> int:
+        """Maior sequência contígua de `tokens` presente no contexto (em palavras)."""
+        nxt, link, length = self._next, self._link, self._len
+        state, current, best = 0, 0, 0
+        for token in tokens:
+            while state and token not in nxt[state]:
+                state = link[state]
+                current = length[state]
+            if token in nxt[state]:
+                state = nxt[state][token]
+                current += 1
+            best = max(best, current)
+        return best
+
+    def contains(self, text: str) -> bool:
+        """Verifica se o texto aparece literalmente (palavra a palavra) no contexto."""
+        tokens = quote_tokens(text)
+        return self.longest_match(tokens) == len(tokens)
+
+
+def _overlap_length(previous: List[str], tokens: List[str]) -> int:
+    """Maior k com `previous[-k:] == tokens[:k]` (sobreposição entre sub-chunks)."""
+    for k in range(min(len(previous), len(tokens)), 0, -1):
+        if previous[-k:] == tokens[:k]:
+            return k
+    return 0
+
+
+def context_token_runs(context_docs: Optional[List[Any]]) -> List[List[str]]:
+    """
+    Palavras dos documentos recuperados, na forma indexada pelo `QuoteIndex`.
+
+    Sub-chunks consecutivos do mesmo chunk (`pdf_name`, `chunk_index`) são
+    unidos em ordem de `sub_chunk_index`, sem a sobreposição entre eles: uma
+    citação legítima pode atravessar a fronteira entre dois sub-chunks.
+    Sub-chunks não consecutivos e documentos sem esses metadados ficam
+    separados.
+    """
+    standalone: List[List[str]] = []
+    order: List[Any] = []
+    groups: Dict[Tuple[Any, Any], List[Tuple[int, List[str]]]] = {}
+    for doc in context_docs or []:
+        if not hasattr(doc, "page_content"):
+            continue
+        metadata = getattr(doc, "metadata", None) or {}
+        tokens = quote_tokens(doc.page_content)
+        if metadata.get("sub_chunk_index") is None or metadata.get("pdf_name") is None:
+            order.append(len(standalone))
+            standalone.append(tokens)
+            continue
+        key = (metadata["pdf_name"], metadata.get("chunk_index"))
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append((int(metadata["sub_chunk_index"]), tokens))
+
+    runs = []
+    for item in order:
+        if not isinstance(item, tuple):
+            runs.append(standalone[item])
+            continue
+        run: List[str] = []
+        last = None
+        for sub_index, tokens in sorted(groups[item], key=lambda part: part[0]):
+            if sub_index == last:
+                continue  # mesmo sub-chunk recuperado duas vezes
+            if last is not None and sub_index == last + 1:
+                run.extend(tokens[_overlap_length(run, tokens):])
+            else:
+                if last is not None:
+                    runs.append(run)
+                run = list(tokens)
+            last = sub_index
+        runs.append(run)
+    return runs
+
+
+def extract_quotes(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Localiza os blocos de citação (`>`) e trechos entre aspas da resposta.
+
+    Returns:
+        Lista de (início, fim, texto citado sem os marcadores `>`)
+    """
+    quotes = []
+    for match in _BLOCKQUOTE_REGEX.finditer(text):
+        end = match.end() - 1 if match.group().endswith("\n") else match.end()
+        quotes.append((match.start(), end, _BLOCKQUOTE_MARKER_REGEX.sub("", match.group())))
+
+    for match in _QUOTED_SPAN_REGEX.finditer(text):
+        if any(start <= match.start() < end for start, end, _ in quotes):
+            continue  # aspas dentro de um bloco já verificado
+        quoted = next(group for group in match.groups() if group is not None)
+        quotes.append((match.start(), match.end(), quoted))
+
+    return sorted(quotes)
+
+
+@register_validator(name="verbatim_quote", data_type="string")
+class VerbatimQuoteCheck(Validator):
+    """
+    Validator que confere se as citações da resposta existem literalmente no contexto.
+
+    O SYSTEM_PROMPT_JURIDICO exige a transcrição literal das súmulas em blocos
+    de citação (`>`). Cada bloco e cada trecho entre aspas é procurado, palavra a
+    palavra (ignorando maiúsculas, pontuação e markdown), no `QuoteIndex` do
+    contexto. Supressões ("...", "[...]") dividem a citação em trechos que são
+    verificados separadamente.
+
+    O fix troca a citação inventada por um aviso, o que deixa a resposta com
+    uma lacuna; por isso a falha também pede regeneração (`reask_after_fix`).
+    Se o orçamento do reask acabar, vale a resposta corrigida.
+
+    Parâmetros:
+        min_words (int): Citações com menos palavras são ignoradas (padrão: 4)
+        replacement (str): Texto que substitui citações inventadas no fix
+        on_fail (str): Ação ao falhar ("exception", "reask", "fix")
+    """
+
+    reask_after_fix = True
+
+    def __init__(
+        self,
+        min_words: int = 4,
+        replacement: str = "[citação não encontrada no contexto]",
+        on_fail: str = "fix",
+        **kwargs
+    ):
+        super().__init__(on_fail=on_fail, **kwargs)
+        self.min_words = min_words
+        self.replacement = replacement
+
+    def validate(self, value: str, metadata: Dict[str, Any]) -> ValidationResult:
+        """
+        Valida as citações literais da resposta.
+
+        Metadata esperado:
+            - quote_index: QuoteIndex do contexto (ou context_text para construí-lo)
+        """
+        quote_index = metadata.get("quote_index")
+        if quote_index is None:
+            quote_index = QuoteIndex(metadata.get("context_text", ""))
+
+        checked = 0
+        fabricated = []
+        for start, end, quoted in extract_quotes(value):
+            segments = [quote_tokens(part) for part in _ELLIPSIS_REGEX.split(quoted)]
+            segments = [tokens for tokens in segments if tokens]
+            if sum(len(tokens) for tokens in segments) < self.min_words:
+                continue
+
+            checked += 1
+            matches = [quote_index.longest_match(tokens) for tokens in segments]
+            if any(m < len(tokens) for m, tokens in zip(matches, segments)):
+                fabricated.append({
+                    "start": start,
+                    "end": end,
+                    "text": quoted.strip()[:200],
+                    "longest_match_ratio": round(
+                        sum(matches) / sum(len(tokens) for tokens in segments), 2
+                    ),
+                })
+
+        validation_metadata = {
+            "quotes_checked": checked,
+            "fabricated_quotes": fabricated,
+        }
+
+        if fabricated:
+            fixed = value
+            for quote in reversed(fabricated):
+                fixed = fixed[:quote["start"]] + self.replacement + fixed[quote["end"]:]
+            return FailResult(
+                error_spans=None,
+                error_message=(
+                    f"{len(fabricated)} citação(ões) não encontrada(s) literalmente no contexto"
+                ),
+                fix_value=fixed,
+                metadata=validation_metadata
+            )
+
+        return PassResult(metadata=validation_metadata)
+
+
+@register_validator(name="semantic_grounding", data_type="string")
+class SemanticGrounding(Validator):
+    """
+    Validator (opcional) de base no contexto por similaridade de embeddings.
+
+    Detecta frases parafraseadas ou inventadas que a sobreposição de palavras
+    do HallucinationDetection não percebe. Reutiliza os vetores densos já
+    armazenados dos chunks recuperados (metadata 'chunk_vectors') e embeda
+    todas as frases da resposta em uma única chamada; a similaridade de cosseno
+    frase × chunk é uma multiplicação de matrizes.
+
+    Parâmetros:
+        embeddings: Modelo de embeddings da coleção (com `embed_documents`)
+        min_similarity (float): Similaridade mínima com algum chunk para a frase ter base
+        max_unsupported_ratio (float): Fração máxima de frases sem base
+        on_fail (str): Ação ao falhar ("exception", "reask", "fix")
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        min_similarity: float = 0.45,
+        max_unsupported_ratio: float = 0.3,
+        on_fail: str = "reask",
+        **kwargs
+    ):
+        super().__init__(on_fail=on_fail, **kwargs)
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.max_unsupported_ratio = max_unsupported_ratio
+
+    def validate(self, value: str, metadata: Dict[str, Any]) -> ValidationResult:
+        """
+        Valida as frases da resposta contra os vetores dos chunks recuperados.
+
+        Metadata esperado:
+            - chunk_vectors: matriz (chunks × dimensão) dos vetores armazenados
+        """
+        chunk_vectors = metadata.get("chunk_vectors")
+        sentences = [
+            sentence.strip() for sentence in _SENTENCE_SPLIT_REGEX.split(value)
+            if len(sentence.strip()) > 20
+        ]
+
+        if chunk_vectors is None or not len(chunk_vectors) or not sentences:
+            return PassResult(metadata={"checked": False, "reason": "no_vectors_or_sentences"})
+
+        # Uma chamada de embeddings para todas as frases
+        sentence_vectors = np.asarray(
+            self.embeddings.embed_documents(sentences), dtype=np.float32
+        )
+        chunk_dim = np.shape(chunk_vectors)[1]
+        if sentence_vectors.shape[1] > chunk_dim:
+            # Coleção com embeddings encurtados (Matryoshka): os primeiros
+            # `chunk_dim` componentes, renormalizados abaixo, são equivalentes
+            sentence_vectors = sentence_vectors[:, :chunk_dim]
+        elif sentence_vectors.shape[1] < chunk_dim:
+            return PassResult(metadata={"checked": False, "reason": "dimension_mismatch"})
+        similarities = _normalize_rows(sentence_vectors) @ _normalize_rows(
+            np.asarray(chunk_vectors, dtype=np.float32)
+        ).T
+
+        best_chunk = similarities.argmax(axis=1)
+        best_similarity = similarities[np.arange(len(sentences)), best_chunk]
+        unsupported = np.flatnonzero(best_similarity < self.min_similarity)
+        unsupported_ratio = len(unsupported) / len(sentences)
+
+        validation_metadata = {
+            "checked": True,
+            "sentence_similarities": [
+                {
+                    "sentence": sentence[:80],
+                    "similarity": round(float(similarity), 3),
+                    "best_chunk": int(chunk),
+                }
+                for sentence, similarity, chunk in zip(sentences, best_similarity, best_chunk)
+            ],
+            "unsupported_sentences": [sentences[i][:80] for i in unsupported],
+            "unsupported_ratio": round(unsupported_ratio, 2),
+        }
+
+        if unsupported_ratio > self.max_unsupported_ratio:
+            return FailResult(
+                error_spans=None,
+                error_message=(
+                    f"{len(unsupported)} de {len(sentences)} frases sem correspondência "
+                    f"semântica no contexto recuperado"
+                ),
+                metadata=validation_metadata
+            )
+
+        return PassResult(metadata=validation_metadata)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normaliza as linhas (norma L2) para que o produto escalar seja o cosseno."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
 def create_basic_guard() -> Guard:
     """
     Cria um Guard básico para o projeto de súmulas TCEMG.
@@ -573,85 +1168,383 @@ def validate_input(text: str) -> Dict[str, Any]:
         }
 
 
-def validate_output(
-    text: str,
-    context_docs: Optional[List[Any]] = None,
-    enable_hallucination_detection: bool = True
-) -> Dict[str, Any]:
+def build_context_metadata(context_docs: Optional[List[Any]]) -> Dict[str, Any]:
     """
-    Valida o output do LLM antes de retornar ao usuário.
-
-    Args:
-        text: Resposta gerada pelo LLM
-        context_docs: Lista de documentos recuperados (para detecção de alucinações)
-        enable_hallucination_detection: Se True, ativa detecção de alucinações
+    Prepara o metadata dos validators da Fase 2 a partir dos documentos recuperados.
 
     Returns:
-        Dict com 'is_valid', 'cleaned_text' e 'validation_info'
+        Dict com 'retrieved_sumulas', 'context_text' (todos os documentos),
+        'context_terms' (índice de radicais, ver `build_context_terms`) e
+        'quote_index' (índice de citações literais sobre os sub-chunks unidos,
+        ver `QuoteIndex` e `context_token_runs`)
+    """
+    retrieved_sumulas = []
+    context_text_parts = []
+    quote_index = QuoteIndex()
+
+    for doc in context_docs or []:
+        if hasattr(doc, 'metadata') and doc.metadata:
+            num = canonical_sumula_number(doc.metadata.get('num_sumula'))
+            if num and num not in retrieved_sumulas:
+                retrieved_sumulas.append(num)
+
+        if hasattr(doc, 'page_content'):
+            context_text_parts.append(doc.page_content)
+
+    for tokens in context_token_runs(context_docs):
+        quote_index.add_tokens(tokens)
+
+    context_text = "\n".join(context_text_parts)
+    return {
+        "retrieved_sumulas": retrieved_sumulas,
+        "context_text": context_text,
+        "context_terms": build_context_terms(context_text),
+        "quote_index": quote_index,
+    }
+
+
+def context_fingerprint(context_docs: Optional[List[Any]]) -> str:
+    """
+    Impressão digital dos documentos recuperados.
+
+    Combina o id do ponto (`_collection_name`/`_id`, como o QdrantVectorStore
+    preenche) com o hash do conteúdo: os ids são determinísticos (arquivo e
+    chunk) e o nome da coleção é o alias, então o mesmo id pode trazer outro
+    texto após uma re-ingestão (`--watch`) ou troca de alias (`--rebuild`).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for doc in context_docs or []:
+        metadata = getattr(doc, "metadata", None) or {}
+        point = f"{metadata.get('_collection_name', '')}/{metadata.get('_id', '')}"
+        content = hashlib.blake2b(
+            getattr(doc, "page_content", "").encode("utf-8"), digest_size=16
+        ).hexdigest()
+        digest.update(f"{point}:{content}".encode("utf-8") + b"\x00")
+    return digest.hexdigest()
+
+
+class ValidationPipeline:
+    """
+    Conjunto de validators de output construído uma vez e reutilizado.
+
+    Os validators (e seus regex, compilados no nível de classe) são criados na
+    construção; cada chamada a `validate` só executa as validações e mede o
+    tempo de cada validator.
 
     Example:
-        >>> result = validate_output("Resposta com merda aqui")
-        >>> print(result['cleaned_text'])  # "Resposta com [removido] aqui"
+        >>> pipeline = get_validation_pipeline()
+        >>> result = pipeline.validate(resposta, context_docs=docs)
+        >>> result["timings_ms"]
+        {'BasicToxicLanguage': 0.05, 'ResponseLength': 0.01, ...}
     """
 
-    validators = [
-        BasicToxicLanguage(threshold=0.5, on_fail="fix"),
-        ResponseLength(min_length=100, max_length=2000, on_fail="fix")
-    ]
+    def __init__(
+        self,
+        min_length: int = 100,
+        max_length: int = 2000,
+        hallucination_threshold: float = 0.7,
+        min_sumula: int = 1,
+        max_sumula: int = 200,
+        embeddings: Optional[Any] = None,
+        min_semantic_similarity: float = 0.45,
+    ):
+        self.config = {
+            "min_length": min_length,
+            "max_length": max_length,
+            "hallucination_threshold": hallucination_threshold,
+            "min_sumula": min_sumula,
+            "max_sumula": max_sumula,
+            "semantic_grounding": embeddings is not None,
+            # Vetores de outra dimensão dão similaridades diferentes (chave do cache)
+            "embedding_dim": getattr(embeddings, "dimensions", None),
+            "min_semantic_similarity": min_semantic_similarity,
+        }
 
-    # Prepara metadata para detecção de alucinações
-    hallucination_metadata = {}
-    if enable_hallucination_detection and context_docs:
-        # Extrai números de súmulas dos documentos recuperados
-        retrieved_sumulas = []
-        context_text_parts = []
+        # Fase 1: não dependem do contexto recuperado
+        self.basic_validators: List[Validator] = [
+            BasicToxicLanguage(threshold=0.5, on_fail="fix"),
+            ResponseLength(min_length=min_length, max_length=max_length, on_fail="fix"),
+        ]
 
-        for doc in context_docs:
-            if hasattr(doc, 'metadata') and doc.metadata:
-                num = doc.metadata.get('num_sumula')
-                if num and num not in retrieved_sumulas:
-                    retrieved_sumulas.append(str(num))
+        # Fase 2: usam as súmulas e o texto recuperados
+        self.context_validators: List[Validator] = [
+            HallucinationDetection(threshold=hallucination_threshold, on_fail="reask"),
+            ValidSumulaReference(
+                min_sumula=min_sumula, max_sumula=max_sumula, on_fail="reask"
+            ),
+            VerbatimQuoteCheck(on_fail="fix"),
+        ]
 
-            if hasattr(doc, 'page_content'):
-                context_text_parts.append(doc.page_content)
+        # Opcional: base semântica com os vetores dos chunks (1 chamada de embeddings)
+        if embeddings is not None:
+            self.context_validators.append(
+                SemanticGrounding(
+                    embeddings, min_similarity=min_semantic_similarity, on_fail="reask"
+                )
+            )
 
-        hallucination_metadata = {
-            "retrieved_sumulas": retrieved_sumulas,
-            "context_text": "\n".join(context_text_parts[:5])  # Primeiros 5 docs
+    def validate(
+        self,
+        text: str,
+        context_docs: Optional[List[Any]] = None,
+        enable_hallucination_detection: bool = True,
+        chunk_vectors: Optional[np.ndarray] = None,
+        cache: Optional["ValidationCache"] = None,
+        context_metadata: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = False,
+        sumula_registry: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Executa os validators sobre a resposta.
+
+        Args:
+            chunk_vectors: Vetores armazenados dos context_docs (ver
+                `app.retrieval.retriever.fetch_chunk_vectors`), usados pelo
+                SemanticGrounding quando o pipeline tem `embeddings`
+            cache: Cache de resultados; a mesma resposta com os mesmos
+                documentos e configuração não é validada de novo
+            context_metadata: Resultado de `build_context_metadata(context_docs)`
+                já calculado (reutilizado entre respostas com o mesmo contexto)
+            include_metadata: Se True, inclui 'validator_metadata' com o
+                outcome e o metadata de todos os validators (também os aprovados)
+            sumula_registry: Registro das súmulas da coleção (ver
+                `app.guardrails.registry.get_sumula_registry`), usado pelo
+                ValidSumulaReference para existência e revogação
+
+        Returns:
+            Dict com 'is_valid', 'cleaned_text', 'validation_info',
+            'needs_reask' (alguma falha pede regeneração) e 'timings_ms'
+            (tempo de cada validator, em milissegundos)
+        """
+        if cache is not None:
+            key = cache.key(
+                text,
+                context_docs,
+                dict(
+                    self.config,
+                    hallucination_detection=enable_hallucination_detection,
+                    include_metadata=include_metadata,
+                    # Re-ingestão muda a versão do registro e invalida as entradas
+                    registry_version=getattr(sumula_registry, "version", None),
+                    # Sem os vetores dos chunks o SemanticGrounding não roda
+                    chunk_vectors=chunk_vectors is not None and len(chunk_vectors) > 0,
+                ),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        validators = [(v, {}) for v in self.basic_validators]
+
+        if enable_hallucination_detection and (context_docs or context_metadata):
+            if context_metadata is None:
+                context_metadata = build_context_metadata(context_docs)
+            context_metadata = dict(
+                context_metadata, chunk_vectors=chunk_vectors, sumula_registry=sumula_registry
+            )
+            validators.extend((v, context_metadata) for v in self.context_validators)
+
+        cleaned_text = text
+        all_passed = True
+        validation_info = []
+        timings_ms: Dict[str, float] = {}
+        validator_metadata: Dict[str, Dict[str, Any]] = {}
+
+        for validator, metadata in validators:
+            name = validator.__class__.__name__
+            start = time.perf_counter()
+            result = validator.validate(cleaned_text, metadata)
+            timings_ms[name] = round((time.perf_counter() - start) * 1000, 3)
+            if include_metadata:
+                validator_metadata[name] = {
+                    "outcome": result.outcome,
+                    "error": getattr(result, 'error_message', None),
+                    "metadata": getattr(result, 'metadata', None) or {},
+                }
+
+            if result.outcome == "fail":
+                all_passed = False
+                fix_value = getattr(result, 'fix_value', None)
+                on_fail = getattr(validator.on_fail_descriptor, "value", validator.on_fail_descriptor)
+                validation_info.append({
+                    "validator": name,
+                    "error": getattr(result, 'error_message', None) or 'Validation failed',
+                    "metadata": getattr(result, 'metadata', None) or {},
+                    "on_fail": on_fail,
+                    # "reask" declarado, "fix" que não conseguiu corrigir (ex.: resposta
+                    # curta) ou "fix" paliativo (ex.: citação inventada trocada por aviso)
+                    "needs_reask": on_fail == "reask" or (
+                        on_fail == "fix" and (not fix_value or getattr(validator, "reask_after_fix", False))
+                    ),
+                })
+
+                if fix_value:
+                    cleaned_text = fix_value
+
+        result = {
+            "is_valid": all_passed,
+            "cleaned_text": cleaned_text,
+            "validation_info": validation_info,
+            "needs_reask": any(info["needs_reask"] for info in validation_info),
+            "timings_ms": timings_ms,
         }
+        if include_metadata:
+            result["validator_metadata"] = validator_metadata
+        if cache is not None:
+            cache.put(key, result)
+        return result
 
-        # Adiciona validators avançados (Fase 2)
-        validators.extend([
-            HallucinationDetection(threshold=0.7, on_fail="reask"),
-            ValidSumulaReference(min_sumula=1, max_sumula=200, on_fail="reask")
-        ])
 
-    cleaned_text = text
-    all_passed = True
-    validation_info = []
+def describe_reask_issues(validation_info: List[Dict[str, Any]]) -> List[str]:
+    """
+    Descreve, para o novo prompt ao LLM, os problemas que pedem regeneração.
 
-    for validator in validators:
-        # Usa metadata específico para validators da Fase 2
-        metadata = {}
-        if isinstance(validator, (HallucinationDetection, ValidSumulaReference)):
-            metadata = hallucination_metadata
+    Inclui os detalhes dos validators (súmulas não recuperadas, citações não
+    encontradas, frases sem base) além da mensagem de erro.
+    """
+    issues = []
+    for info in validation_info:
+        if not info.get("needs_reask"):
+            continue
+        metadata = info.get("metadata", {})
+
+        if info["validator"] == "HallucinationDetection":
+            issues.extend(metadata.get("issues") or [info["error"]])
+        elif info["validator"] == "ValidSumulaReference":
+            invalid = metadata.get("invalid_sumulas", []) + metadata.get("out_of_range_sumulas", [])
+            if invalid:
+                issues.append(f"Súmulas inexistentes citadas: {', '.join(invalid)}")
+            revoked = metadata.get("unacknowledged_revoked", [])
+            if revoked:
+                issues.append(
+                    "Súmulas REVOGADAS citadas como vigentes: "
+                    + ", ".join(revoked)
+                )
+            if metadata.get("not_retrieved_sumulas"):
+                issues.append(
+                    "Súmulas citadas mas não presentes no contexto: "
+                    + ", ".join(metadata["not_retrieved_sumulas"])
+                )
+            if not (invalid or revoked or metadata.get("not_retrieved_sumulas")):
+                issues.append(info["error"])
+        elif info["validator"] == "VerbatimQuoteCheck":
+            issues.extend(
+                f'Citação não encontrada literalmente no contexto: "{quote["text"]}"'
+                for quote in metadata.get("fabricated_quotes", [])
+            )
+        elif info["validator"] == "SemanticGrounding":
+            issues.extend(
+                f'Frase sem base no contexto: "{sentence}"'
+                for sentence in metadata.get("unsupported_sentences", [])
+            )
+        else:
+            issues.append(info["error"])
+    return issues
 
-        result = validator.validate(cleaned_text, metadata)
 
-        if result.outcome == "fail":
-            all_passed = False
-            error_msg = getattr(result, 'error_message', 'Validation failed')
-            validation_info.append({
-                "validator": validator.__class__.__name__,
-                "error": error_msg,
-                "metadata": result.metadata if hasattr(result, 'metadata') else {}
-            })
+@lru_cache(maxsize=8)
+def get_validation_pipeline(**config: Any) -> ValidationPipeline:
+    """Retorna o pipeline de validação da configuração, construído uma única vez."""
+    return ValidationPipeline(**config)
 
-            if hasattr(result, 'fixed_value') and result.fixed_value:
-                cleaned_text = result.fixed_value
 
-    return {
-        "is_valid": all_passed,
-        "cleaned_text": cleaned_text,
-        "validation_info": validation_info
-    }
+class ValidationCache:
+    """
+    Cache LRU de resultados de validação, com tamanho limitado.
+
+    A chave combina o hash da resposta, os ids e o hash do conteúdo dos pontos
+    recuperados e a configuração dos validators. Respostas repetidas,
+    reenviadas ou reavaliadas custam uma consulta ao dict. Seguro para uso
+    entre threads (Streamlit). Resultados são copiados (cópia profunda) ao
+    gravar e a cada acerto: quem altera o resultado recebido (ex.: o reask)
+    não afeta os acertos seguintes.
+
+    Example:
+        >>> cache = ValidationCache(max_size=1024)
+        >>> validate_output(resposta, context_docs=docs, cache=cache)
+        >>> cache.stats()
+        {'size': 1, 'hits': 0, 'misses': 1}
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        text: str,
+        context_docs: Optional[List[Any]],
+        config: Dict[str, Any],
+    ) -> str:
+        """Impressão digital de (resposta, documentos recuperados, configuração)."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00" + context_fingerprint(context_docs).encode("utf-8"))
+        digest.update(b"\x01" + json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+        return dict(copy.deepcopy(result), cached=True)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._results), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def validate_output(
+    text: str,
+    context_docs: Optional[List[Any]] = None,
+    enable_hallucination_detection: bool = True,
+    pipeline: Optional[ValidationPipeline] = None,
+    cache: Optional[ValidationCache] = None,
+) -> Dict[str, Any]:
+    """
+    Valida o output do LLM antes de retornar ao usuário.
+
+    Args:
+        text: Resposta gerada pelo LLM
+        context_docs: Lista de documentos recuperados (para detecção de alucinações)
+        enable_hallucination_detection: Se True, ativa detecção de alucinações
+        pipeline: Pipeline pré-construído (padrão: pipeline padrão compartilhado)
+        cache: Cache de resultados (opcional, ver `ValidationCache`)
+
+    Returns:
+        Dict com 'is_valid', 'cleaned_text', 'validation_info', 'needs_reask' e
+        'timings_ms' ('cached': True quando vem do cache)
+
+    Example:
+        >>> result = validate_output("Resposta com merda aqui")
+        >>> print(result['cleaned_text'])  # "Resposta com [removido] aqui"
+    """
+    pipeline = pipeline or get_validation_pipeline()
+    return pipeline.validate(
+        text,
+        context_docs=context_docs,
+        enable_hallucination_detection=enable_hallucination_detection,
+        cache=cache,
+    )
@@ -0,0 +1,169 @@
+"""
+Registro das súmulas existentes e seus status, para validar citações.
+
+Compacto e com consulta O(1): um `bytearray` indexado pelo número da súmula,
+em que cada byte é o código do status (0 = súmula inexistente). Números acima
+de `MAX_SUMULA_NUMBER` (ex.: um número inválido vindo de um payload) são
+ignorados e tratados como inexistentes, sem alocar uma tabela desse tamanho.
+É carregado uma vez da coleção (ou de um snapshot JSON) e recarregado quando
+a versão da coleção (`app.ingest.versioning`) muda, ou seja, após cada
+re-ingestão.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import re
+
+from qdrant_client import QdrantClient
+
+from app.ingest.versioning import get_collection_version
+
+REVOKED_STATUS = "REVOGADA"
+
+# Maior número de súmula aceito no registro (tamanho máximo da tabela)
+MAX_SUMULA_NUMBER = 100_000
+
+_NUMBER_REGEX = re.compile(r"\d+")
+
+
+def _parse_number(value) -> Optional[int]:
+    """Número da súmula a partir do payload ("070", "Súmula 70", 70)."""
+    match = _NUMBER_REGEX.search(str(value or ""))
+    return int(match.group()) if match else None
+
+
+class SumulaRegistry:
+    """
+    Súmulas existentes e status atual, indexados pelo número.
+
+    Example:
+        >>> registry = SumulaRegistry.from_collection(client, "sumulas_tcemg")
+        >>> registry.exists(70), registry.status(70)
+        (True, 'VIGENTE')
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str]] = (), version: int = 0):
+        self.version = version
+        # Código 0 = inexistente; os demais indexam self.statuses
+        self.statuses: List[str] = [""]
+        self._codes: Dict[str, int] = {}
+        self._table = bytearray()
+        for number, status in entries:
+            self.set(number, status)
+
+    def set(self, number: int, status: str) -> None:
+        """Registra (ou atualiza) o status de uma súmula (fora de 0..MAX_SUMULA_NUMBER, ignora)."""
+        if not 0 <= number <= MAX_SUMULA_NUMBER:
+            print(f"⚠️ Número de súmula ignorado no registro: {number}")
+            return
+        status = (status or "DESCONHECIDO").strip().upper()
+        if status not in self._codes:
+            if len(self.statuses) > 255:
+                raise ValueError("Registro suporta no máximo 255 status distintos")
+            self._codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        if number >= len(self._table):
+            self._table.extend(bytes(number + 1 - len(self._table)))
+        self._table[number] = self._codes[status]
+
+    @property
+    def max_number(self) -> int:
+        """Maior número de súmula registrado (0 se vazio)."""
+        return len(self._table) - 1 if self._table else 0
+
+    def status(self, number: int) -> Optional[str]:
+        """Status atual da súmula, ou None se ela não existe."""
+        if 0 <= number < len(self._table) and self._table[number]:
+            return self.statuses[self._table[number]]
+        return None
+
+    def exists(self, number: int) -> bool:
+        return 0 <= number < len(self._table) and self._table[number] != 0
+
+    def is_revoked(self, number: int) -> bool:
+        return self.status(number) == REVOKED_STATUS
+
+    def __len__(self) -> int:
+        return len(self._table) - self._table.count(0)
+
+    @classmethod
+    def from_collection(
+        cls, client: QdrantClient, collection: str, batch_size: int = 1000
+    ) -> "SumulaRegistry":
+        """
+        Carrega o registro dos payloads da coleção (sem vetores).
+
+        Quando uma súmula aparece em vários chunks/PDFs, vale o status com a
+        data mais recente (`data_status_ano`).
+        """
+        version = get_collection_version(client, collection)
+        latest: Dict[int, Tuple[int, str]] = {}
+
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["metadata.num_sumula", "metadata.status_atual", "metadata.data_status_ano"],
+                with_vectors=False,
+            )
+            for point in points:
+                metadata = (point.payload or {}).get("metadata") or {}
+                number = _parse_number(metadata.get("num_sumula"))
+                if number is None:
+                    continue
+                year = _parse_number(metadata.get("data_status_ano")) or 0
+                if number not in latest or year >= latest[number][0]:
+                    latest[number] = (year, metadata.get("status_atual") or "")
+            if offset is None:
+                break
+
+        return cls(
+            ((number, status) for number, (_, status) in sorted(latest.items())),
+            version=version,
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> "SumulaRegistry":
+        """Carrega o registro de um snapshot JSON (ver `save`)."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            ((int(number), status) for number, status in data["sumulas"].items()),
+            version=data.get("version", 0),
+        )
+
+    def save(self, path: str) -> None:
+        """Grava o registro como snapshot JSON."""
+        data = {
+            "version": self.version,
+            "sumulas": {
+                str(number): self.statuses[code]
+                for number, code in enumerate(self._table)
+                if code
+            },
+        }
+        Path(path).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+_REGISTRIES: Dict[str, SumulaRegistry] = {}
+
+
+def get_sumula_registry(client: QdrantClient, collection: str) -> SumulaRegistry:
+    """
+    Registro da coleção, carregado uma vez e recarregado após re-ingestões.
+
+    A cada chamada só a versão da coleção é consultada (um `retrieve` de um
+    ponto); o registro é relido apenas quando a versão muda.
+    """
+    registry = _REGISTRIES.get(collection)
+    if registry is None or registry.version != get_collection_version(client, collection):
+        registry = SumulaRegistry.from_collection(client, collection)
+        _REGISTRIES[collection] = registry
+        print(
+            f"📚 Registro de súmulas carregado: {len(registry)} súmulas "
+            f"(coleção '{collection}' v{registry.version})"
+        )
+    return registry
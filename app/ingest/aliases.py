@@ -0,0 +1,240 @@
+"""
+Reindexação blue/green com coleções versionadas atrás de um alias.
+
+As consultas usam o nome `sumulas_tcemg` (settings.QDRANT_COLLECTION), que é um
+alias do Qdrant apontando para uma coleção versionada (`sumulas_tcemg_v{n}`).
+Uma reconstrução completa grava em uma nova versão, sem tocar na que está no
+ar; só depois de validada (contagem de pontos e indexação concluída) o alias é
+trocado em uma única operação atômica. Versões antigas são apagadas, mantendo
+as `keep` anteriores para rollback.
+
+A ingestão incremental (`--watch` e execuções sem `--rebuild`) continua
+gravando pelo alias, ou seja, na versão ativa. Durante uma reconstrução, a
+versão ativa fica marcada no manifesto (`rebuild_lease`) e o watch pausa:
+mudanças gravadas na versão ativa depois que a reconstrução leu a pasta se
+perderiam na troca do alias. O watch as aplica na nova versão ao retomar.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import re
+import time
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest.versioning import (
+    REBUILD_LEASE_KEY,
+    bump_collection_version,
+    get_collection_version,
+    read_manifest,
+    write_manifest,
+)
+
+# Validade da marca de reconstrução (renovada a cada PDF; vence sozinha após um crash)
+DEFAULT_REBUILD_LEASE_TTL = 1800.0
+
+
+def versioned_name(alias: str, version: int) -> str:
+    return f"{alias}_v{version}"
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Coleção para a qual o alias aponta (None se o alias não existe)."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def list_versions(client: QdrantClient, alias: str) -> List[Tuple[int, str]]:
+    """Coleções versionadas do alias, em ordem crescente de versão."""
+    pattern = re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+    versions = []
+    for collection in client.get_collections().collections:
+        match = pattern.match(collection.name)
+        if match:
+            versions.append((int(match.group(1)), collection.name))
+    return sorted(versions)
+
+
+def pending_version(client: QdrantClient, alias: str) -> Optional[str]:
+    """Versão mais nova ainda não promovida (reconstrução interrompida), se houver."""
+    versions = list_versions(client, alias)
+    active = resolve_alias(client, alias)
+    if versions and versions[-1][1] != active:
+        if versions[-1][0] > _active_number(versions, active):
+            return versions[-1][1]
+    return None
+
+
+def next_version_name(client: QdrantClient, alias: str) -> str:
+    versions = list_versions(client, alias)
+    return versioned_name(alias, versions[-1][0] + 1 if versions else 1)
+
+
+def point_count(client: QdrantClient, collection: str) -> int:
+    """Pontos da coleção, sem o ponto de manifesto da versão."""
+    count = client.count(collection_name=collection, exact=True).count
+    return count - 1 if read_manifest(client, collection) is not None else count
+
+
+@contextmanager
+def rebuild_lease(
+    client: QdrantClient,
+    alias: str,
+    ttl: float = DEFAULT_REBUILD_LEASE_TTL,
+    shard_key: Optional[str] = None,
+) -> Iterator[Callable[[], None]]:
+    """
+    Marca a versão ativa como em reconstrução (o watch pausa enquanto durar).
+
+    Produz uma função que renova o prazo; a marca é removida na saída, mesmo
+    com erro. Sem versão ativa (primeira reconstrução) não há o que marcar.
+    """
+    live = resolve_alias(client, alias) or (alias if client.collection_exists(alias) else None)
+
+    def renew() -> None:
+        if live is not None:
+            manifest = read_manifest(client, live) or {}
+            write_manifest(client, live, {**manifest, REBUILD_LEASE_KEY: time.time() + ttl}, shard_key=shard_key)
+
+    renew()
+    try:
+        yield renew
+    finally:
+        if live is not None:
+            manifest = read_manifest(client, live) or {}
+            manifest.pop(REBUILD_LEASE_KEY, None)
+            write_manifest(client, live, manifest, shard_key=shard_key)
+
+
+def wait_until_indexed(client: QdrantClient, collection: str, timeout: float = 600.0) -> None:
+    """Espera a indexação (HNSW) terminar, para a nova versão não entrar no ar com busca exaustiva."""
+    # Com a indexação desligada a coleção fica GREEN sem nunca construir o grafo
+    if client.get_collection(collection).config.optimizer_config.indexing_threshold == 0:
+        raise RuntimeError(f"Indexação desligada em '{collection}' (indexing_threshold=0); alias não alterado")
+    deadline = time.monotonic() + timeout
+    while client.get_collection(collection).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Coleção '{collection}' não terminou de indexar em {timeout:.0f}s")
+        time.sleep(1.0)
+
+
+def promote(
+    client: QdrantClient,
+    alias: str,
+    collection: str,
+    expected_count: int,
+    max_shrink: float = 0.1,
+    drop_legacy: bool = False,
+    shard_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Valida a nova versão e aponta o alias para ela atomicamente.
+
+    Args:
+        expected_count: Pontos gravados pela reconstrução (a coleção deve ter exatamente esses)
+        max_shrink: Redução máxima aceita em relação à versão ativa (0.1 = 10%)
+        drop_legacy: Apaga uma coleção comum com o nome do alias (layout antigo,
+            gravado no lugar). Necessário uma única vez; as consultas falham
+            entre a remoção e a criação do alias
+        shard_key: Chave de shard da nova versão (sharding customizado)
+
+    Returns:
+        Dict com 'previous', 'active', 'count' e 'version'
+    """
+    count = point_count(client, collection)
+    if count != expected_count:
+        raise RuntimeError(
+            f"'{collection}' tem {count} pontos, esperados {expected_count}; alias não alterado"
+        )
+
+    previous = resolve_alias(client, alias)
+    legacy = previous is None and client.collection_exists(alias)
+    if legacy and not drop_legacy:
+        raise RuntimeError(
+            f"Já existe uma coleção comum chamada '{alias}'; use drop_legacy "
+            f"(--drop-legacy) para substituí-la pelo alias"
+        )
+    live = previous or (alias if legacy else None)
+    if live is not None:
+        live_count = point_count(client, live)
+        if count < live_count * (1 - max_shrink):
+            raise RuntimeError(
+                f"'{collection}' tem {count} pontos contra {live_count} em '{live}' "
+                f"(redução acima de {max_shrink:.0%}); alias não alterado"
+            )
+
+    wait_until_indexed(client, collection)
+
+    # A versão continua crescendo entre coleções: caches por versão (ex.: o
+    # registro de súmulas) são invalidados na troca
+    live_version = get_collection_version(client, live) if live else 0
+    version = bump_collection_version(
+        client,
+        collection,
+        changed=[f"promoção a '{alias}'"],
+        at_least=live_version + 1,
+        shard_key=shard_key,
+    )
+
+    if legacy:
+        client.delete_collection(alias)
+
+    operations: List[Any] = []
+    if previous is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+    operations.append(
+        models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=collection, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+    return {"previous": previous, "active": collection, "count": count, "version": version}
+
+
+def _active_number(versions: List[Tuple[int, str]], active: Optional[str]) -> int:
+    return next((n for n, name in versions if name == active), 0)
+
+
+def drop_pending_versions(client: QdrantClient, alias: str) -> List[str]:
+    """
+    Apaga as versões mais novas que a ativa (reconstruções interrompidas).
+
+    Chamada ao iniciar uma reconstrução sem `--resume`: a versão pendente não
+    será mais retomada e ficaria ocupando espaço (e possivelmente sem índice).
+
+    Returns:
+        Nomes das coleções apagadas
+    """
+    versions = list_versions(client, alias)
+    active_number = _active_number(versions, resolve_alias(client, alias))
+    removed = [name for n, name in versions if n > active_number]
+    for name in removed:
+        client.delete_collection(name)
+    return removed
+
+
+def garbage_collect(client: QdrantClient, alias: str, keep: int = 1) -> List[str]:
+    """
+    Apaga as versões antigas, mantendo a ativa e as `keep` anteriores a ela.
+
+    Das versões mais novas que a ativa, só a mais nova (a que `--resume`
+    retomaria) é mantida; as demais são reconstruções abandonadas.
+
+    Returns:
+        Nomes das coleções apagadas
+    """
+    active = resolve_alias(client, alias)
+    versions = list_versions(client, alias)
+    active_number = _active_number(versions, active)
+    if not active_number:
+        return []
+
+    older = [name for n, name in versions if n < active_number]
+    abandoned = [name for n, name in versions if n > active_number][:-1]
+    removed = older[: max(0, len(older) - keep)] + abandoned
+    for name in removed:
+        client.delete_collection(name)
+    return removed
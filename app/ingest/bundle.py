@@ -0,0 +1,370 @@
+"""
+Exportação e importação da coleção em um bundle compacto e versionado.
+
+Subir um ambiente novo exigia reingerir tudo (LLM + embeddings) ou depender
+dos snapshots do Qdrant Cloud. O bundle é um diretório com:
+
+- `manifest.json`: formato, coleção e versão de origem, dimensão, tipo dos
+  vetores, modelo de embeddings e SHA-256 de cada arquivo
+- `ids.json`: IDs dos pontos, na ordem das linhas
+- `dense.npy`: vetores `text-dense` (float32 ou float16, N × dimensão)
+- `sparse_*.npy`: vetores `text-sparse` em CSR (só se a coleção tiver)
+- `payloads.json.gz`: payloads em colunas (`page_content`, `metadata.num_sumula`, ...)
+
+A importação confere os checksums e carrega o bundle em qualquer Qdrant (ou
+no Qdrant local, em memória ou em disco) em lotes, sem chamadas à OpenAI.
+
+Como executar:
+    uv run python -m app.ingest.bundle export --out snapshots/sumulas --dtype float16
+    uv run python -m app.ingest.bundle import --bundle snapshots/sumulas --collection sumulas_tcemg
+    uv run python -m app.ingest.bundle import --bundle snapshots/sumulas --local-path .qdrant_local
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import gzip
+import json
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest.aliases import point_count
+from app.ingest.embed_qdrant import EMBEDDING_MODEL
+from app.ingest.extract_text import ensure_collection
+from app.ingest.journal import file_sha256
+from app.ingest.sharding import ShardingConfig
+from app.ingest.storage import QUANTIZATION_CHOICES, VectorStorageConfig, indexing_paused
+from app.ingest.text_store import TextStore
+from app.ingest.versioning import MANIFEST_POINT_ID, bump_collection_version, get_collection_version
+
+BUNDLE_FORMAT = 1
+DTYPE_CHOICES = ("float32", "float16")
+
+MANIFEST_FILE = "manifest.json"
+IDS_FILE = "ids.json"
+DENSE_FILE = "dense.npy"
+SPARSE_FILES = ("sparse_rows.npy", "sparse_indptr.npy", "sparse_indices.npy", "sparse_values.npy")
+PAYLOADS_FILE = "payloads.json.gz"
+
+
+def _flatten(payload: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """{"metadata": {"num_sumula": "70"}} → {"metadata.num_sumula": "70"}."""
+    flat = {}
+    for key, value in payload.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {}
+    for name, value in flat.items():
+        *parents, key = name.split(".")
+        node = payload
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return payload
+
+
+def payload_columns(payloads: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Payloads em colunas: {campo: {"values": [...], "missing": [linhas sem o campo]}}.
+
+    Campos ausentes são distinguidos de valores nulos (filtros `is_null` e
+    `is_empty` do Qdrant tratam os dois de forma diferente).
+    """
+    rows = [_flatten(p or {}) for p in payloads]
+    names = sorted({name for row in rows for name in row})
+    columns = {}
+    for name in names:
+        columns[name] = {
+            "values": [row.get(name) for row in rows],
+            "missing": [i for i, row in enumerate(rows) if name not in row],
+        }
+    return columns
+
+
+def payload_rows(columns: Dict[str, Dict[str, Any]], num_rows: int) -> List[Dict[str, Any]]:
+    """Inverso de `payload_columns`."""
+    flat_rows: List[Dict[str, Any]] = [{} for _ in range(num_rows)]
+    for name, column in columns.items():
+        missing = set(column["missing"])
+        for i, value in enumerate(column["values"]):
+            if i not in missing:
+                flat_rows[i][name] = value
+    return [_unflatten(row) for row in flat_rows]
+
+
+def _scroll_points(client: QdrantClient, collection: str, batch_size: int) -> Iterator[models.Record]:
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for point in points:
+            if str(point.id) != MANIFEST_POINT_ID:
+                yield point
+        if offset is None:
+            break
+
+
+def export_bundle(
+    client: QdrantClient,
+    collection: str,
+    out_dir: str,
+    dtype: str = "float32",
+    batch_size: int = 256,
+) -> Dict[str, Any]:
+    """
+    Exporta os pontos da coleção (IDs, vetores e payloads) para `out_dir`.
+
+    Args:
+        dtype: Tipo dos vetores densos no bundle (float16 = metade do tamanho)
+
+    Returns:
+        Manifesto gravado
+    """
+    if dtype not in DTYPE_CHOICES:
+        raise ValueError(f"Tipo inválido: {dtype} (use {', '.join(DTYPE_CHOICES)})")
+    start = time.perf_counter()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    ids: List[Any] = []
+    dense: List[List[float]] = []
+    payloads: List[Dict[str, Any]] = []
+    sparse_rows: List[int] = []
+    sparse_indices: List[List[int]] = []
+    sparse_values: List[List[float]] = []
+    for point in _scroll_points(client, collection, batch_size):
+        vectors = point.vector or {}
+        if "text-dense" not in vectors:
+            raise ValueError(f"Ponto {point.id} sem vetor 'text-dense'")
+        sparse = vectors.get("text-sparse")
+        if sparse is not None:
+            sparse_rows.append(len(ids))
+            sparse_indices.append(list(sparse.indices))
+            sparse_values.append(list(sparse.values))
+        ids.append(point.id)
+        dense.append(vectors["text-dense"])
+        payloads.append(point.payload or {})
+
+    if not ids:
+        raise ValueError(f"Coleção '{collection}' sem pontos para exportar")
+
+    dense_array = np.asarray(dense, dtype=np.float32).astype(dtype)
+    np.save(out / DENSE_FILE, dense_array, allow_pickle=False)
+    (out / IDS_FILE).write_text(json.dumps([str(i) if not isinstance(i, int) else i for i in ids]))
+    with gzip.open(out / PAYLOADS_FILE, "wt", encoding="utf-8") as f:
+        json.dump(payload_columns(payloads), f, ensure_ascii=False)
+    files = [IDS_FILE, DENSE_FILE, PAYLOADS_FILE]
+
+    if sparse_rows:
+        indptr = np.cumsum([0] + [len(i) for i in sparse_indices], dtype=np.int64)
+        arrays = (
+            np.asarray(sparse_rows, dtype=np.int64),
+            indptr,
+            np.asarray([i for row in sparse_indices for i in row], dtype=np.uint32),
+            np.asarray([v for row in sparse_values for v in row], dtype=np.float32),
+        )
+        for name, array in zip(SPARSE_FILES, arrays):
+            np.save(out / name, array, allow_pickle=False)
+        files.extend(SPARSE_FILES)
+
+    info = client.get_collection(collection)
+    dense_params = info.config.params.vectors["text-dense"]
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "collection": collection,
+        "collection_version": get_collection_version(client, collection),
+        "created_at": time.time(),
+        "points": len(ids),
+        "dim": int(dense_array.shape[1]),
+        "dtype": dtype,
+        "distance": getattr(dense_params.distance, "value", dense_params.distance),
+        "embedding_model": EMBEDDING_MODEL,
+        "sparse": bool(sparse_rows),
+        "files": {name: {"sha256": file_sha256(out / name), "bytes": (out / name).stat().st_size} for name in files},
+    }
+    (out / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    manifest["elapsed_s"] = round(time.perf_counter() - start, 1)
+    return manifest
+
+
+def verify_bundle(bundle_dir: str) -> Dict[str, Any]:
+    """
+    Lê o manifesto e confere o SHA-256 de cada arquivo.
+
+    Raises:
+        ValueError: Formato desconhecido, arquivo ausente ou checksum divergente
+    """
+    bundle = Path(bundle_dir)
+    manifest = json.loads((bundle / MANIFEST_FILE).read_text())
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Formato de bundle não suportado: {manifest.get('format')} (esperado: {BUNDLE_FORMAT})")
+    for name, info in manifest["files"].items():
+        path = bundle / name
+        if not path.exists():
+            raise ValueError(f"Arquivo ausente no bundle: {name}")
+        if file_sha256(path) != info["sha256"]:
+            raise ValueError(f"Checksum divergente em {name}: bundle corrompido ou alterado")
+    return manifest
+
+
+def load_bundle(bundle_dir: str) -> Tuple[Dict[str, Any], List[Any], np.ndarray, List[Dict[str, Any]], Dict[int, models.SparseVector]]:
+    """
+    Carrega o bundle conferido: (manifesto, ids, vetores densos float32, payloads, vetores esparsos por linha).
+    """
+    manifest = verify_bundle(bundle_dir)
+    bundle = Path(bundle_dir)
+    ids = json.loads((bundle / IDS_FILE).read_text())
+    dense = np.load(bundle / DENSE_FILE, allow_pickle=False).astype(np.float32)
+    with gzip.open(bundle / PAYLOADS_FILE, "rt", encoding="utf-8") as f:
+        payloads = payload_rows(json.load(f), manifest["points"])
+
+    sparse: Dict[int, models.SparseVector] = {}
+    if manifest.get("sparse"):
+        rows, indptr, indices, values = (np.load(bundle / name, allow_pickle=False) for name in SPARSE_FILES)
+        for n, row in enumerate(rows):
+            start, end = indptr[n], indptr[n + 1]
+            sparse[int(row)] = models.SparseVector(
+                indices=indices[start:end].tolist(), values=values[start:end].tolist()
+            )
+
+    if not (len(ids) == len(dense) == len(payloads) == manifest["points"]):
+        raise ValueError("Bundle inconsistente: número de IDs, vetores e payloads diferente do manifesto")
+    return manifest, ids, dense, payloads, sparse
+
+
+def import_bundle(
+    client: QdrantClient,
+    bundle_dir: str,
+    collection: str,
+    storage: Optional[VectorStorageConfig] = None,
+    sharding: Optional[ShardingConfig] = None,
+    batch_size: int = 512,
+    text_store: Optional[TextStore] = None,
+) -> Dict[str, Any]:
+    """
+    Carrega o bundle em uma coleção nova (criada com `storage`/`sharding`).
+
+    A indexação HNSW fica pausada durante a carga. A versão da coleção
+    continua a partir da versão de origem (caches por versão são invalidados).
+    Com `text_store`, os textos dos chunks também vão para o store local.
+
+    Returns:
+        Dict com 'count', 'version', 'source_version' e 'elapsed_s'
+    """
+    start = time.perf_counter()
+    manifest, ids, dense, payloads, sparse = load_bundle(bundle_dir)
+    if client.collection_exists(collection):
+        raise ValueError(f"A coleção '{collection}' já existe; escolha outro nome")
+
+    ensure_collection(SimpleNamespace(client=client), collection, storage, dim=manifest["dim"], sharding=sharding)
+    shard_key = sharding.shard_key if sharding else None
+    with indexing_paused(client, collection):
+        for begin in range(0, len(ids), batch_size):
+            rows = range(begin, min(begin + batch_size, len(ids)))
+            points = []
+            for i in rows:
+                vector: Dict[str, Any] = {"text-dense": dense[i].tolist()}
+                if i in sparse:
+                    vector["text-sparse"] = sparse[i]
+                points.append(models.PointStruct(id=ids[i], vector=vector, payload=payloads[i]))
+            client.upsert(collection_name=collection, points=points, wait=True, shard_key_selector=shard_key)
+            if text_store is not None:
+                text_store.put_many(payloads[i]["page_content"] for i in rows if payloads[i].get("page_content"))
+
+    count = point_count(client, collection)
+    if count != manifest["points"]:
+        raise RuntimeError(f"'{collection}' tem {count} pontos, esperados {manifest['points']}")
+
+    version = bump_collection_version(
+        client,
+        collection,
+        changed=[f"import do bundle de '{manifest['collection']}'"],
+        at_least=manifest["collection_version"] + 1,
+        shard_key=shard_key,
+    )
+    return {
+        "count": count,
+        "version": version,
+        "source_version": manifest["collection_version"],
+        "elapsed_s": round(time.perf_counter() - start, 1),
+    }
+
+
+if __name__ == "__main__":
+    from app.ingest import aliases
+    from app.ingest.embed_qdrant import qdrant_connection_kwargs
+    from app.utils.settings import settings
+
+    parser = argparse.ArgumentParser(description="Exporta/importa a coleção em um bundle compacto")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Exporta a coleção (ou alias) para um diretório")
+    export_parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    export_parser.add_argument("--out", required=True, help="Diretório do bundle")
+    export_parser.add_argument("--dtype", choices=DTYPE_CHOICES, default="float32")
+
+    import_parser = commands.add_parser("import", help="Carrega um bundle em uma coleção nova")
+    import_parser.add_argument("--bundle", required=True, help="Diretório do bundle")
+    import_parser.add_argument(
+        "--collection",
+        default=settings.QDRANT_COLLECTION,
+        help="Coleção de destino; com --promote, alias que passa a apontar para a nova versão",
+    )
+    import_parser.add_argument("--local-path", help="Carrega no Qdrant local em disco (sem servidor)")
+    import_parser.add_argument("--promote", action="store_true", help="Importa na próxima versão do alias e troca o alias")
+    import_parser.add_argument("--quantization", choices=QUANTIZATION_CHOICES, default="none")
+    import_parser.add_argument("--on-disk-vectors", action="store_true")
+    import_parser.add_argument("--text-store", default=settings.TEXT_STORE_PATH or None)
+    args = parser.parse_args()
+
+    if getattr(args, "local_path", None):
+        client = QdrantClient(path=args.local_path)
+    elif settings.QDRANT_URL and settings.QDRANT_API_KEY:
+        client = QdrantClient(
+            url=settings.QDRANT_URL,
+            api_key=settings.QDRANT_API_KEY,
+            **qdrant_connection_kwargs(settings.QDRANT_INGEST_TIMEOUT),
+        )
+    else:
+        client = QdrantClient(
+            host=settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            **qdrant_connection_kwargs(settings.QDRANT_INGEST_TIMEOUT),
+        )
+
+    if args.command == "export":
+        collection = aliases.resolve_alias(client, args.collection) or args.collection
+        manifest = export_bundle(client, collection, args.out, dtype=args.dtype)
+        size = sum(f["bytes"] for f in manifest["files"].values())
+        print(
+            f"✅ {manifest['points']} pontos de '{collection}' (v{manifest['collection_version']}) exportados "
+            f"para '{args.out}' ({size / 1024 / 1024:.1f} MB, {manifest['dtype']}) em {manifest['elapsed_s']}s"
+        )
+    else:
+        target = aliases.next_version_name(client, args.collection) if args.promote else args.collection
+        result = import_bundle(
+            client,
+            args.bundle,
+            target,
+            storage=VectorStorageConfig(quantization=args.quantization, on_disk=args.on_disk_vectors),
+            text_store=TextStore(args.text_store) if args.text_store else None,
+        )
+        print(f"✅ {result['count']} pontos importados em '{target}' (v{result['version']}) em {result['elapsed_s']}s")
+        if args.promote:
+            aliases.promote(client, args.collection, target, result["count"])
+            print(f"🔀 '{args.collection}' → '{target}'")
@@ -0,0 +1,128 @@
+"""
+Divisão das seções das súmulas em sub-chunks limitados por tokens.
+
+Cada seção extraída (conteudo_principal, referencias_normativas, precedentes)
+é quebrada em janelas de no máximo `max_tokens` tokens, com sobreposição de
+`overlap_tokens` entre janelas consecutivas. Assim cada chunk recuperado tem
+tamanho previsível no prompt de geração.
+"""
+
+from functools import lru_cache
+from typing import List
+import math
+import re
+
+# Encoding usado pelo text-embedding-3-large e pelo gpt-4o-mini (aproximação)
+ENCODING_NAME = "cl100k_base"
+
+DEFAULT_MAX_TOKENS = 400
+DEFAULT_OVERLAP_TOKENS = 50
+
+# Palavra + espaços seguintes (preserva quebras de linha/parágrafo)
+_PIECE_PATTERN = re.compile(r"\S+\s*")
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Carrega o encoding do tiktoken; retorna None se indisponível (ex.: offline)."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Conta tokens do texto.
+
+    Usa o tiktoken quando disponível; caso contrário, aproxima por
+    ~4 caracteres por token.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, math.ceil(len(text) / 4))
+
+
+def split_text(
+    text: str,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> List[str]:
+    """
+    Divide o texto em sub-chunks de no máximo `max_tokens` tokens.
+
+    O corte é feito entre palavras, preferindo fronteiras de parágrafo quando
+    estas caem na segunda metade da janela. Janelas consecutivas compartilham
+    até `overlap_tokens` tokens finais da janela anterior.
+
+    Args:
+        text: Texto da seção
+        max_tokens: Tamanho máximo de cada sub-chunk (em tokens)
+        overlap_tokens: Sobreposição entre sub-chunks consecutivos (em tokens)
+
+    Returns:
+        Lista de sub-chunks (vazia se o texto for vazio)
+
+    Example:
+        >>> split_text("texto curto")
+        ['texto curto']
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens deve ser positivo")
+    if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens deve estar entre 0 e max_tokens - 1")
+
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    pieces = _PIECE_PATTERN.findall(text)
+    costs = [count_tokens(piece) for piece in pieces]
+
+    if sum(costs) <= max_tokens:
+        return [text]
+
+    chunks = []
+    start = 0
+    total_pieces = len(pieces)
+
+    while start < total_pieces:
+        # Preenche a janela até o limite (sempre ao menos uma palavra)
+        end = start
+        window_tokens = 0
+        while end < total_pieces and (
+            window_tokens + costs[end] <= max_tokens or end == start
+        ):
+            window_tokens += costs[end]
+            end += 1
+
+        # Prefere cortar em fronteira de parágrafo na segunda metade da janela
+        if end < total_pieces:
+            half = start + (end - start) // 2
+            for cut in range(end, half, -1):
+                if "\n\n" in pieces[cut - 1]:
+                    end = cut
+                    break
+
+        chunks.append("".join(pieces[start:end]).strip())
+
+        if end >= total_pieces:
+            break
+
+        # Recua para criar a sobreposição, garantindo avanço
+        next_start = end
+        overlap = 0
+        while (
+            next_start > start + 1
+            and overlap + costs[next_start - 1] <= overlap_tokens
+        ):
+            next_start -= 1
+            overlap += costs[next_start]
+        start = next_start
+
+    return chunks
@@ -1,11 +1,74 @@
+from typing import Any, Callable, Dict, Optional
+import math
+
+import httpx
 from qdrant_client import QdrantClient
 from app.utils.settings import settings
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_qdrant import QdrantVectorStore
 
+from app.ingest.text_store import ProjectedQdrantVectorStore, TextStore
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+# Dimensão nativa do modelo; valores menores usam embeddings encurtados (Matryoshka)
+FULL_EMBEDDING_DIM = 3072
+
+
+def _rest_timeout_hook(connect: float, read: float) -> Callable[[httpx.Request], None]:
+    """Hook do httpx que separa o timeout de conexão do de leitura/escrita."""
+    timeout = httpx.Timeout(read, connect=connect).as_dict()
+
+    def hook(request: httpx.Request) -> None:
+        request.extensions["timeout"] = timeout
+
+    return hook
+
+
+def qdrant_connection_kwargs(
+    timeout: Optional[float] = None, prefer_grpc: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Parâmetros de transporte do QdrantClient, lidos de `settings`.
+
+    Args:
+        timeout: Timeout das operações em segundos (padrão: QDRANT_QUERY_TIMEOUT;
+            a ingestão usa QDRANT_INGEST_TIMEOUT)
+        prefer_grpc: Força REST (False) ou gRPC (True); padrão: QDRANT_PREFER_GRPC
+
+    REST: pool de conexões HTTP com keep-alive e timeout de conexão separado.
+    gRPC: um canal por conexão do pool, com pings de keep-alive; o timeout
+    vale para cada chamada.
+    """
+    timeout = timeout or settings.QDRANT_QUERY_TIMEOUT
+    prefer_grpc = settings.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+    pool_size = settings.QDRANT_POOL_SIZE
+    keepalive = settings.QDRANT_KEEPALIVE_SECONDS
+    connect = min(settings.QDRANT_CONNECT_TIMEOUT, timeout)
+
+    kwargs: Dict[str, Any] = {
+        "timeout": math.ceil(timeout),
+        "prefer_grpc": prefer_grpc,
+        "grpc_port": settings.QDRANT_GRPC_PORT,
+        "event_hooks": {"request": [_rest_timeout_hook(connect, timeout)]},
+    }
+    if prefer_grpc:
+        kwargs["pool_size"] = pool_size
+        if keepalive > 0:
+            kwargs["grpc_options"] = {
+                "grpc.keepalive_time_ms": int(keepalive * 1000),
+                "grpc.keepalive_timeout_ms": int(connect * 1000),
+            }
+    else:
+        kwargs["limits"] = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size if keepalive > 0 else 0,
+            keepalive_expiry=keepalive,
+        )
+    return kwargs
+
 
 class EmbeddingSelfQuery:
-    def __init__(self) -> None:
+    def __init__(self, dim: Optional[int] = None, timeout: Optional[float] = None) -> None:
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
         # Connect to Qdrant Cloud if URL is provided, otherwise use local
@@ -13,24 +76,37 @@ class EmbeddingSelfQuery:
             self.client = QdrantClient(
                 url=settings.QDRANT_URL,
                 api_key=settings.QDRANT_API_KEY,
-                timeout=120,
+                **qdrant_connection_kwargs(timeout),
             )
         else:
             self.client = QdrantClient(
                 host=settings.QDRANT_HOST,
                 port=settings.QDRANT_PORT,
-                timeout=120,
+                **qdrant_connection_kwargs(timeout),
             )
 
+        self.dim = dim or settings.EMBEDDING_DIM
         self.model = OpenAIEmbeddings(
-            model="text-embedding-3-large",
+            model=EMBEDDING_MODEL,
+            dimensions=self.dim if self.dim != FULL_EMBEDDING_DIM else None,
         )
 
-    def get_qdrant_vector_store(self, collection_name: str) -> QdrantVectorStore:
-        return QdrantVectorStore(
+    def get_qdrant_vector_store(
+        self, collection_name: str, text_store: Optional[TextStore] = None
+    ) -> QdrantVectorStore:
+        """Vector store da coleção; com `text_store`, as buscas não trazem os textos do Qdrant."""
+        kwargs = dict(
             client=self.client,
             collection_name=collection_name,
             embedding=self.model,
             sparse_vector_name="text-sparse",
             vector_name="text-dense",
         )
+        if text_store is not None:
+            return ProjectedQdrantVectorStore(text_store=text_store, **kwargs)
+        return QdrantVectorStore(**kwargs)
+
+
+def embedding_dim(embedder: Any) -> int:
+    """Dimensão dos embeddings do embedder (ou a configurada, se ele não informar)."""
+    return getattr(embedder, "dim", None) or settings.EMBEDDING_DIM
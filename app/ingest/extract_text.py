@@ -1,42 +1,120 @@
 import os
 import json
 import re
+import uuid
+import argparse
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from qdrant_client import models
-from qdrant_client.http.models import Distance, VectorParams, SparseVectorParams
+from qdrant_client.http.models import SparseVectorParams
 from markitdown import MarkItDown
-from app.ingest.embed_qdrant import EmbeddingSelfQuery
+from app.ingest.embed_qdrant import EmbeddingSelfQuery, embedding_dim
+from app.ingest.chunking import (
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_OVERLAP_TOKENS,
+    count_tokens,
+    split_text,
+)
+from app.ingest import aliases
+from app.ingest.journal import DEFAULT_JOURNAL_PATH, IngestJournal, file_sha256
+from app.ingest.payload import SumulaMetadata
+from app.ingest.payload_schema import create_indexes
+from app.ingest.sharding import ShardingConfig
+from app.ingest.storage import QUANTIZATION_CHOICES, VectorStorageConfig, indexing_paused
+from app.ingest.text_store import TEXT_DIGEST_KEY, TextStore, text_digest
+from app.ingest.versioning import bump_collection_version
+from app.utils.settings import settings
 
 md = MarkItDown()
 
 
-def process_pdf_file(
-    file_path: str, embedder: EmbeddingSelfQuery
-) -> List[Dict[str, Any]]:
-    """
-    Usa o LLM interno do embedder para extrair metadados e dividir em até 3 chunks
-    """
-    pdf_name = os.path.basename(file_path)
+def convert_pdf(file_path: str) -> str:
+    """Converte o PDF em texto (MarkItDown)."""
     result = md.convert(str(file_path))
-    text_content = result.text_content or ""
+    return result.text_content or ""
 
-    # Prompt de extração
-    prompt = f"""
-Você é um especialista jurídico do Tribunal de Contas de Minas Gerais.
-Analise o texto abaixo e extraia:
 
-1️⃣ Metadados:
+METADATA_FIELDS = """1️⃣ Metadados:
 - num_sumula: número da súmula (ex: 71)
 - data_status: última data (formato DD/MM/AA)
 - data_status_ano: última data (formato AAAA)
 - status_atual: último status (VIGENTE, REVOGADA, ALTERADA, etc.)
-- pdf_name: nome do arquivo PDF
+- pdf_name: nome do arquivo PDF"""
+
+EXTRACTION_FIELDS = METADATA_FIELDS + """
 
 2️⃣ Chunks (máximo de 3):
 - conteudo_principal: texto vigente até antes de 'REFERÊNCIAS NORMATIVAS'
 - referencias_normativas: texto após 'REFERÊNCIAS NORMATIVAS:' até antes de 'PRECEDENTES:'
-- precedentes: texto após 'PRECEDENTES:' até o final
+- precedentes: texto após 'PRECEDENTES:' até o final"""
+
+# Títulos das seções no texto convertido (divisão local, sem o LLM)
+_REFERENCIAS_HEADING = re.compile(r"REFER[ÊE]NCIAS\s+NORMATIVAS\s*:")
+_PRECEDENTES_HEADING = re.compile(r"PRECEDENTES\s*:")
+
+# Modo em lote: prompt/documento estimado fora do texto (tokens)
+BATCH_PROMPT_OVERHEAD_TOKENS = 400
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+DEFAULT_BATCH_MAX_DOCS = 8
+
+_STRING = {"type": "string"}
+
+SUMULA_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "metadados": {
+            "type": "object",
+            "properties": {
+                "num_sumula": _STRING,
+                "data_status": _STRING,
+                "data_status_ano": _STRING,
+                "status_atual": _STRING,
+                "pdf_name": _STRING,
+            },
+            "required": [
+                "num_sumula",
+                "data_status",
+                "data_status_ano",
+                "status_atual",
+                "pdf_name",
+            ],
+            "additionalProperties": False,
+        },
+        "chunks": {
+            "type": "object",
+            "properties": {
+                "conteudo_principal": _STRING,
+                "referencias_normativas": _STRING,
+                "precedentes": _STRING,
+            },
+            "required": ["conteudo_principal", "referencias_normativas", "precedentes"],
+            "additionalProperties": False,
+        },
+    },
+    "required": ["metadados", "chunks"],
+    "additionalProperties": False,
+}
+
+BATCH_EXTRACTION_SCHEMA = {
+    "title": "extracao_sumulas",
+    "description": "Metadados e seções extraídos de cada súmula do lote.",
+    "type": "object",
+    "properties": {
+        "documentos": {"type": "array", "items": SUMULA_EXTRACTION_SCHEMA},
+    },
+    "required": ["documentos"],
+    "additionalProperties": False,
+}
+
+
+def build_extraction_prompt(text_content: str, pdf_name: str) -> str:
+    """Monta o prompt de extração de metadados e seções de uma súmula."""
+    return f"""
+Você é um especialista jurídico do Tribunal de Contas de Minas Gerais.
+Analise o texto abaixo e extraia:
+
+{EXTRACTION_FIELDS}
 
 Retorne **somente** um JSON no formato:
 {{
@@ -55,98 +133,913 @@ Retorne **somente** um JSON no formato:
 }}
 
 Texto da súmula:
-{text_content[:12000]}
+{text_content}
 """
 
-    try:
-        response = embedder.llm.invoke(prompt)
-        json_text = (
-            re.sub(r"```[\w-]*", "", response.content).replace("```", "").strip()
-        )
-        data = json.loads(json_text)
 
-        metadados = data.get("metadados", {})
-        chunks = data.get("chunks", {})
+def build_metadata_prompt(text_content: str, pdf_name: str) -> str:
+    """Monta o prompt de extração só dos metadados (resposta curta)."""
+    return f"""
+Você é um especialista jurídico do Tribunal de Contas de Minas Gerais.
+Analise o texto abaixo e extraia somente:
+
+{METADATA_FIELDS}
 
-        processed = []
-        for idx, (tipo, texto) in enumerate(chunks.items()):
-            if not texto or idx >= 3:
-                continue
-            metadata = {
-                "num_sumula": metadados.get("num_sumula"),
-                "data_status": metadados.get("data_status"),
-                "data_status_ano": metadados.get("data_status_ano"),
-                "status_atual": metadados.get("status_atual"),
-                "pdf_name": metadados.get("pdf_name", pdf_name),
-                "chunk_type": tipo,
-                "chunk_index": idx,
+Retorne **somente** um JSON no formato:
+{{
+  "metadados": {{
+    "num_sumula": "...",
+    "data_status": "...",
+    "data_status_ano": "...",
+    "status_atual": "...",
+    "pdf_name": "{pdf_name}"
+  }}
+}}
+
+Texto da súmula:
+{text_content}
+"""
+
+
+def split_sections(text_content: str) -> Dict[str, str]:
+    """
+    Divide o texto nas 3 seções pelos títulos 'REFERÊNCIAS NORMATIVAS:' e
+    'PRECEDENTES:' (primeira ocorrência de cada), sem o LLM.
+
+    Sem os títulos, o texto inteiro fica em `conteudo_principal`.
+    """
+    referencias = _REFERENCIAS_HEADING.search(text_content)
+    precedentes = _PRECEDENTES_HEADING.search(text_content, referencias.end() if referencias else 0)
+    end_principal = (referencias or precedentes).start() if (referencias or precedentes) else len(text_content)
+    end_referencias = precedentes.start() if precedentes else len(text_content)
+    return {
+        "conteudo_principal": text_content[:end_principal].strip(),
+        "referencias_normativas": text_content[referencias.end():end_referencias].strip() if referencias else "",
+        "precedentes": text_content[precedentes.end():].strip() if precedentes else "",
+    }
+
+
+def parse_json_response(content: str) -> Dict[str, Any]:
+    """JSON da resposta do LLM, sem as cercas de código markdown."""
+    json_text = re.sub(r"```[\w-]*", "", content).replace("```", "").strip()
+    return json.loads(json_text)
+
+
+def build_batch_extraction_prompt(documents: List[Tuple[str, str]]) -> str:
+    """Monta o prompt de extração para um lote de súmulas (pdf_name, texto)."""
+    blocos = "\n\n".join(
+        f"### DOCUMENTO: {pdf_name}\n{text_content}"
+        for pdf_name, text_content in documents
+    )
+    return f"""
+Você é um especialista jurídico do Tribunal de Contas de Minas Gerais.
+Abaixo há {len(documents)} súmulas, cada uma iniciada por '### DOCUMENTO: <pdf_name>'.
+Para CADA documento, extraia separadamente:
+
+{EXTRACTION_FIELDS}
+
+Retorne um item em "documentos" para cada súmula, usando em metadados.pdf_name
+exatamente o nome indicado após '### DOCUMENTO:'. Seções ausentes devem ser "".
+
+{blocos}
+"""
+
+
+def pack_documents(
+    documents: List[Tuple[str, str]],
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_docs: int = DEFAULT_BATCH_MAX_DOCS,
+) -> List[List[Tuple[str, str]]]:
+    """
+    Agrupa documentos (pdf_name, texto) em lotes de até `token_budget` tokens.
+
+    Documentos que sozinhos excedem o orçamento ficam em lotes unitários.
+    """
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_tokens = BATCH_PROMPT_OVERHEAD_TOKENS
+
+    for pdf_name, text_content in documents:
+        tokens = count_tokens(text_content) + 20  # cabeçalho do documento
+        if current and (
+            current_tokens + tokens > token_budget or len(current) >= max_docs
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = BATCH_PROMPT_OVERHEAD_TOKENS
+        current.append((pdf_name, text_content))
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def extract_chunks(
+    text_content: str,
+    pdf_name: str,
+    embedder: EmbeddingSelfQuery,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> List[Dict[str, Any]]:
+    """
+    Usa o LLM interno do embedder para extrair metadados e dividir em até 3 seções.
+
+    Cada seção é subdividida em sub-chunks de no máximo `max_chunk_tokens`
+    tokens (com sobreposição de `chunk_overlap_tokens`), processando o
+    documento inteiro, sem truncamento.
+
+    Se a resposta for cortada pelo limite de tokens de saída (`finish_reason
+    == "length"`, ex.: súmulas longas, já que o LLM reescreve o texto de cada
+    seção), o LLM é chamado de novo só para os metadados e as seções são
+    divididas localmente (`split_sections`).
+
+    Levanta exceção se a chamada ao LLM ou o parsing do JSON falharem.
+    """
+    prompt = build_extraction_prompt(text_content, pdf_name)
+
+    response = embedder.llm.invoke(prompt)
+    finish_reason = (getattr(response, "response_metadata", None) or {}).get("finish_reason")
+    if finish_reason == "length":
+        print(f"⚠️ Extração de {pdf_name} cortada pelo limite de tokens; seções divididas localmente.")
+        response = embedder.llm.invoke(build_metadata_prompt(text_content, pdf_name))
+        data = {
+            "metadados": parse_json_response(response.content).get("metadados", {}),
+            "chunks": split_sections(text_content),
+        }
+    else:
+        data = parse_json_response(response.content)
+
+    return build_chunks(
+        data,
+        pdf_name,
+        max_chunk_tokens=max_chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+    )
+
+
+def extract_chunks_batch(
+    documents: List[Tuple[str, str]],
+    embedder: EmbeddingSelfQuery,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_docs: int = DEFAULT_BATCH_MAX_DOCS,
+    fallback: bool = True,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extrai vários documentos curtos por chamada ao LLM (saída JSON schema).
+
+    Os documentos são agrupados até `token_budget` tokens e os resultados são
+    mapeados de volta por `pdf_name`. Documentos ausentes ou vazios na resposta
+    (ou lotes inteiros que falharem) são refeitos com chamadas individuais
+    quando `fallback=True`; sem fallback, ficam fora do resultado.
+
+    Args:
+        documents: Lista de (pdf_name, texto)
+
+    Returns:
+        Dict pdf_name -> sub-chunks com metadados
+    """
+    structured_llm = embedder.llm.with_structured_output(
+        BATCH_EXTRACTION_SCHEMA, method="json_schema", strict=True
+    )
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    pending: List[Tuple[str, str]] = []
+
+    for batch in pack_documents(documents, token_budget, max_docs):
+        if len(batch) == 1:
+            pending.extend(batch)
+            continue
+        try:
+            response = structured_llm.invoke(build_batch_extraction_prompt(batch))
+            by_name = {
+                doc.get("metadados", {}).get("pdf_name"): doc
+                for doc in response.get("documentos", [])
             }
-            processed.append({"text": texto.strip(), "metadata": metadata})
+        except Exception as e:
+            print(f"⚠️ Erro no lote de {len(batch)} documentos: {e}")
+            by_name = {}
 
-        return processed
+        for pdf_name, text_content in batch:
+            chunks = []
+            if pdf_name in by_name:
+                chunks = build_chunks(
+                    by_name[pdf_name],
+                    pdf_name,
+                    max_chunk_tokens=max_chunk_tokens,
+                    chunk_overlap_tokens=chunk_overlap_tokens,
+                )
+            if chunks:
+                results[pdf_name] = chunks
+            else:
+                pending.append((pdf_name, text_content))
 
-    except Exception as e:
-        print(f"⚠️ Erro ao processar {pdf_name}: {e}")
-        return []
+    if not fallback:
+        return results
 
+    for pdf_name, text_content in pending:
+        try:
+            results[pdf_name] = extract_chunks(
+                text_content,
+                pdf_name,
+                embedder,
+                max_chunk_tokens=max_chunk_tokens,
+                chunk_overlap_tokens=chunk_overlap_tokens,
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao processar {pdf_name}: {e}")
 
-def main(collection: str = "sumulas_tcemg", pasta_pdfs: str = "sumulas"):
-    embedder = EmbeddingSelfQuery()
+    return results
 
-    # Cria coleção se não existir
-    if not embedder.client.collection_exists(collection_name=collection):
-        embedder.client.create_collection(
-            collection_name=collection,
-            vectors_config={
-                "text-dense": VectorParams(size=3072, distance=Distance.COSINE)
-            },
-            sparse_vectors_config={
-                "text-sparse": SparseVectorParams()  # sem size para esparso
+
+def build_chunks(
+    data: Dict[str, Any],
+    pdf_name: str,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> List[Dict[str, Any]]:
+    """
+    Converte o JSON extraído pelo LLM em sub-chunks com metadados tipados.
+
+    Os metadados são validados e normalizados (`SumulaMetadata`); levanta
+    ValueError se o número da súmula não puder ser determinado.
+    """
+    metadados = SumulaMetadata.from_raw(data.get("metadados", {}), pdf_name)
+    chunks = data.get("chunks", {})
+
+    processed = []
+    for idx, (tipo, texto) in enumerate(chunks.items()):
+        if not texto or idx >= 3:
+            continue
+        sub_chunks = split_text(
+            texto,
+            max_tokens=max_chunk_tokens,
+            overlap_tokens=chunk_overlap_tokens,
+        )
+        for sub_idx, sub_texto in enumerate(sub_chunks):
+            metadata = replace(
+                metadados,
+                chunk_type=tipo,
+                chunk_index=idx,
+                sub_chunk_index=sub_idx,
+                sub_chunk_count=len(sub_chunks),
+            )
+            processed.append({"text": sub_texto, "metadata": metadata.to_payload()})
+
+    return processed
+
+
+def process_pdf_file(
+    file_path: str,
+    embedder: EmbeddingSelfQuery,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> List[Dict[str, Any]]:
+    """
+    Converte o PDF e extrai seus sub-chunks com metadados.
+
+    Levanta exceção em caso de falha (o chamador decide como registrar).
+    """
+    pdf_name = os.path.basename(file_path)
+    text_content = convert_pdf(file_path)
+    return extract_chunks(
+        text_content,
+        pdf_name,
+        embedder,
+        max_chunk_tokens=max_chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+    )
+
+
+def chunk_point_id(metadata: Dict[str, Any]) -> str:
+    """
+    ID determinístico do ponto no Qdrant.
+
+    Reprocessar o mesmo PDF sobrescreve os pontos em vez de duplicá-los.
+    """
+    key = (
+        f"{metadata.get('pdf_name')}#{metadata.get('chunk_index')}"
+        f".{metadata.get('sub_chunk_index', 0)}"
+    )
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+
+
+def embed_chunks(
+    chunks: List[Dict[str, Any]], embedder: EmbeddingSelfQuery
+) -> List[List[float]]:
+    """Gera os embeddings densos dos chunks em uma única chamada."""
+    return embedder.model.embed_documents([c["text"] for c in chunks])
+
+
+def upsert_chunks(
+    embedder: EmbeddingSelfQuery,
+    collection: str,
+    chunks: List[Dict[str, Any]],
+    vectors: List[List[float]],
+    replace_existing: bool = True,
+    shard_key: Optional[str] = None,
+    text_store: Optional[TextStore] = None,
+) -> None:
+    """
+    Grava os chunks no Qdrant no mesmo formato de payload do LangChain.
+
+    Com `replace_existing`, apaga em seguida os sub-chunks antigos do mesmo PDF
+    que não fazem mais parte do documento. Pode ser desligado quando a coleção
+    é nova (nada a substituir). `shard_key` é obrigatória em coleções com
+    sharding customizado (ver app.ingest.sharding).
+
+    O hash do texto vai para `metadata.text_sha256`; com `text_store`, o texto
+    também é gravado no store local (buscas sem `page_content`).
+    """
+    if text_store is not None:
+        text_store.put_many(chunk["text"] for chunk in chunks)
+    points = [
+        models.PointStruct(
+            id=chunk_point_id(chunk["metadata"]),
+            vector={"text-dense": vector},
+            payload={
+                "page_content": chunk["text"],
+                "metadata": {**chunk["metadata"], TEXT_DIGEST_KEY: text_digest(chunk["text"])},
             },
         )
-        print(f"Coleção '{collection}' criada.")
-
-        # Criar índices para os campos usados em filtros
-        print("Criando índices para filtros...")
-        embedder.client.create_payload_index(
-            collection_name=collection,
-            field_name="num_sumula",
-            field_schema="keyword"
+        for chunk, vector in zip(chunks, vectors)
+    ]
+    embedder.client.upsert(
+        collection_name=collection, points=points, wait=True, shard_key_selector=shard_key
+    )
+
+    if not replace_existing:
+        return
+
+    # Remove sub-chunks antigos do mesmo PDF que não existem mais (ex.: PDF alterado)
+    for pdf_name in {chunk["metadata"]["pdf_name"] for chunk in chunks}:
+        delete_pdf_points(
+            embedder,
+            collection,
+            pdf_name,
+            keep_ids=[p.id for p in points if p.payload["metadata"]["pdf_name"] == pdf_name],
+            shard_key=shard_key,
+        )
+
+
+def delete_pdf_points(
+    embedder: EmbeddingSelfQuery,
+    collection: str,
+    pdf_name: str,
+    keep_ids: List[str] = (),
+    shard_key: Optional[str] = None,
+) -> None:
+    """Apaga os pontos de um PDF, exceto os IDs em `keep_ids`."""
+    must_not = [models.HasIdCondition(has_id=list(keep_ids))] if keep_ids else None
+    embedder.client.delete(
+        collection_name=collection,
+        points_selector=models.FilterSelector(
+            filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="metadata.pdf_name",
+                        match=models.MatchValue(value=pdf_name),
+                    )
+                ],
+                must_not=must_not,
+            )
+        ),
+        wait=True,
+        shard_key_selector=shard_key,
+    )
+
+
+def ensure_collection(
+    embedder: EmbeddingSelfQuery,
+    collection: str,
+    storage: Optional[VectorStorageConfig] = None,
+    dim: Optional[int] = None,
+    sharding: Optional[ShardingConfig] = None,
+) -> None:
+    """
+    Cria a coleção e os índices de payload se ainda não existirem.
+
+    `storage` define quantização e armazenamento em disco dos vetores densos
+    (padrão: float32 em RAM), `dim` a dimensão (padrão: a do embedder, ver
+    `EMBEDDING_DIM`) e `sharding` os shards, réplicas e a chave de shard
+    (padrão: os do servidor); só têm efeito na criação da coleção.
+    """
+    if embedder.client.collection_exists(collection_name=collection):
+        print(f"Coleção '{collection}' já existe.")
+        return
+
+    storage = storage or VectorStorageConfig()
+    sharding = sharding or ShardingConfig()
+    dim = dim or embedding_dim(embedder)
+    embedder.client.create_collection(
+        collection_name=collection,
+        vectors_config={
+            "text-dense": storage.vector_params(dim)
+        },
+        sparse_vectors_config={
+            "text-sparse": SparseVectorParams()  # sem size para esparso
+        },
+        **sharding.collection_kwargs(),
+    )
+    sharding.create_shard_key(embedder.client, collection)
+    print(
+        f"Coleção '{collection}' criada ({dim} dimensões, {storage.describe()}, {sharding.describe()})."
+    )
+
+    # Criar índices para os campos usados em filtros (metadata.*, ver payload_schema)
+    print("Criando índices para filtros...")
+    create_indexes(embedder.client, collection)
+    print("✅ Índices criados com sucesso!")
+
+
+def ingest_pdf(
+    pdf_file: Path,
+    embedder: EmbeddingSelfQuery,
+    collection: str,
+    journal: IngestJournal,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    shard_key: Optional[str] = None,
+    text_store: Optional[TextStore] = None,
+) -> int:
+    """
+    Ingere um PDF estágio a estágio, gravando cada conclusão no journal.
+
+    Retoma a partir do último estágio concluído registrado no journal.
+    Falhas são gravadas no journal e re-levantadas.
+
+    Returns:
+        Número de chunks gravados no Qdrant (0 se já estava concluído)
+    """
+    pdf_name = pdf_file.name
+    sha256 = file_sha256(str(pdf_file))
+    stage = journal.last_stage(pdf_name, sha256)
+
+    if stage == "upserted":
+        return 0
+
+    data = journal.data(pdf_name) if stage else {}
+    current = "converted"
+    try:
+        if stage is None:
+            text_content = convert_pdf(str(pdf_file))
+            journal.record(pdf_name, sha256, "converted", text=text_content)
+            stage = "converted"
+        else:
+            text_content = data["text"]
+
+        current = "extracted"
+        if stage == "converted":
+            chunks = extract_chunks(
+                text_content,
+                pdf_name,
+                embedder,
+                max_chunk_tokens=max_chunk_tokens,
+                chunk_overlap_tokens=chunk_overlap_tokens,
+            )
+            journal.record(pdf_name, sha256, "extracted", chunks=chunks)
+            stage = "extracted"
+        else:
+            chunks = data["chunks"]
+
+        if not chunks:
+            raise ValueError("Nenhum chunk extraído do documento")
+
+        current = "embedded"
+        # Vetores do journal com outra dimensão (EMBEDDING_DIM mudou) são refeitos
+        if stage == "embedded" and len(data["vectors"][0]) != embedding_dim(embedder):
+            stage = "extracted"
+        if stage == "extracted":
+            vectors = embed_chunks(chunks, embedder)
+            journal.record(pdf_name, sha256, "embedded", vectors=vectors)
+            stage = "embedded"
+        else:
+            vectors = data["vectors"]
+
+        current = "upserted"
+        upsert_chunks(
+            embedder, collection, chunks, vectors, shard_key=shard_key, text_store=text_store
         )
-        embedder.client.create_payload_index(
-            collection_name=collection,
-            field_name="status_atual",
-            field_schema="keyword"
+        journal.record(pdf_name, sha256, "upserted", num_chunks=len(chunks))
+
+    except Exception as e:
+        journal.record_failure(pdf_name, sha256, current, e)
+        raise
+
+    return len(chunks)
+
+
+def batch_extract_stage(
+    pdf_files: List[Path],
+    embedder: EmbeddingSelfQuery,
+    journal: IngestJournal,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    max_docs: int = DEFAULT_BATCH_MAX_DOCS,
+) -> int:
+    """
+    Pré-etapa do modo em lote: converte e extrai os PDFs pendentes em lotes.
+
+    Os resultados são gravados no journal como `extracted`; documentos que o
+    lote não resolver ficam em `converted` e `ingest_pdf` faz a chamada
+    individual.
+
+    Returns:
+        Número de documentos extraídos em lote
+    """
+    pending: List[Tuple[str, str]] = []
+    hashes: Dict[str, str] = {}
+
+    for pdf_file in pdf_files:
+        pdf_name = pdf_file.name
+        sha256 = file_sha256(str(pdf_file))
+        stage = journal.last_stage(pdf_name, sha256)
+        try:
+            if stage is None:
+                text_content = convert_pdf(str(pdf_file))
+                journal.record(pdf_name, sha256, "converted", text=text_content)
+            elif stage == "converted":
+                text_content = journal.data(pdf_name)["text"]
+            else:
+                continue
+        except Exception as e:
+            journal.record_failure(pdf_name, sha256, "converted", e)
+            continue
+        hashes[pdf_name] = sha256
+        pending.append((pdf_name, text_content))
+
+    if not pending:
+        return 0
+
+    results = extract_chunks_batch(
+        pending,
+        embedder,
+        max_chunk_tokens=max_chunk_tokens,
+        chunk_overlap_tokens=chunk_overlap_tokens,
+        token_budget=token_budget,
+        max_docs=max_docs,
+        fallback=False,
+    )
+    for pdf_name, chunks in results.items():
+        journal.record(pdf_name, hashes[pdf_name], "extracted", chunks=chunks)
+
+    print(f"📦 {len(results)}/{len(pending)} documentos extraídos em lote.")
+    return len(results)
+
+
+def main(
+    collection: str = settings.QDRANT_COLLECTION,
+    pasta_pdfs: str = "sumulas",
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    resume: bool = False,
+    journal_path: str = DEFAULT_JOURNAL_PATH,
+    batch_extraction: bool = False,
+    batch_token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+    batch_max_docs: int = DEFAULT_BATCH_MAX_DOCS,
+    watch: bool = False,
+    debounce: float = 2.0,
+    poll_interval: float = 5.0,
+    quantization: str = "none",
+    on_disk_vectors: bool = False,
+    hnsw_on_disk: bool = False,
+    hnsw_m: Optional[int] = None,
+    ef_construct: Optional[int] = None,
+    full_scan_threshold: Optional[int] = None,
+    rebuild: bool = False,
+    keep_versions: int = 1,
+    max_shrink: float = 0.1,
+    drop_legacy: bool = False,
+    shard_number: Optional[int] = None,
+    replication_factor: Optional[int] = None,
+    write_consistency_factor: Optional[int] = None,
+    shard_key: Optional[str] = None,
+    text_store_path: Optional[str] = settings.TEXT_STORE_PATH or None,
+):
+    embedder = EmbeddingSelfQuery(timeout=settings.QDRANT_INGEST_TIMEOUT)
+    text_store = TextStore(text_store_path) if text_store_path else None
+    storage = VectorStorageConfig(
+        quantization=quantization,
+        on_disk=on_disk_vectors,
+        hnsw_on_disk=hnsw_on_disk,
+        hnsw_m=hnsw_m,
+        ef_construct=ef_construct,
+        full_scan_threshold=full_scan_threshold,
+    )
+    sharding = ShardingConfig(
+        shard_number=shard_number,
+        replication_factor=replication_factor,
+        write_consistency_factor=write_consistency_factor,
+        shard_key=shard_key,
+    )
+
+    if rebuild:
+        return rebuild_collection(
+            embedder,
+            collection,
+            pasta_pdfs,
+            storage,
+            resume=resume,
+            journal_path=journal_path,
+            keep_versions=keep_versions,
+            max_shrink=max_shrink,
+            drop_legacy=drop_legacy,
+            max_chunk_tokens=max_chunk_tokens,
+            chunk_overlap_tokens=chunk_overlap_tokens,
+            sharding=sharding,
+            text_store=text_store,
         )
-        embedder.client.create_payload_index(
-            collection_name=collection,
-            field_name="data_status_ano",
-            field_schema="integer"
+
+    # Cria coleção se não existir (grava pelo alias, se houver: versão ativa)
+    ensure_collection(embedder, collection, storage, sharding=sharding)
+
+    if watch:
+        from app.ingest.watch import SumulasWatcher
+
+        # O watch sempre parte do journal existente (sabe o que já foi ingerido)
+        watcher = SumulasWatcher(
+            pasta_pdfs,
+            embedder,
+            collection,
+            IngestJournal(journal_path, resume=True),
+            debounce=debounce,
+            poll_interval=poll_interval,
+            max_chunk_tokens=max_chunk_tokens,
+            chunk_overlap_tokens=chunk_overlap_tokens,
+            shard_key=shard_key,
+            text_store=text_store,
         )
-        print("✅ Índices criados com sucesso!")
-    else:
-        print(f"Coleção '{collection}' já existe.")
+        watcher.run_forever()
+        return
 
-    vector_store = embedder.get_qdrant_vector_store(collection)
-    pdf_files = list(Path(pasta_pdfs).glob("*.pdf"))
+    pdf_files = sorted(Path(pasta_pdfs).glob("*.pdf"))
     if not pdf_files:
         print("Nenhum PDF encontrado na pasta.")
         return
 
+    journal = IngestJournal(journal_path, resume=resume)
+    if resume:
+        print(f"🔁 Retomando a partir do journal '{journal_path}'.")
+
+    if batch_extraction:
+        batch_extract_stage(
+            pdf_files,
+            embedder,
+            journal,
+            max_chunk_tokens=max_chunk_tokens,
+            chunk_overlap_tokens=chunk_overlap_tokens,
+            token_budget=batch_token_budget,
+            max_docs=batch_max_docs,
+        )
+
     total_chunks = 0
     for pdf_file in pdf_files:
-        chunks = process_pdf_file(str(pdf_file), embedder)
-        if not chunks:
-            continue
-        texts = [c["text"] for c in chunks]
-        metadatas = [c["metadata"] for c in chunks]
-        vector_store.add_texts(texts=texts, metadatas=metadatas)
-        total_chunks += len(chunks)
+        try:
+            total_chunks += ingest_pdf(
+                pdf_file,
+                embedder,
+                collection,
+                journal,
+                max_chunk_tokens=max_chunk_tokens,
+                chunk_overlap_tokens=chunk_overlap_tokens,
+                shard_key=shard_key,
+                text_store=text_store,
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao processar {pdf_file.name}: {e}")
 
+    if total_chunks:
+        version = bump_collection_version(embedder.client, collection, shard_key=shard_key)
+        print(f"🔖 Versão da coleção: {version}")
+
+    summary = journal.summary()
     print(
         f"✅ {len(pdf_files)} PDFs processados. {total_chunks} chunks inseridos no Qdrant."
     )
+    print(f"📒 Estágios: {summary['by_stage']}")
+    if summary["failures"]:
+        print(f"❌ {len(summary['failures'])} PDFs falharam (use --resume para continuar):")
+        for failure in summary["failures"]:
+            print(f"  - {failure['pdf_name']} [{failure['stage']}]: {failure['error']}")
+
+    return summary
+
+
+def rebuild_collection(
+    embedder: EmbeddingSelfQuery,
+    alias: str,
+    pasta_pdfs: str,
+    storage: Optional[VectorStorageConfig] = None,
+    resume: bool = False,
+    journal_path: str = DEFAULT_JOURNAL_PATH,
+    keep_versions: int = 1,
+    max_shrink: float = 0.1,
+    drop_legacy: bool = False,
+    max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    sharding: Optional[ShardingConfig] = None,
+    text_store: Optional[TextStore] = None,
+) -> Dict[str, Any]:
+    """
+    Reconstrução completa blue/green (ver `app.ingest.aliases`).
+
+    Ingere todos os PDFs em uma nova coleção versionada, valida a contagem e
+    troca o alias atomicamente; as consultas continuam na versão ativa até a
+    troca. Com `resume`, continua a última versão não promovida; sem ele, as
+    versões não promovidas são apagadas antes. A nova versão é criada com
+    `storage` e `sharding` (ex.: mais réplicas).
+
+    Do início até a troca, a versão ativa fica marcada como em reconstrução
+    (`aliases.rebuild_lease`): o `--watch` pausa e aplica as mudanças da pasta
+    na nova versão depois da troca, em vez de gravá-las na versão que vai sair.
+
+    Returns:
+        Resumo do journal, com 'promoted' (resultado da troca, ou None)
+    """
+    client = embedder.client
+    if not resume:
+        abandoned = aliases.drop_pending_versions(client, alias)
+        if abandoned:
+            print(f"🗑️  Reconstruções interrompidas apagadas: {abandoned}")
+    target = (aliases.pending_version(client, alias) if resume else None) or aliases.next_version_name(client, alias)
+    print(f"🏗️  Reconstruindo em '{target}' (ativa: {aliases.resolve_alias(client, alias) or alias})")
+    sharding = sharding or ShardingConfig()
+    ensure_collection(embedder, target, storage, sharding=sharding)
+
+    # Journal próprio da versão (o da coleção ativa continua valendo para o --watch)
+    version_journal_path = str(Path(journal_path).with_suffix(f".{target}.jsonl"))
+    journal = IngestJournal(version_journal_path, resume=resume)
+
+    with aliases.rebuild_lease(client, alias, shard_key=sharding.shard_key) as renew_lease:
+        # Sem indexação HNSW durante a carga; a indexação roda uma vez antes da troca
+        pdf_files = sorted(Path(pasta_pdfs).glob("*.pdf"))
+        with indexing_paused(client, target):
+            for pdf_file in pdf_files:
+                try:
+                    ingest_pdf(
+                        pdf_file,
+                        embedder,
+                        target,
+                        journal,
+                        max_chunk_tokens=max_chunk_tokens,
+                        chunk_overlap_tokens=chunk_overlap_tokens,
+                        shard_key=sharding.shard_key,
+                        text_store=text_store,
+                    )
+                except Exception as e:
+                    print(f"⚠️ Erro ao processar {pdf_file.name}: {e}")
+                renew_lease()
+
+        summary = journal.summary()
+        summary["promoted"] = None
+        print(f"📒 Estágios: {summary['by_stage']}")
+        if summary["failures"] or not pdf_files:
+            print(f"❌ {len(summary['failures'])} PDFs falharam; '{alias}' não foi alterado (use --rebuild --resume).")
+            return summary
+
+        expected = sum(journal.data(name).get("num_chunks", 0) for name in journal.known_files())
+        renew_lease()
+        promoted = aliases.promote(
+            client,
+            alias,
+            target,
+            expected,
+            max_shrink=max_shrink,
+            drop_legacy=drop_legacy,
+            shard_key=sharding.shard_key,
+        )
+    removed = aliases.garbage_collect(client, alias, keep=keep_versions)
+    print(
+        f"🔀 '{alias}' → '{target}' ({promoted['count']} pontos, versão {promoted['version']}). "
+        f"Versões apagadas: {removed or 'nenhuma'}"
+    )
+    summary["promoted"] = promoted
+    return summary
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ingestão das súmulas no Qdrant")
+    parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--pasta", dest="pasta_pdfs", default="sumulas")
+    parser.add_argument("--max-chunk-tokens", type=int, default=DEFAULT_MAX_TOKENS)
+    parser.add_argument(
+        "--chunk-overlap-tokens", type=int, default=DEFAULT_OVERLAP_TOKENS
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continua do último estágio concluído de cada PDF (journal)",
+    )
+    parser.add_argument("--journal", dest="journal_path", default=DEFAULT_JOURNAL_PATH)
+    parser.add_argument(
+        "--batch-extraction",
+        action="store_true",
+        help="Agrupa várias súmulas curtas por chamada de extração ao LLM",
+    )
+    parser.add_argument(
+        "--batch-token-budget", type=int, default=DEFAULT_BATCH_TOKEN_BUDGET
+    )
+    parser.add_argument("--batch-max-docs", type=int, default=DEFAULT_BATCH_MAX_DOCS)
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Observa a pasta e aplica PDFs adicionados/alterados/removidos continuamente",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="Segundos sem mudanças antes de aplicar uma atualização (modo watch)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Intervalo da varredura quando o watchdog não está instalado (modo watch)",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATION_CHOICES,
+        default="none",
+        help="Quantização dos vetores densos na criação da coleção (scalar = int8)",
+    )
+    parser.add_argument(
+        "--on-disk-vectors",
+        action="store_true",
+        help="Guarda os vetores originais em disco (use com --quantization)",
+    )
+    parser.add_argument(
+        "--hnsw-on-disk",
+        action="store_true",
+        help="Guarda o grafo HNSW em disco",
+    )
+    parser.add_argument(
+        "--hnsw-m",
+        type=int,
+        help="Vizinhos por nó do grafo HNSW (padrão do Qdrant: 16; 0 desliga o grafo)",
+    )
+    parser.add_argument(
+        "--ef-construct",
+        type=int,
+        help="Candidatos avaliados na construção do HNSW (padrão do Qdrant: 100)",
+    )
+    parser.add_argument(
+        "--full-scan-threshold",
+        type=int,
+        help="KB de vetores abaixo dos quais buscas filtradas são exatas (padrão do Qdrant: 10000)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Reconstrói em uma nova coleção versionada e troca o alias ao final (blue/green)",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=1,
+        help="Versões anteriores mantidas para rollback após a troca (modo rebuild)",
+    )
+    parser.add_argument(
+        "--max-shrink",
+        type=float,
+        default=0.1,
+        help="Redução máxima de pontos aceita em relação à versão ativa (modo rebuild)",
+    )
+    parser.add_argument(
+        "--drop-legacy",
+        action="store_true",
+        help="Substitui uma coleção comum com o nome do alias (migração única, modo rebuild)",
+    )
+    parser.add_argument(
+        "--shard-number",
+        type=int,
+        help="Shards da coleção, distribuídos entre os nós (na criação)",
+    )
+    parser.add_argument(
+        "--replication-factor",
+        type=int,
+        help="Cópias de cada shard; as leituras são distribuídas entre as réplicas (na criação)",
+    )
+    parser.add_argument(
+        "--write-consistency-factor",
+        type=int,
+        help="Réplicas que confirmam cada escrita (na criação)",
+    )
+    parser.add_argument(
+        "--shard-key",
+        help="Sharding customizado: grava os pontos nos shards desta chave",
+    )
+    parser.add_argument(
+        "--text-store",
+        dest="text_store_path",
+        default=settings.TEXT_STORE_PATH or None,
+        help="SQLite local com os textos dos chunks, para buscas sem page_content (TEXT_STORE_PATH)",
+    )
+    return parser
 
 
 if __name__ == "__main__":
-    main()
+    main(**vars(build_arg_parser().parse_args()))
@@ -0,0 +1,225 @@
+"""
+Journal de ingestão (write-ahead) em JSONL.
+
+Cada PDF passa pelos estágios `converted` → `extracted` → `embedded` →
+`upserted`. Ao concluir um estágio, o resultado é gravado (com fsync) no
+journal antes de seguir para o próximo. Se a ingestão morrer no meio
+(ex.: 429 da OpenAI, timeout do Qdrant), `--resume` continua cada arquivo
+a partir do último estágio concluído, sem refazer chamadas já pagas.
+
+Ao concluir `upserted`, os artefatos do PDF (texto, chunks, vetores) deixam de
+ser necessários e só o número de chunks é mantido. O arquivo é compactado
+(um evento por PDF, com o estado mais recente) ao retomar e a cada
+`compact_every` eventos, para não crescer sem limite no modo watch.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import time
+
+STAGES = ("converted", "extracted", "embedded", "upserted")
+
+DEFAULT_JOURNAL_PATH = ".ingest_journal.jsonl"
+
+# Eventos gravados entre duas compactações do arquivo
+DEFAULT_COMPACT_EVERY = 200
+
+
+def file_sha256(file_path: str) -> str:
+    """Calcula o SHA-256 do arquivo (detecta PDFs alterados entre execuções)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestJournal:
+    """
+    Journal append-only com o estágio de cada PDF.
+
+    Cada linha é um evento JSON:
+        {"pdf_name": ..., "sha256": ..., "stage": ..., "ts": ..., "data": {...}}
+    Falhas são gravadas com `"status": "failed"` e o motivo em `"error"`.
+
+    Example:
+        >>> journal = IngestJournal(".ingest_journal.jsonl", resume=True)
+        >>> journal.last_stage("Súmula 070-89.pdf", sha256)
+        'extracted'
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_JOURNAL_PATH,
+        resume: bool = False,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+    ):
+        self.path = Path(path)
+        self.compact_every = compact_every
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._failures: Dict[str, Dict[str, Any]] = {}
+        self._appended = 0
+
+        if resume and self.path.exists():
+            self._replay()
+            self.compact()
+        else:
+            # Nova execução: começa um journal vazio
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+
+    def _replay(self) -> None:
+        """Reconstrói o estado de cada PDF a partir dos eventos gravados."""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha incompleta (crash durante a escrita)
+                    continue
+                self._apply(event)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        pdf_name = event["pdf_name"]
+
+        if event.get("status") == "failed":
+            self._failures[pdf_name] = event
+            return
+
+        if event.get("status") == "removed":
+            self._states.pop(pdf_name, None)
+            self._failures.pop(pdf_name, None)
+            return
+
+        state = self._states.get(pdf_name)
+        if state is None or state["sha256"] != event["sha256"]:
+            # Arquivo novo ou alterado: descarta estágios anteriores
+            state = {"sha256": event["sha256"], "stage": None, "data": {}}
+            self._states[pdf_name] = state
+
+        state["stage"] = event["stage"]
+        if event["stage"] == "upserted":
+            # Já gravado na coleção: texto, chunks e vetores não são mais necessários
+            state["data"] = dict(event.get("data", {}))
+        else:
+            state["data"].update(event.get("data", {}))
+        self._failures.pop(pdf_name, None)
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(event)
+        self._appended += 1
+        if self.compact_every and self._appended >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Reescreve o journal com um evento por PDF (último estágio e artefatos
+        acumulados) e as falhas pendentes, trocando o arquivo atomicamente.
+        """
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for pdf_name, state in self._states.items():
+                event = {
+                    "pdf_name": pdf_name,
+                    "sha256": state["sha256"],
+                    "stage": state["stage"],
+                    "ts": time.time(),
+                    "data": state["data"],
+                }
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            for failure in self._failures.values():
+                f.write(json.dumps(failure, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._appended = 0
+
+    def record(
+        self, pdf_name: str, sha256: str, stage: str, **data: Any
+    ) -> None:
+        """Grava a conclusão de um estágio, com os artefatos necessários para retomar."""
+        if stage not in STAGES:
+            raise ValueError(f"Estágio desconhecido: {stage}")
+        self._append(
+            {
+                "pdf_name": pdf_name,
+                "sha256": sha256,
+                "stage": stage,
+                "ts": time.time(),
+                "data": data,
+            }
+        )
+
+    def record_failure(
+        self, pdf_name: str, sha256: str, stage: str, error: BaseException
+    ) -> None:
+        """Grava a falha de um estágio com o motivo."""
+        self._append(
+            {
+                "pdf_name": pdf_name,
+                "sha256": sha256,
+                "stage": stage,
+                "ts": time.time(),
+                "status": "failed",
+                "error": f"{type(error).__name__}: {error}",
+            }
+        )
+
+    def record_removal(self, pdf_name: str) -> None:
+        """Grava a remoção do PDF (seus pontos foram apagados da coleção)."""
+        self._append(
+            {
+                "pdf_name": pdf_name,
+                "sha256": None,
+                "stage": None,
+                "ts": time.time(),
+                "status": "removed",
+            }
+        )
+
+    def known_files(self) -> List[str]:
+        """PDFs com algum estágio registrado no journal."""
+        return list(self._states)
+
+    def last_stage(self, pdf_name: str, sha256: str) -> Optional[str]:
+        """Último estágio concluído do PDF (None se novo ou alterado)."""
+        state = self._states.get(pdf_name)
+        if state is None or state["sha256"] != sha256:
+            return None
+        return state["stage"]
+
+    def data(self, pdf_name: str) -> Dict[str, Any]:
+        """Artefatos acumulados do PDF (texto, chunks, vetores)."""
+        return self._states.get(pdf_name, {}).get("data", {})
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Falhas pendentes (PDFs cuja última tentativa falhou)."""
+        return list(self._failures.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumo da execução: quantidade de PDFs por estágio e falhas."""
+        by_stage = {stage: 0 for stage in STAGES}
+        for state in self._states.values():
+            if state["stage"] in by_stage:
+                by_stage[state["stage"]] += 1
+        return {
+            "by_stage": by_stage,
+            "failures": [
+                {
+                    "pdf_name": f["pdf_name"],
+                    "stage": f["stage"],
+                    "error": f["error"],
+                }
+                for f in self.failures()
+            ],
+        }
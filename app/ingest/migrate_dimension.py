@@ -0,0 +1,176 @@
+"""
+Migração da coleção para embeddings de dimensão reduzida (Matryoshka).
+
+O text-embedding-3-large aceita embeddings encurtados (`dimensions`): os
+primeiros N componentes, renormalizados, preservam a maior parte da qualidade
+de busca. Com 256/512/1024 dimensões, o armazenamento, o tráfego e o tempo de
+busca caem várias vezes em relação às 3072 atuais.
+
+A migração copia os pontos (mesmos IDs e payloads) para uma nova coleção:
+
+- Padrão: trunca e renormaliza os vetores já armazenados (sem chamadas à OpenAI)
+- `--reembed`: gera os embeddings de novo com `dimensions=N`
+
+Como executar:
+    uv run python -m app.ingest.migrate_dimension --source sumulas_tcemg --target sumulas_tcemg_256 --dim 256
+
+Depois, defina `EMBEDDING_DIM=256` e aponte as consultas para a nova coleção,
+ou use `--promote` para migrar em uma nova versão do alias e trocá-lo ao final
+(ver `app.ingest.aliases`):
+    uv run python -m app.ingest.migrate_dimension --dim 256 --promote
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+import argparse
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest import aliases
+from app.ingest.embed_qdrant import EmbeddingSelfQuery
+from app.ingest.extract_text import ensure_collection
+from app.ingest.storage import QUANTIZATION_CHOICES, VectorStorageConfig
+from app.ingest.versioning import MANIFEST_POINT_ID, bump_collection_version, get_collection_version
+from app.utils.settings import settings
+
+
+def truncate_embeddings(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """Encurta os embeddings para `dim` componentes e renormaliza (norma L2)."""
+    truncated = np.asarray(vectors, dtype=np.float32)[:, :dim]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return truncated / np.where(norms == 0, 1, norms)
+
+
+def migrate_collection(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    dim: int,
+    embeddings: Optional[Any] = None,
+    storage: Optional[VectorStorageConfig] = None,
+    batch_size: int = 256,
+) -> Dict[str, Any]:
+    """
+    Copia a coleção `source` para `target` com vetores densos de `dim` dimensões.
+
+    Args:
+        embeddings: Modelo com `embed_documents` já configurado para `dim`
+            dimensões; se None, os vetores armazenados são truncados
+        storage: Layout dos vetores na nova coleção (quantização, disco)
+
+    Returns:
+        Dict com 'source_count', 'target_count', 'version' e 'elapsed_s'
+    """
+    if client.collection_exists(target):
+        raise ValueError(f"A coleção '{target}' já existe; escolha outro nome")
+
+    start = time.perf_counter()
+    ensure_collection(SimpleNamespace(client=client), target, storage, dim=dim)
+
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=["text-dense"],
+        )
+        points = [p for p in points if str(p.id) != MANIFEST_POINT_ID and p.vector]
+        if points:
+            if embeddings is not None:
+                vectors = np.asarray(
+                    embeddings.embed_documents([p.payload.get("page_content", "") for p in points]),
+                    dtype=np.float32,
+                )
+            else:
+                vectors = truncate_embeddings([p.vector["text-dense"] for p in points], dim)
+            if vectors.shape[1] != dim:
+                raise ValueError(f"Embeddings com {vectors.shape[1]} dimensões (esperado: {dim})")
+
+            client.upsert(
+                collection_name=target,
+                points=[
+                    models.PointStruct(id=p.id, vector={"text-dense": v.tolist()}, payload=p.payload)
+                    for p, v in zip(points, vectors)
+                ],
+                wait=True,
+            )
+            copied += len(points)
+            print(f"  ↪ {copied} pontos copiados")
+        if offset is None:
+            break
+
+    # Valida a contagem antes de liberar a nova coleção
+    source_count = client.count(source, exact=True).count
+    if get_collection_version(client, source):
+        source_count -= 1  # ponto de manifesto
+    target_count = client.count(target, exact=True).count
+    if target_count != source_count:
+        raise RuntimeError(
+            f"Contagem divergente: '{source}' tem {source_count} pontos, '{target}' tem {target_count}"
+        )
+
+    version = bump_collection_version(client, target, changed=[f"migração de '{source}' ({dim} dimensões)"])
+    return {
+        "source_count": source_count,
+        "target_count": target_count,
+        "version": version,
+        "elapsed_s": round(time.perf_counter() - start, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra a coleção para embeddings de dimensão reduzida")
+    parser.add_argument("--source", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--target", help="Nova coleção (padrão com --promote: próxima versão do alias)")
+    parser.add_argument("--dim", type=int, required=True, help="Nova dimensão (ex.: 256, 512, 1024)")
+    parser.add_argument(
+        "--reembed",
+        action="store_true",
+        help="Gera os embeddings de novo na OpenAI em vez de truncar os armazenados",
+    )
+    parser.add_argument("--quantization", choices=QUANTIZATION_CHOICES, default="none")
+    parser.add_argument("--on-disk-vectors", action="store_true")
+    parser.add_argument("--hnsw-on-disk", action="store_true")
+    parser.add_argument("--hnsw-m", type=int)
+    parser.add_argument("--ef-construct", type=int)
+    parser.add_argument("--full-scan-threshold", type=int)
+    parser.add_argument(
+        "--promote",
+        action="store_true",
+        help="Trata --source como alias e aponta-o para a nova coleção ao final",
+    )
+    args = parser.parse_args()
+
+    embedder = EmbeddingSelfQuery(dim=args.dim, timeout=settings.QDRANT_INGEST_TIMEOUT)
+    target = args.target or (aliases.next_version_name(embedder.client, args.source) if args.promote else None)
+    if target is None:
+        parser.error("informe --target (ou use --promote)")
+    result = migrate_collection(
+        embedder.client,
+        args.source,
+        target,
+        args.dim,
+        embeddings=embedder.model if args.reembed else None,
+        storage=VectorStorageConfig(
+            quantization=args.quantization,
+            on_disk=args.on_disk_vectors,
+            hnsw_on_disk=args.hnsw_on_disk,
+            hnsw_m=args.hnsw_m,
+            ef_construct=args.ef_construct,
+            full_scan_threshold=args.full_scan_threshold,
+        ),
+    )
+    print(
+        f"✅ {result['target_count']} pontos migrados para '{target}' "
+        f"({args.dim} dimensões) em {result['elapsed_s']}s"
+    )
+    if args.promote:
+        aliases.promote(embedder.client, args.source, target, result["target_count"])
+        print(f"🔀 '{args.source}' → '{target}'. Defina EMBEDDING_DIM={args.dim} nas consultas.")
+    else:
+        print(f"   Defina EMBEDDING_DIM={args.dim} e aponte as consultas para '{target}'.")
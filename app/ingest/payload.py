@@ -0,0 +1,216 @@
+"""
+Metadados tipados dos chunks, normalizados na ingestão.
+
+O LLM devolve tudo como texto ("2014", "070", "Súmula nº 70", "vigente"),
+mas o self-query filtra `data_status_ano` como inteiro (índice de intervalo)
+e `num_sumula` como número sem prefixo. Sem normalização, filtros como
+"antes de 2010" não usam o índice ou não retornam nada. `SumulaMetadata`
+valida e converte os campos:
+
+- num_sumula: número canônico, sem zeros à esquerda ("070" → "70")
+- data_status_ano: inteiro (também derivado de `data_status`, se faltar)
+- status_atual: maiúsculas, sem espaços extras
+- data_status_iso: data ISO ("2014-04-07") ao lado de `data_status` ("07/04/14")
+
+O comando de backfill aplica a mesma normalização aos pontos já gravados:
+    uv run python -m app.ingest.payload --collection sumulas_tcemg --dry-run
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional
+import argparse
+import re
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest.versioning import MANIFEST_POINT_ID, bump_collection_version
+
+# Súmulas do TCEMG começam em 1987: anos de 2 dígitos acima do pivô são 19xx
+TWO_DIGIT_YEAR_PIVOT = 50
+MIN_YEAR, MAX_YEAR = 1900, 2100
+
+_NUMBER_REGEX = re.compile(r"\d+")
+_DATE_REGEX = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})")
+
+
+def _expand_year(year: int) -> int:
+    if year >= 100:
+        return year
+    return 2000 + year if year < TWO_DIGIT_YEAR_PIVOT else 1900 + year
+
+
+def canonical_sumula_number(value: Any) -> Optional[str]:
+    """Número da súmula sem prefixo nem zeros à esquerda ("Súmula nº 070" → "70")."""
+    match = _NUMBER_REGEX.search(str(value or ""))
+    return str(int(match.group())) if match else None
+
+
+def parse_status_date(value: Any) -> Optional[date]:
+    """Data 'DD/MM/AA' (ou DD/MM/AAAA) da súmula; None se inválida."""
+    match = _DATE_REGEX.search(str(value or ""))
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    try:
+        return date(_expand_year(year), month, day)
+    except ValueError:
+        return None
+
+
+def parse_year(value: Any) -> Optional[int]:
+    """Ano como inteiro ("2014", 2014, "14" → 2014); None se fora do intervalo válido."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        year = int(value)
+    else:
+        match = _NUMBER_REGEX.search(str(value or ""))
+        if not match:
+            return None
+        year = int(match.group())
+    year = _expand_year(year)
+    return year if MIN_YEAR <= year <= MAX_YEAR else None
+
+
+def normalize_status(value: Any) -> Optional[str]:
+    status = " ".join(str(value or "").split()).upper()
+    return status or None
+
+
+@dataclass
+class SumulaMetadata:
+    num_sumula: str
+    data_status: Optional[str]
+    data_status_iso: Optional[str]
+    data_status_ano: Optional[int]
+    status_atual: Optional[str]
+    pdf_name: str
+    chunk_type: Optional[str] = None
+    chunk_index: Optional[int] = None
+    sub_chunk_index: Optional[int] = None
+    sub_chunk_count: Optional[int] = None
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any], pdf_name: Optional[str] = None) -> "SumulaMetadata":
+        """
+        Valida e converte os metadados extraídos pelo LLM (ou já gravados).
+
+        O número da súmula vem do campo ou, se faltar, do nome do PDF
+        ("Súmula 070-89.pdf"); o ano vem do campo ou da data.
+
+        Raises:
+            ValueError: Se o número da súmula não puder ser determinado
+        """
+        pdf_name = raw.get("pdf_name") or pdf_name or ""
+        num_sumula = canonical_sumula_number(raw.get("num_sumula")) or canonical_sumula_number(pdf_name)
+        if num_sumula is None:
+            raise ValueError(f"Número da súmula ausente ou inválido: {raw.get('num_sumula')!r} ({pdf_name})")
+
+        status_date = parse_status_date(raw.get("data_status"))
+        year = parse_year(raw.get("data_status_ano"))
+        if year is None and status_date is not None:
+            year = status_date.year
+
+        return cls(
+            num_sumula=num_sumula,
+            data_status=raw.get("data_status") or None,
+            data_status_iso=status_date.isoformat() if status_date else None,
+            data_status_ano=year,
+            status_atual=normalize_status(raw.get("status_atual")),
+            pdf_name=pdf_name,
+            chunk_type=raw.get("chunk_type"),
+            chunk_index=raw.get("chunk_index"),
+            sub_chunk_index=raw.get("sub_chunk_index"),
+            sub_chunk_count=raw.get("sub_chunk_count"),
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def normalize_metadata(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadados normalizados, preservando campos extras que o modelo não conhece."""
+    normalized = SumulaMetadata.from_raw(raw).to_payload()
+    return {**raw, **normalized}
+
+
+def backfill_payloads(
+    client: QdrantClient,
+    collection: str,
+    batch_size: int = 256,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Normaliza os metadados dos pontos já gravados (sem tocar nos vetores).
+
+    Só os pontos cujo metadata muda são atualizados, em lotes de
+    `set_payload`; ao final a versão da coleção é incrementada.
+
+    Returns:
+        Dict com 'scanned', 'updated', 'invalid' (ids sem número de súmula) e 'version'
+    """
+    scanned, invalid = 0, []
+    updates: List[models.SetPayloadOperation] = []
+    updated = 0
+
+    def flush():
+        nonlocal updated
+        if updates and not dry_run:
+            client.batch_update_points(collection_name=collection, update_operations=updates, wait=True)
+        updated += len(updates)
+        updates.clear()
+
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["metadata"],
+            with_vectors=False,
+        )
+        for point in points:
+            if str(point.id) == MANIFEST_POINT_ID:
+                continue
+            scanned += 1
+            metadata = (point.payload or {}).get("metadata") or {}
+            try:
+                normalized = normalize_metadata(metadata)
+            except ValueError:
+                invalid.append(str(point.id))
+                continue
+            if normalized != metadata:
+                updates.append(
+                    models.SetPayloadOperation(
+                        set_payload=models.SetPayload(payload={"metadata": normalized}, points=[point.id])
+                    )
+                )
+        if len(updates) >= batch_size or offset is None:
+            flush()
+        if offset is None:
+            break
+
+    version = None
+    if updated and not dry_run:
+        version = bump_collection_version(client, collection, changed=["backfill de metadados"])
+    return {"scanned": scanned, "updated": updated, "invalid": invalid, "version": version}
+
+
+if __name__ == "__main__":
+    from app.ingest.aliases import resolve_alias
+    from app.ingest.embed_qdrant import EmbeddingSelfQuery
+    from app.utils.settings import settings
+
+    parser = argparse.ArgumentParser(description="Normaliza os metadados dos pontos já gravados")
+    parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--dry-run", action="store_true", help="Só conta os pontos que mudariam")
+    args = parser.parse_args()
+
+    client = EmbeddingSelfQuery(timeout=settings.QDRANT_INGEST_TIMEOUT).client
+    collection = resolve_alias(client, args.collection) or args.collection
+    result = backfill_payloads(client, collection, dry_run=args.dry_run)
+    prefix = "🔎 (dry-run) " if args.dry_run else "✅ "
+    print(f"{prefix}{result['updated']} de {result['scanned']} pontos normalizados em '{collection}'")
+    if result["invalid"]:
+        print(f"⚠️  {len(result['invalid'])} pontos sem número de súmula válido: {result['invalid'][:10]}")
@@ -0,0 +1,190 @@
+"""
+Esquema declarativo dos índices de payload da coleção.
+
+O LangChain grava os metadados em `metadata.*` e o tradutor do self-query
+(QdrantTranslator) gera filtros sobre `metadata.<campo>`; sem índice nesse
+caminho, o Qdrant Cloud recusa o filtro ("Index required but not found for
+metadata.num_sumula"). Aqui cada campo filtrável tem tipo e parâmetros de
+índice declarados uma única vez, usados na criação da coleção e pelo comando
+`migrate`, que compara o esquema com a coleção no ar e cria o que falta
+(idempotente).
+
+Como executar:
+    uv run python -m app.ingest.payload_schema --collection sumulas_tcemg --dry-run
+    uv run python -m app.ingest.payload_schema --collection sumulas_tcemg
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple, Union
+import argparse
+
+from qdrant_client import QdrantClient, models
+
+# Chave do payload onde o LangChain (QdrantVectorStore) guarda os metadados
+METADATA_KEY = "metadata"
+
+
+@dataclass(frozen=True)
+class PayloadField:
+    name: str
+    type: str  # "keyword" ou "integer"
+    # Índices inteiros: igualdade (lookup) e intervalos (range, ex.: "antes de 2010")
+    lookup: bool = True
+    range: bool = True
+    # Campo que particiona os dados (keyword) / principal filtro das buscas (integer)
+    is_tenant: bool = False
+    is_principal: bool = False
+    on_disk: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{METADATA_KEY}.{self.name}"
+
+    def index_params(self) -> Union[models.KeywordIndexParams, models.IntegerIndexParams]:
+        if self.type == "keyword":
+            return models.KeywordIndexParams(
+                type=models.KeywordIndexType.KEYWORD,
+                is_tenant=self.is_tenant or None,
+                on_disk=self.on_disk or None,
+            )
+        if self.type == "integer":
+            return models.IntegerIndexParams(
+                type=models.IntegerIndexType.INTEGER,
+                lookup=self.lookup,
+                range=self.range,
+                is_principal=self.is_principal or None,
+                on_disk=self.on_disk or None,
+            )
+        raise ValueError(f"Tipo de índice não suportado: {self.type}")
+
+    def expected_params(self) -> Dict[str, bool]:
+        """Parâmetros comparados com o índice existente."""
+        params = {"on_disk": self.on_disk}
+        if self.type == "keyword":
+            params["is_tenant"] = self.is_tenant
+        else:
+            params.update(lookup=self.lookup, range=self.range, is_principal=self.is_principal)
+        return params
+
+
+# Todos os campos que o self-query (app/retrieval/self_query.py) pode filtrar,
+# mais os usados internamente (remoção por PDF, registro de súmulas)
+PAYLOAD_SCHEMA: Tuple[PayloadField, ...] = (
+    PayloadField("num_sumula", "keyword"),
+    PayloadField("status_atual", "keyword"),
+    PayloadField("data_status", "keyword"),
+    # Filtro por ano é o mais comum ("antes de 2010"): índice principal
+    PayloadField("data_status_ano", "integer", is_principal=True),
+    PayloadField("pdf_name", "keyword"),
+    PayloadField("chunk_type", "keyword"),
+    PayloadField("chunk_index", "integer", range=False),
+    PayloadField("sub_chunk_index", "integer", range=False),
+)
+
+# Padrões do Qdrant quando o índice não informa o parâmetro
+_PARAM_DEFAULTS = {"lookup": True, "range": True, "is_tenant": False, "is_principal": False, "on_disk": False}
+
+
+def _live_params(info: Any) -> Dict[str, bool]:
+    params = getattr(info, "params", None)
+    return {
+        name: bool(default if getattr(params, name, None) is None else getattr(params, name))
+        for name, default in _PARAM_DEFAULTS.items()
+    }
+
+
+def diff_indexes(
+    client: QdrantClient, collection: str, schema: Tuple[PayloadField, ...] = PAYLOAD_SCHEMA
+) -> Dict[str, List[PayloadField]]:
+    """
+    Compara o esquema com os índices da coleção.
+
+    Returns:
+        Dict com 'missing' (sem índice) e 'mismatched' (tipo ou parâmetros diferentes)
+    """
+    live = client.get_collection(collection).payload_schema or {}
+    missing, mismatched = [], []
+    for field in schema:
+        info = live.get(field.key)
+        if info is None:
+            missing.append(field)
+            continue
+        data_type = getattr(info.data_type, "value", info.data_type)
+        live_params = _live_params(info)
+        if data_type != field.type or any(
+            live_params[name] != value for name, value in field.expected_params().items()
+        ):
+            mismatched.append(field)
+    return {"missing": missing, "mismatched": mismatched}
+
+
+def create_indexes(
+    client: QdrantClient, collection: str, fields: Tuple[PayloadField, ...] = PAYLOAD_SCHEMA
+) -> None:
+    for field in fields:
+        client.create_payload_index(
+            collection_name=collection,
+            field_name=field.key,
+            field_schema=field.index_params(),
+            wait=True,
+        )
+
+
+def migrate(
+    client: QdrantClient,
+    collection: str,
+    schema: Tuple[PayloadField, ...] = PAYLOAD_SCHEMA,
+    recreate_mismatched: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Cria os índices do esquema que faltam na coleção (idempotente).
+
+    Índices com tipo ou parâmetros diferentes só são recriados com
+    `recreate_mismatched` (o filtro fica sem índice durante a recriação).
+
+    Returns:
+        Dict com 'created', 'recreated' e 'mismatched' (não alterados)
+    """
+    diff = diff_indexes(client, collection, schema)
+    to_create = list(diff["missing"])
+    to_recreate = list(diff["mismatched"]) if recreate_mismatched else []
+
+    if not dry_run:
+        for field in to_recreate:
+            client.delete_payload_index(collection_name=collection, field_name=field.key, wait=True)
+        create_indexes(client, collection, tuple(to_create + to_recreate))
+
+    return {
+        "created": [f.key for f in to_create],
+        "recreated": [f.key for f in to_recreate],
+        "mismatched": [f.key for f in diff["mismatched"] if f not in to_recreate],
+    }
+
+
+if __name__ == "__main__":
+    from app.ingest.aliases import resolve_alias
+    from app.ingest.embed_qdrant import EmbeddingSelfQuery
+    from app.utils.settings import settings
+
+    parser = argparse.ArgumentParser(description="Cria os índices de payload que faltam na coleção")
+    parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--dry-run", action="store_true", help="Só mostra as diferenças")
+    parser.add_argument(
+        "--recreate-mismatched",
+        action="store_true",
+        help="Recria índices com tipo ou parâmetros diferentes do esquema",
+    )
+    args = parser.parse_args()
+
+    client = EmbeddingSelfQuery(timeout=settings.QDRANT_INGEST_TIMEOUT).client
+    collection = resolve_alias(client, args.collection) or args.collection
+    result = migrate(
+        client, collection, recreate_mismatched=args.recreate_mismatched, dry_run=args.dry_run
+    )
+    prefix = "🔎 (dry-run) " if args.dry_run else "✅ "
+    print(f"{prefix}Coleção '{collection}'")
+    print(f"   Criados: {result['created'] or 'nenhum'}")
+    print(f"   Recriados: {result['recreated'] or 'nenhum'}")
+    if result["mismatched"]:
+        print(f"⚠️  Diferentes do esquema (use --recreate-mismatched): {result['mismatched']}")
@@ -0,0 +1,104 @@
+"""
+Distribuição da coleção em um Qdrant com vários nós (shards e réplicas).
+
+Por padrão a coleção é criada com um único shard e sem réplicas: um segundo
+nó não recebe dados nem consultas. Aqui são configurados, na criação da
+coleção (`ensure_collection`):
+
+- `shard_number`: shards distribuídos entre os nós (escrita e busca em paralelo)
+- `replication_factor`: cópias de cada shard; as leituras são distribuídas
+  entre as réplicas, então a vazão de consultas cresce com os nós
+- `write_consistency_factor`: réplicas que confirmam cada escrita
+- `shard_key`: sharding customizado; os pontos da ingestão são gravados nos
+  shards da chave e as consultas podem se restringir a ela
+
+Na consulta, a consistência de leitura e a chave de shard ficam no
+`SelfQueryConfig` (ver `read_consistency`).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+from qdrant_client import QdrantClient, models
+
+READ_CONSISTENCY_CHOICES = ("all", "majority", "quorum")
+
+
+@dataclass
+class ShardingConfig:
+    shard_number: Optional[int] = None
+    replication_factor: Optional[int] = None
+    write_consistency_factor: Optional[int] = None
+    shard_key: Optional[str] = None
+
+    def __post_init__(self):
+        for name in ("shard_number", "replication_factor", "write_consistency_factor"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} deve ser >= 1 (recebido {value})")
+        if (
+            self.write_consistency_factor is not None
+            and self.write_consistency_factor > (self.replication_factor or 1)
+        ):
+            raise ValueError(
+                f"write_consistency_factor ({self.write_consistency_factor}) maior que "
+                f"replication_factor ({self.replication_factor or 1})"
+            )
+
+    @property
+    def custom(self) -> bool:
+        """Sharding customizado (por chave) em vez de automático (por ID)."""
+        return self.shard_key is not None
+
+    def collection_kwargs(self) -> Dict[str, Any]:
+        """Parâmetros de `create_collection` (só os definidos; o resto fica no padrão do servidor)."""
+        kwargs = {
+            "shard_number": self.shard_number,
+            "replication_factor": self.replication_factor,
+            "write_consistency_factor": self.write_consistency_factor,
+            "sharding_method": models.ShardingMethod.CUSTOM if self.custom else None,
+        }
+        return {name: value for name, value in kwargs.items() if value is not None}
+
+    def create_shard_key(self, client: QdrantClient, collection: str) -> None:
+        """Cria a chave de shard (sharding customizado) com os shards e réplicas configurados."""
+        if self.custom:
+            client.create_shard_key(
+                collection_name=collection,
+                shard_key=self.shard_key,
+                shards_number=self.shard_number,
+                replication_factor=self.replication_factor,
+            )
+
+    def describe(self) -> str:
+        parts = [
+            f"shards={self.shard_number or 'padrão'}",
+            f"réplicas={self.replication_factor or 'padrão'}",
+        ]
+        if self.write_consistency_factor:
+            parts.append(f"consistência de escrita={self.write_consistency_factor}")
+        if self.custom:
+            parts.append(f"chave de shard='{self.shard_key}'")
+        return ", ".join(parts)
+
+
+def read_consistency(
+    value: Union[str, int, None]
+) -> Optional[Union[int, models.ReadConsistencyType]]:
+    """
+    Consistência de leitura das consultas.
+
+    "all", "majority" ou "quorum" (réplicas que precisam concordar), ou um
+    número de réplicas; None/"" usa o padrão do Qdrant (a primeira réplica
+    que responder).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    value = str(value).lower()
+    if value not in READ_CONSISTENCY_CHOICES:
+        raise ValueError(
+            f"Consistência de leitura inválida: {value} (use {', '.join(READ_CONSISTENCY_CHOICES)} ou um número)"
+        )
+    return models.ReadConsistencyType(value)
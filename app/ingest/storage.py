@@ -0,0 +1,161 @@
+"""
+Layout de armazenamento dos vetores densos da coleção.
+
+Os vetores `text-dense` (3072 dimensões, float32) ocupam 12 KB cada e, por
+padrão, ficam inteiros em RAM junto com o grafo HNSW. Aqui são configurados:
+
+- Quantização escalar (int8, 4x menor) ou binária (1 bit por dimensão, 32x
+  menor), mantida em RAM para a busca; os vetores originais são usados para
+  re-pontuar (`rescore`) os candidatos
+- Vetores originais em disco (`on_disk`), lidos só na re-pontuação
+- Grafo HNSW em disco (`hnsw_on_disk`)
+- Construção do HNSW: vizinhos por nó (`hnsw_m`), candidatos na construção
+  (`ef_construct`) e o limite abaixo do qual filtros usam busca exata em vez
+  do grafo (`full_scan_threshold`, em KB de vetores)
+
+A configuração vale na criação da coleção (`ensure_collection`); os parâmetros
+de busca correspondentes (`rescore`, `oversampling`, `hnsw_ef`, `exact`) ficam
+no `SelfQueryConfig`.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from qdrant_client import QdrantClient, models
+
+QUANTIZATION_CHOICES = ("none", "scalar", "binary")
+
+# Bytes por dimensão de cada representação (estimativa de memória)
+BYTES_PER_DIMENSION = {"none": 4.0, "scalar": 1.0, "binary": 1 / 8}
+
+# Limite de indexação padrão do Qdrant (KB de vetores por segmento)
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+
+@dataclass
+class VectorStorageConfig:
+    quantization: str = "none"
+    # Quantil usado para os limites da quantização escalar (descarta outliers)
+    quantile: float = 0.99
+    # Mantém os vetores quantizados em RAM (os originais podem ir para o disco)
+    always_ram: bool = True
+    on_disk: bool = False
+    hnsw_on_disk: bool = False
+    # Construção do HNSW (None = padrão do Qdrant: m=16, ef_construct=100,
+    # full_scan_threshold=10000 KB); m=0 desliga o grafo
+    hnsw_m: Optional[int] = None
+    ef_construct: Optional[int] = None
+    full_scan_threshold: Optional[int] = None
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATION_CHOICES:
+            raise ValueError(
+                f"Quantização inválida: {self.quantization} (use {', '.join(QUANTIZATION_CHOICES)})"
+            )
+        for name in ("hnsw_m", "ef_construct", "full_scan_threshold"):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"{name} deve ser >= 0 (recebido {value})")
+        if self.ef_construct is not None and self.ef_construct < 4:
+            raise ValueError(f"ef_construct deve ser >= 4 (recebido {self.ef_construct})")
+
+    def vector_params(self, size: int) -> models.VectorParams:
+        """Parâmetros do vetor denso para `create_collection`."""
+        return models.VectorParams(
+            size=size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk or None,
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_config(),
+        )
+
+    def hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        """Parâmetros de construção do HNSW; None mantém os da coleção."""
+        config = models.HnswConfigDiff(
+            m=self.hnsw_m,
+            ef_construct=self.ef_construct,
+            full_scan_threshold=self.full_scan_threshold,
+            on_disk=True if self.hnsw_on_disk else None,
+        )
+        return config if config.model_dump(exclude_none=True) else None
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.quantile,
+                    always_ram=self.always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.always_ram)
+            )
+        return None
+
+    def ram_bytes_per_vector(self, size: int) -> float:
+        """Estimativa de RAM por vetor (sem o grafo HNSW)."""
+        quantized = BYTES_PER_DIMENSION[self.quantization] * size if self.quantization != "none" else 0
+        original = 0 if self.on_disk else BYTES_PER_DIMENSION["none"] * size
+        return quantized + original
+
+    def describe(self) -> str:
+        parts = [f"quantização={self.quantization}"]
+        if self.on_disk:
+            parts.append("vetores em disco")
+        if self.hnsw_on_disk:
+            parts.append("HNSW em disco")
+        for label, value in (
+            ("m", self.hnsw_m),
+            ("ef_construct", self.ef_construct),
+            ("full_scan_threshold", self.full_scan_threshold),
+        ):
+            if value is not None:
+                parts.append(f"{label}={value}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def indexing_paused(
+    client: QdrantClient, collection: str, indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD
+) -> Iterator[None]:
+    """
+    Desliga a indexação HNSW durante uma carga em lote e a religa ao final,
+    também em caso de erro ou interrupção (Ctrl+C).
+
+    O valor restaurado é fixo, e não o lido da coleção: uma carga morta antes
+    do `finally` (ex.: kill -9) deixa 0 gravado, e "restaurar" esse valor na
+    retomada desligaria o HNSW de vez.
+    """
+    client.update_collection(collection, optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0))
+    try:
+        yield
+    finally:
+        client.update_collection(
+            collection, optimizers_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+        )
+
+
+def search_params(
+    rescore: bool = True,
+    oversampling: Optional[float] = None,
+    hnsw_ef: Optional[int] = None,
+    exact: bool = False,
+) -> Optional[models.SearchParams]:
+    """
+    Parâmetros de busca.
+
+    Com `oversampling` (ex.: 2.0), são buscados k * oversampling candidatos nos
+    vetores quantizados e re-pontuados com os originais. `hnsw_ef` é o número
+    de candidatos explorados no grafo (maior = mais recall e latência; padrão
+    do Qdrant: ef_construct) e `exact` ignora o grafo (busca exata). Retorna
+    None quando os padrões do Qdrant bastam.
+    """
+    quantization = None
+    if not rescore or oversampling is not None:
+        quantization = models.QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if quantization is None and hnsw_ef is None and not exact:
+        return None
+    return models.SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
@@ -0,0 +1,280 @@
+"""
+Armazenamento local dos textos dos chunks, endereçado pelo conteúdo (SHA-256).
+
+Cada busca do QdrantVectorStore devolve o payload completo de todos os
+candidatos, com os textos inteiros (`conteudo_principal`, `precedentes`),
+mesmo os que serão descartados depois. Com o text store, a busca pede ao
+Qdrant só IDs, scores e `metadata` (campos pequenos de filtro, com o hash do
+texto em `metadata.text_sha256`) e os textos são lidos de um SQLite local
+(mapeado em memória):
+
+- Ingestão: `upsert_chunks` grava o hash no payload e o texto no store
+- Consulta: `ProjectedQdrantVectorStore` busca sem `page_content` e preenche
+  os textos pelo hash; textos ausentes (ex.: chunks ingeridos em outra máquina)
+  são buscados no Qdrant uma única vez e guardados no store. Pontos ainda sem
+  hash (ingeridos antes do text store) têm o texto guardado em memória no
+  store, pelo ID do ponto (LRU limitado), até `sync_text_store` gravar o hash
+
+Para preencher o store (e o hash dos pontos antigos) a partir da coleção:
+    uv run python -m app.ingest.text_store --collection sumulas_tcemg
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import hashlib
+import sqlite3
+import threading
+
+from langchain_core.documents import Document
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient, models
+
+from app.ingest.versioning import MANIFEST_POINT_ID, bump_collection_version
+
+DEFAULT_TEXT_STORE_PATH = ".text_store.sqlite"
+
+# Chave do hash do texto dentro de `metadata`
+TEXT_DIGEST_KEY = "text_sha256"
+
+# Payload pedido ao Qdrant nas buscas projetadas (sem `page_content`)
+PROJECTED_PAYLOAD = ["metadata"]
+
+# Textos de pontos sem hash mantidos em memória, por (coleção, ID do ponto)
+DEFAULT_POINT_CACHE_SIZE = 10000
+
+# Limite de parâmetros por consulta do SQLite
+_SQL_BATCH = 500
+_MMAP_BYTES = 256 * 1024 * 1024
+
+
+def text_digest(text: str) -> str:
+    """Hash SHA-256 (hex) do texto."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TextStore:
+    """
+    Textos dos chunks em SQLite, por hash do conteúdo.
+
+    Textos iguais (ex.: o mesmo chunk em duas versões da coleção) são
+    gravados uma única vez. Seguro para uso entre threads (Streamlit).
+
+    Example:
+        >>> store = TextStore(".text_store.sqlite")
+        >>> digest = store.put("Texto do chunk")
+        >>> store.get(digest)
+        'Texto do chunk'
+    """
+
+    def __init__(self, path: str = DEFAULT_TEXT_STORE_PATH, point_cache_size: int = DEFAULT_POINT_CACHE_SIZE):
+        self.path = path
+        self.point_cache_size = point_cache_size
+        self._lock = threading.Lock()
+        # Pontos sem hash (ver `ProjectedQdrantVectorStore.hydrate`): LRU em memória
+        self._point_texts: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA mmap_size={_MMAP_BYTES}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts (digest TEXT PRIMARY KEY, text TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def put_many(self, texts: Iterable[str]) -> List[str]:
+        """Grava os textos (ignorando os já presentes) e retorna seus hashes."""
+        rows = [(text_digest(text), text) for text in texts]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO texts (digest, text) VALUES (?, ?)", rows)
+            self._conn.commit()
+        return [digest for digest, _ in rows]
+
+    def put(self, text: str) -> str:
+        return self.put_many([text])[0]
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, str]:
+        """Textos encontrados, por hash (hashes ausentes ficam de fora)."""
+        digests = list(dict.fromkeys(d for d in digests if d))
+        found: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(digests), _SQL_BATCH):
+                batch = digests[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    self._conn.execute(
+                        f"SELECT digest, text FROM texts WHERE digest IN ({placeholders})", batch
+                    ).fetchall()
+                )
+        return found
+
+    def get(self, digest: str) -> Optional[str]:
+        return self.get_many([digest]).get(digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.get_many([digest])
+
+    def get_point_texts(self, collection: str, point_ids: Iterable[str]) -> Dict[str, str]:
+        """Textos em cache de pontos sem hash, por ID (IDs ausentes ficam de fora)."""
+        found: Dict[str, str] = {}
+        with self._lock:
+            for point_id in point_ids:
+                key = (collection, str(point_id))
+                if key in self._point_texts:
+                    self._point_texts.move_to_end(key)
+                    found[str(point_id)] = self._point_texts[key]
+        return found
+
+    def put_point_texts(self, collection: str, texts: Dict[str, str]) -> None:
+        """Guarda textos de pontos sem hash, descartando os menos usados."""
+        with self._lock:
+            for point_id, text in texts.items():
+                key = (collection, str(point_id))
+                self._point_texts[key] = text
+                self._point_texts.move_to_end(key)
+            while len(self._point_texts) > self.point_cache_size:
+                self._point_texts.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def open_text_store(path: str) -> TextStore:
+    """Text store compartilhado por caminho (uma conexão por processo)."""
+    return TextStore(path)
+
+
+class ProjectedQdrantVectorStore(QdrantVectorStore):
+    """
+    QdrantVectorStore que busca só IDs, scores e `metadata` e lê os textos do TextStore.
+
+    A resposta do Qdrant cai de alguns KB por candidato (textos completos)
+    para algumas centenas de bytes, o que também barateia buscar mais
+    candidatos (ex.: `oversampling`).
+    """
+
+    def __init__(self, *args: Any, text_store: TextStore, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.text_store = text_store
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        kwargs.setdefault("with_payload", PROJECTED_PAYLOAD)
+        results = super().similarity_search_with_score(query, k=k, **kwargs)
+        self.hydrate([doc for doc, _ in results])
+        return results
+
+    def hydrate(self, docs: List[Document]) -> None:
+        """
+        Preenche `page_content` pelo hash; os ausentes no store vêm do Qdrant.
+
+        Pontos sem hash não têm como ser achados no store: o texto buscado no
+        Qdrant fica em cache no store pelo ID do ponto, para não repetir a busca
+        (o vector store é criado a cada consulta; o store é compartilhado).
+        """
+        texts = self.text_store.get_many(doc.metadata.get(TEXT_DIGEST_KEY) for doc in docs)
+        point_texts = self.text_store.get_point_texts(
+            self.collection_name,
+            (doc.metadata["_id"] for doc in docs if not doc.metadata.get(TEXT_DIGEST_KEY)),
+        )
+        missing = []
+        for doc in docs:
+            digest = doc.metadata.get(TEXT_DIGEST_KEY)
+            if digest:
+                text = texts.get(digest)
+            else:
+                text = point_texts.get(str(doc.metadata["_id"]))
+            if text is None:
+                missing.append(doc)
+            else:
+                doc.page_content = text
+        if not missing:
+            return
+
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[doc.metadata["_id"] for doc in missing],
+            with_payload=[self.content_payload_key],
+            with_vectors=False,
+        )
+        by_id = {str(p.id): (p.payload or {}).get(self.content_payload_key, "") for p in points}
+        with_digest, without_digest = [], {}
+        for doc in missing:
+            point_id = str(doc.metadata["_id"])
+            doc.page_content = by_id.get(point_id, "")
+            if not doc.page_content:
+                continue
+            if doc.metadata.get(TEXT_DIGEST_KEY):
+                with_digest.append(doc.page_content)
+            else:
+                without_digest[point_id] = doc.page_content
+        self.text_store.put_many(with_digest)
+        self.text_store.put_point_texts(self.collection_name, without_digest)
+
+
+def sync_text_store(
+    client: QdrantClient,
+    collection: str,
+    store: TextStore,
+    batch_size: int = 256,
+) -> Dict[str, Any]:
+    """
+    Copia os textos da coleção para o store e grava `metadata.text_sha256` nos
+    pontos que ainda não têm o hash (ingeridos antes do text store).
+
+    Returns:
+        Dict com 'scanned', 'stored' (textos novos no store), 'updated' (pontos
+        com hash gravado) e 'version'
+    """
+    scanned, stored, updated = 0, len(store), 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["page_content", "metadata"],
+            with_vectors=False,
+        )
+        points = [p for p in points if str(p.id) != MANIFEST_POINT_ID]
+        scanned += len(points)
+        digests = store.put_many((p.payload or {}).get("page_content") or "" for p in points)
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(payload={TEXT_DIGEST_KEY: digest}, points=[p.id], key="metadata")
+            )
+            for p, digest in zip(points, digests)
+            if ((p.payload or {}).get("metadata") or {}).get(TEXT_DIGEST_KEY) != digest
+        ]
+        if operations:
+            client.batch_update_points(collection_name=collection, update_operations=operations, wait=True)
+            updated += len(operations)
+        if offset is None:
+            break
+
+    version = bump_collection_version(client, collection, changed=["hash dos textos"]) if updated else None
+    return {"scanned": scanned, "stored": len(store) - stored, "updated": updated, "version": version}
+
+
+if __name__ == "__main__":
+    from app.ingest.aliases import resolve_alias
+    from app.ingest.embed_qdrant import EmbeddingSelfQuery
+    from app.utils.settings import settings
+
+    parser = argparse.ArgumentParser(description="Preenche o text store local a partir da coleção")
+    parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--path", default=settings.TEXT_STORE_PATH or DEFAULT_TEXT_STORE_PATH)
+    args = parser.parse_args()
+
+    client = EmbeddingSelfQuery(timeout=settings.QDRANT_INGEST_TIMEOUT).client
+    collection = resolve_alias(client, args.collection) or args.collection
+    result = sync_text_store(client, collection, TextStore(args.path))
+    print(
+        f"✅ {result['scanned']} pontos lidos de '{collection}': {result['stored']} textos novos em "
+        f"'{args.path}', {result['updated']} pontos com hash gravado"
+    )
@@ -0,0 +1,108 @@
+"""
+Versão da coleção de súmulas.
+
+Cada atualização da coleção (ingestão completa ou incremental) incrementa um
+contador gravado em um ponto de manifesto, sem vetores, dentro da própria
+coleção. Caches do lado de consulta comparam a versão para saber quando
+invalidar. O ponto não possui vetores nem `metadata`, então nunca aparece em
+buscas vetoriais nem em filtros do self-query.
+"""
+
+from typing import Any, Dict, List, Optional
+import time
+
+import grpc
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+# ID fixo do ponto de manifesto
+MANIFEST_POINT_ID = "00000000-0000-0000-0000-00000000c0de"
+
+# Prazo (epoch) da reconstrução blue/green em andamento (ver `app.ingest.aliases.rebuild_lease`)
+REBUILD_LEASE_KEY = "rebuild_lease_until"
+
+
+def is_not_found(error: BaseException) -> bool:
+    """Erro do Qdrant de coleção inexistente (REST, gRPC ou modo local)."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 404
+    if isinstance(error, grpc.RpcError):
+        code = getattr(error, "code", None)
+        return callable(code) and code() == grpc.StatusCode.NOT_FOUND
+    # Modo local (QdrantClient(":memory:") / path): ValueError("Collection ... not found")
+    return isinstance(error, ValueError) and "not found" in str(error)
+
+
+def read_manifest(client: QdrantClient, collection: str) -> Optional[Dict[str, Any]]:
+    """
+    Payload do ponto de manifesto (None se não existe ou a coleção não existe).
+
+    Outros erros (conexão, timeout, autenticação) são re-levantados: tratá-los
+    como versão 0 faria o próximo `bump_collection_version` voltar à versão 1.
+    """
+    try:
+        records = client.retrieve(
+            collection_name=collection,
+            ids=[MANIFEST_POINT_ID],
+            with_payload=True,
+            with_vectors=False,
+        )
+    except Exception as e:
+        if is_not_found(e):
+            return None
+        raise
+    return (records[0].payload or {}) if records else None
+
+
+def write_manifest(
+    client: QdrantClient, collection: str, payload: Dict[str, Any], shard_key: Optional[str] = None
+) -> None:
+    """Grava o ponto de manifesto (sem vetores)."""
+    client.upsert(
+        collection_name=collection,
+        points=[models.PointStruct(id=MANIFEST_POINT_ID, vector={}, payload=payload)],
+        wait=True,
+        shard_key_selector=shard_key,
+    )
+
+
+def get_collection_version(client: QdrantClient, collection: str) -> int:
+    """Versão atual da coleção (0 se nunca versionada ou inexistente)."""
+    return int((read_manifest(client, collection) or {}).get("collection_version", 0))
+
+
+def rebuild_in_progress(client: QdrantClient, collection: str) -> bool:
+    """Há uma reconstrução blue/green em andamento (prazo no manifesto ainda não vencido)."""
+    until = (read_manifest(client, collection) or {}).get(REBUILD_LEASE_KEY)
+    return bool(until) and until > time.time()
+
+
+def bump_collection_version(
+    client: QdrantClient,
+    collection: str,
+    changed: List[str] = (),
+    at_least: int = 0,
+    shard_key: Optional[str] = None,
+) -> int:
+    """
+    Incrementa a versão da coleção.
+
+    Args:
+        changed: Nomes dos PDFs alterados nesta atualização (informativo)
+        at_least: Versão mínima (ex.: a da coleção substituída + 1, na troca de alias)
+        shard_key: Chave de shard da ingestão (coleções com sharding customizado)
+
+    Returns:
+        Nova versão
+    """
+    manifest = read_manifest(client, collection) or {}
+    version = max(int(manifest.get("collection_version", 0)) + 1, at_least)
+    payload: Dict[str, Any] = {
+        "collection_version": version,
+        "updated_at": time.time(),
+        "changed": list(changed)[:50],
+    }
+    if REBUILD_LEASE_KEY in manifest:
+        payload[REBUILD_LEASE_KEY] = manifest[REBUILD_LEASE_KEY]
+    write_manifest(client, collection, payload, shard_key=shard_key)
+    return version
@@ -0,0 +1,267 @@
+"""
+Modo watch: ingestão incremental contínua da pasta de súmulas.
+
+Detecta PDFs adicionados, alterados ou removidos em `sumulas/` e aplica
+somente as diferenças na coleção, incrementando a versão da coleção
+(`app.ingest.versioning`) a cada atualização.
+
+A detecção usa o `watchdog` (inotify no Linux) quando instalado e, caso
+contrário, varredura periódica da pasta. Rajadas de eventos (ex.: cópia de
+vários arquivos) são agrupadas: a atualização só é aplicada depois que a
+pasta fica estável por `debounce` segundos.
+
+PDFs cuja ingestão falhou (ex.: 429 da OpenAI, timeout do Qdrant) são tentados
+de novo com espera exponencial, e remoções que falharam ficam pendentes e são
+refeitas a cada varredura.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import threading
+import time
+
+from app.ingest.chunking import DEFAULT_MAX_TOKENS, DEFAULT_OVERLAP_TOKENS
+from app.ingest.embed_qdrant import EmbeddingSelfQuery
+from app.ingest.extract_text import delete_pdf_points, ingest_pdf
+from app.ingest.journal import IngestJournal
+from app.ingest.text_store import TextStore
+from app.ingest.versioning import bump_collection_version, get_collection_version, rebuild_in_progress
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog é opcional: usa varredura periódica
+    FileSystemEventHandler = object
+    Observer = None
+
+# (mtime_ns, tamanho) de cada PDF
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def take_snapshot(pasta_pdfs: str) -> Snapshot:
+    """Lista os PDFs da pasta com mtime e tamanho."""
+    snapshot = {}
+    for pdf_file in Path(pasta_pdfs).glob("*.pdf"):
+        try:
+            stat = pdf_file.stat()
+        except FileNotFoundError:
+            continue  # removido durante a varredura
+        snapshot[pdf_file.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(
+    old: Snapshot, new: Snapshot
+) -> Tuple[List[str], List[str], List[str]]:
+    """Compara dois snapshots e retorna (adicionados, alterados, removidos)."""
+    added = sorted(name for name in new if name not in old)
+    changed = sorted(name for name in new if name in old and new[name] != old[name])
+    removed = sorted(name for name in old if name not in new)
+    return added, changed, removed
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Acorda o loop de watch a cada evento de PDF."""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        if str(getattr(event, "src_path", "")).lower().endswith(".pdf") or str(
+            getattr(event, "dest_path", "")
+        ).lower().endswith(".pdf"):
+            self.wake.set()
+
+
+class SumulasWatcher:
+    """
+    Aplica incrementalmente as mudanças da pasta de PDFs na coleção.
+
+    Example:
+        >>> watcher = SumulasWatcher("sumulas", embedder, "sumulas_tcemg", journal)
+        >>> watcher.run_forever()
+    """
+
+    def __init__(
+        self,
+        pasta_pdfs: str,
+        embedder: EmbeddingSelfQuery,
+        collection: str,
+        journal: IngestJournal,
+        debounce: float = 2.0,
+        poll_interval: float = 5.0,
+        max_chunk_tokens: int = DEFAULT_MAX_TOKENS,
+        chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+        shard_key: Optional[str] = None,
+        text_store: Optional[TextStore] = None,
+        retry_delay: float = 30.0,
+        max_retry_delay: float = 900.0,
+    ):
+        self.pasta_pdfs = pasta_pdfs
+        self.embedder = embedder
+        self.collection = collection
+        self.journal = journal
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.shard_key = shard_key
+        self.text_store = text_store
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        # Estado aplicado: na primeira sincronização, tudo conta como "adicionado"
+        # (o journal evita reprocessar PDFs já ingeridos com o mesmo conteúdo)
+        self.applied: Snapshot = {}
+        # PDFs cuja ingestão falhou: (tentativas, instante da próxima tentativa em
+        # `time.monotonic()`); a espera dobra a cada falha até `max_retry_delay`
+        self.failed: Dict[str, Tuple[int, float]] = {}
+        # PDFs removidos da pasta cujos pontos ainda não foram apagados
+        self.pending_removals: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def collection_version(self) -> int:
+        """Versão atual da coleção (para invalidação de caches de consulta)."""
+        return get_collection_version(self.embedder.client, self.collection)
+
+    def wait_until_stable(self, snapshot: Snapshot) -> Snapshot:
+        """Espera a pasta ficar sem mudanças por `debounce` segundos."""
+        while not self._stop.is_set():
+            self._stop.wait(self.debounce)
+            current = take_snapshot(self.pasta_pdfs)
+            if current == snapshot:
+                return current
+            snapshot = current
+        return snapshot
+
+    def retry_due(self) -> bool:
+        """Há remoções pendentes ou falhas cuja espera já terminou."""
+        now = time.monotonic()
+        return bool(self.pending_removals) or any(due <= now for _, due in self.failed.values())
+
+    def _record_failure(self, name: str) -> float:
+        """Registra a falha de ingestão do PDF e retorna a espera até a próxima tentativa."""
+        attempts = self.failed.get(name, (0, 0.0))[0] + 1
+        delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+        self.failed[name] = (attempts, time.monotonic() + delay)
+        return delay
+
+    def sync(self) -> Optional[int]:
+        """
+        Aplica as diferenças entre a pasta e o estado já aplicado, refazendo as
+        falhas cuja espera terminou e as remoções pendentes.
+
+        Durante uma reconstrução blue/green (`--rebuild`) nada é aplicado: as
+        mudanças ficam pendentes e vão para a nova versão depois da troca.
+
+        Returns:
+            Nova versão da coleção, ou None se nada mudou
+        """
+        if rebuild_in_progress(self.embedder.client, self.collection):
+            print(f"⏸️ Reconstrução de '{self.collection}' em andamento; sincronização adiada.")
+            return None
+
+        snapshot = take_snapshot(self.pasta_pdfs)
+        added, changed, removed = diff_snapshots(self.applied, snapshot)
+
+        if not self.applied:
+            # Primeira sincronização: PDFs do journal que sumiram da pasta
+            removed = sorted(set(self.journal.known_files()) - set(snapshot))
+
+        # Falhas de arquivos que não mudaram: nova tentativa depois da espera
+        now = time.monotonic()
+        for name in list(self.failed):
+            if name not in snapshot:
+                self.failed.pop(name)
+        retried = sorted(
+            name
+            for name, (_, due) in self.failed.items()
+            if due <= now and name not in added and name not in changed
+        )
+        self.pending_removals -= set(snapshot)
+        removed = sorted(set(removed) | self.pending_removals)
+
+        updated = []
+        for name in added + changed + retried:
+            try:
+                inserted = ingest_pdf(
+                    Path(self.pasta_pdfs) / name,
+                    self.embedder,
+                    self.collection,
+                    self.journal,
+                    max_chunk_tokens=self.max_chunk_tokens,
+                    chunk_overlap_tokens=self.chunk_overlap_tokens,
+                    shard_key=self.shard_key,
+                    text_store=self.text_store,
+                )
+            except Exception as e:
+                delay = self._record_failure(name)
+                print(f"⚠️ Erro ao processar {name}: {e} (nova tentativa em {delay:.0f}s)")
+                continue
+            self.failed.pop(name, None)
+            if inserted:
+                updated.append(name)
+
+        for name in removed:
+            try:
+                delete_pdf_points(self.embedder, self.collection, name, shard_key=self.shard_key)
+            except Exception as e:
+                print(f"⚠️ Erro ao remover {name}: {e} (nova tentativa na próxima varredura)")
+                self.pending_removals.add(name)
+                continue
+            self.journal.record_removal(name)
+            self.pending_removals.discard(name)
+            updated.append(name)
+
+        self.applied = snapshot
+
+        if not updated:
+            return None
+
+        version = bump_collection_version(
+            self.embedder.client, self.collection, changed=updated, shard_key=self.shard_key
+        )
+        print(
+            f"🔄 Coleção '{self.collection}' v{version}: "
+            f"{len(added)} adicionados, {len(changed) + len(retried)} alterados, {len(removed)} removidos."
+        )
+        return version
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run_forever(self) -> None:
+        """Sincroniza continuamente até `stop()` (ou Ctrl+C)."""
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_WakeHandler(self._wake), self.pasta_pdfs, recursive=False)
+            observer.start()
+            print(f"👀 Observando '{self.pasta_pdfs}' (eventos do sistema de arquivos).")
+        else:
+            print(
+                f"👀 Observando '{self.pasta_pdfs}' (varredura a cada {self.poll_interval}s)."
+            )
+
+        try:
+            self.sync()
+            while not self._stop.is_set():
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                snapshot = take_snapshot(self.pasta_pdfs)
+                if snapshot != self.applied:
+                    self.wait_until_stable(snapshot)
+                elif not self.retry_due():
+                    continue
+                self.sync()
+        except KeyboardInterrupt:
+            print("\n⏹️ Watch encerrado.")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
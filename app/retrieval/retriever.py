@@ -1,16 +1,61 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
+import numpy as np
 from langchain.retrievers.self_query.base import SelfQueryRetriever
 from langchain_core.documents import Document
 from app.ingest.embed_qdrant import EmbeddingSelfQuery
 from app.retrieval.self_query import document_content_description, metadata_field_info
+from app.utils.settings import settings
+from app.ingest.sharding import read_consistency
+from app.ingest.storage import search_params
+from app.ingest.text_store import TextStore, open_text_store
 from dataclasses import dataclass
+from qdrant_client import QdrantClient, models
 
 
 @dataclass
 class SelfQueryConfig:
-    collection_name: str = "sumulas_tcemg"
+    # Alias da versão ativa (reconstruções trocam o alias, ver app.ingest.aliases)
+    collection_name: str = settings.QDRANT_COLLECTION
     k: int = 10
+    # Coleções quantizadas (ver app.ingest.storage): re-pontuar com os vetores
+    # originais e buscar k * oversampling candidatos
+    rescore: bool = True
+    oversampling: Optional[float] = None
+    # HNSW: candidatos explorados no grafo (None = padrão da coleção) ou busca
+    # exata, que ignora o grafo
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+    # Qdrant com vários nós (ver app.ingest.sharding): réplicas que precisam
+    # concordar na leitura e chave de shard consultada (sharding customizado)
+    read_consistency: Union[str, int, None] = settings.QDRANT_READ_CONSISTENCY
+    shard_key: Optional[str] = settings.QDRANT_SHARD_KEY
+    # Text store local (ver app.ingest.text_store): as buscas pedem ao Qdrant
+    # só IDs, scores e metadata, e os textos vêm do store
+    text_store_path: Optional[str] = settings.TEXT_STORE_PATH or None
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        return search_params(
+            rescore=self.rescore,
+            oversampling=self.oversampling,
+            hnsw_ef=self.hnsw_ef,
+            exact=self.exact,
+        )
+
+    def text_store(self) -> Optional[TextStore]:
+        return open_text_store(self.text_store_path) if self.text_store_path else None
+
+    def search_kwargs(self) -> Dict:
+        kwargs = {"k": self.k}
+        params = self.search_params()
+        if params is not None:
+            kwargs["search_params"] = params
+        consistency = read_consistency(self.read_consistency)
+        if consistency is not None:
+            kwargs["consistency"] = consistency
+        if self.shard_key:
+            kwargs["shard_key_selector"] = self.shard_key
+        return kwargs
 
 
 class RobustSelfQueryRetriever(SelfQueryRetriever):
@@ -38,7 +83,7 @@ def build_self_query_retriever(cfg: SelfQueryConfig) -> SelfQueryRetriever:
     Cria o SelfQueryRetriever sobre o QdrantVectorStore com tratamento robusto de erros.
     """
     embedder = EmbeddingSelfQuery()
-    vectorstore = embedder.get_qdrant_vector_store(cfg.collection_name)
+    vectorstore = embedder.get_qdrant_vector_store(cfg.collection_name, text_store=cfg.text_store())
 
     retriever = RobustSelfQueryRetriever.from_llm(
         llm=embedder.llm,
@@ -46,7 +91,7 @@ def build_self_query_retriever(cfg: SelfQueryConfig) -> SelfQueryRetriever:
         document_contents=document_content_description,
         metadata_field_info=metadata_field_info,
         enable_limit=True,
-        search_kwargs={"k": cfg.k},
+        search_kwargs=cfg.search_kwargs(),
     )
 
     return retriever
@@ -63,3 +108,48 @@ def search(
     retriever = build_self_query_retriever(cfg)
     # .invoke() retorna List[Document]
     return retriever.invoke(query)
+
+
+def fetch_chunk_vectors(
+    client: QdrantClient,
+    docs: List[Document],
+    vector_name: str = "text-dense",
+) -> np.ndarray:
+    """
+    Busca os vetores densos já armazenados dos documentos recuperados, sem re-embedding.
+
+    O QdrantVectorStore descarta os vetores dos resultados, mas guarda o id do
+    ponto e a coleção em `_id` / `_collection_name`; uma chamada `retrieve`
+    (`with_vectors`) por coleção traz os vetores.
+
+    Returns:
+        Matriz (documentos com vetor × dimensão), na ordem dos documentos
+    """
+    ids_by_collection: Dict[str, List] = {}
+    for doc in docs:
+        md = doc.metadata or {}
+        if md.get("_id") is not None and md.get("_collection_name"):
+            ids_by_collection.setdefault(md["_collection_name"], []).append(md["_id"])
+
+    vectors = {}
+    for collection_name, ids in ids_by_collection.items():
+        points = client.retrieve(
+            collection_name=collection_name,
+            ids=ids,
+            with_payload=False,
+            with_vectors=[vector_name],
+        )
+        for point in points:
+            vectors[(collection_name, str(point.id))] = point.vector[vector_name]
+
+    rows = [
+        vectors[key]
+        for key in (
+            ((doc.metadata or {}).get("_collection_name"), str((doc.metadata or {}).get("_id")))
+            for doc in docs
+        )
+        if key in vectors
+    ]
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.asarray(rows, dtype=np.float32)
@@ -25,7 +25,7 @@ metadata_field_info = [
         description=(
             "Ano da publicação no formato 'AAAA' (integer). Ex.: '2014'.\n"
             "- Você PODE usar operadores de comparação (lt, gt, lte, gte) e igualdade (eq).\n"
-            "- Para anos (ex.: 'antes de 2010'), interprete como comparações sobre datas, mesmo que o campo seja string.\n"
+            "- Para anos (ex.: 'antes de 2010'), compare com o ano como número inteiro (ex.: 2010).\n"
             "- Se o usuário disser 'antes de AAAA', use 'lt' e considere o começo do ano AAAA como limite.\n"
             "- Se o usuário disser 'depois de AAAA', use 'gt' e considere o fim do ano AAAA como limite.\n"
         ),
@@ -46,6 +46,11 @@ metadata_field_info = [
         description="Índice do chunk no documento.",
         type="integer",
     ),
+    AttributeInfo(
+        name="sub_chunk_index",
+        description="Índice do sub-chunk dentro do chunk (seções longas são subdivididas).",
+        type="integer",
+    ),
 ]
 document_content_description = """
     Coleção de trechos (chunks) de súmulas do Tribunal de Contas de Minas Gerais, 
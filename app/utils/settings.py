@@ -17,5 +17,41 @@ class Settings:
     QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT = os.getenv("QDRANT_PORT", "6333")
 
+    # Qdrant transport: gRPC (port 6334) avoids JSON-encoding vectors and payloads
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes")
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+    # Qdrant connection pool (HTTP connections or gRPC channels) and keep-alive
+    QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "10"))
+    QDRANT_KEEPALIVE_SECONDS = float(os.getenv("QDRANT_KEEPALIVE_SECONDS", "30"))
+
+    # Qdrant timeouts in seconds: connection setup, queries (short) and ingestion (long)
+    QDRANT_CONNECT_TIMEOUT = float(os.getenv("QDRANT_CONNECT_TIMEOUT", "5"))
+    QDRANT_QUERY_TIMEOUT = float(os.getenv("QDRANT_QUERY_TIMEOUT", "10"))
+    QDRANT_INGEST_TIMEOUT = float(os.getenv("QDRANT_INGEST_TIMEOUT", "120"))
+
+    # Multi-node Qdrant: read consistency ("majority", "quorum", "all" or a number
+    # of replicas; empty = first replica to answer) and shard key used by queries
+    QDRANT_READ_CONSISTENCY = os.getenv("QDRANT_READ_CONSISTENCY", "")
+    QDRANT_SHARD_KEY = os.getenv("QDRANT_SHARD_KEY") or None
+
+    # Local content-addressed store of chunk texts (SQLite). When set, ingestion
+    # fills it and searches fetch only ids, scores and metadata from Qdrant
+    TEXT_STORE_PATH = os.getenv("TEXT_STORE_PATH", "")
+
+    # Collection (or alias, see app/ingest/aliases.py) used by queries and ingestion
+    QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "sumulas_tcemg")
+
+    # Embedding dimension (text-embedding-3-large: up to 3072; smaller values
+    # use Matryoshka-shortened embeddings and must match the collection)
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "3072"))
+
+    # Guardrails: semantic grounding check (one extra embedding request per answer)
+    SEMANTIC_GROUNDING = os.getenv("SEMANTIC_GROUNDING", "false").lower() in ("1", "true", "yes")
+
+    # Guardrails: corrective regeneration ("reask") budget per request
+    REASK_MAX_ATTEMPTS = int(os.getenv("REASK_MAX_ATTEMPTS", "2"))
+    REASK_DEADLINE_SECONDS = float(os.getenv("REASK_DEADLINE_SECONDS", "30"))
+
 
 settings = Settings()
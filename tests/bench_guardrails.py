@@ -0,0 +1,236 @@
+"""
+Microbenchmarks dos validators de Guardrails.
+
+Compara a busca de termos ofensivos antiga (um `term in texto` por termo e um
+regex compilado por ocorrência) com o `TermMatcher` (regex único, passada
+única) em respostas longas, a verificação de base no contexto antiga
+(substring por palavra no contexto inteiro) com o índice de radicais, mede o
+índice de citações literais (`QuoteIndex`), compara o `validate_output` construindo os validators a
+cada chamada com o `ValidationPipeline` reutilizado, mede o `ValidationCache` e
+a validação em lote (`validate_output_batch`).
+
+Como executar:
+    uv run python tests/bench_guardrails.py
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+
+from app.guardrails.batch import validate_output_batch
+from app.guardrails.guards import (
+    BasicToxicLanguage,
+    HallucinationDetection,
+    ProfanityCheck,
+    QuoteIndex,
+    TermMatcher,
+    ValidationCache,
+    ValidationPipeline,
+    VerbatimQuoteCheck,
+    build_context_terms,
+    get_validation_pipeline,
+)
+
+PARAGRAPH = (
+    "Conforme a Súmula Nº 70, a falta de aplicação anual pelo Município de 25%, "
+    "no mínimo, da receita resultante de impostos, em qualquer circunstância, "
+    "poderá ensejar a responsabilização do gestor, sem prejuízo da acumulação de "
+    "outras sanções previstas na legislação vigente. "
+)
+
+
+def naive_redact(terms, value):
+    """Implementação anterior: O(termos × texto) + um regex por termo encontrado."""
+    value_lower = value.lower()
+    found = [term for term in terms if term in value_lower]
+    clean_value = value
+    for term in found:
+        pattern = re.compile(re.escape(term), re.IGNORECASE)
+        clean_value = pattern.sub("[removido]", clean_value)
+    return clean_value, found
+
+
+def naive_grounding(value, context_text):
+    """Implementação anterior: normaliza o contexto e busca substring por palavra, em cada frase."""
+    grounded = 0
+    sentences = [s.strip() for s in value.split('.') if len(s.strip()) > 20]
+    for sentence in sentences:
+        clean_sentence = re.sub(r'súmula \d+', 'súmula', sentence.lower())
+        clean_context = re.sub(r'súmula \d+', 'súmula', context_text.lower())
+        words = [w for w in clean_sentence.split() if len(w) > 4]
+        if words and sum(1 for w in words if w in clean_context) / len(words) > 0.5:
+            grounded += 1
+    return grounded
+
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"  {label:<28}{seconds * 1e6:>12.1f} µs")
+    return seconds
+
+
+def bench_term_matching():
+    print("\n" + "=" * 60)
+    print("TERMOS OFENSIVOS: busca ingênua vs TermMatcher")
+    print("=" * 60)
+
+    terms = BasicToxicLanguage.TOXIC_TERMS + ProfanityCheck.PROFANITY_WORDS
+    toxic_matcher = BasicToxicLanguage.MATCHER
+    profanity_matcher = ProfanityCheck.MATCHER
+
+    for repeats in (5, 50, 500):
+        text = PARAGRAPH * repeats + " que merda!"
+        number = max(1, 2000 // repeats)
+        print(f"\nTexto com {len(text):,} caracteres:")
+        naive = bench(
+            "ingênua (2 validators)",
+            lambda: (naive_redact(terms[:14], text), naive_redact(terms[14:], text)),
+            number,
+        )
+        fast = bench(
+            "TermMatcher (2 validators)",
+            lambda: (toxic_matcher.redact(text), profanity_matcher.terms_found(text)),
+            number,
+        )
+        print(f"  {'speedup':<28}{naive / fast:>12.1f}x")
+        print(f"  falsos positivos (ingênua): {naive_redact(terms, text)[1]}")
+        print(f"  encontrados (TermMatcher):  {toxic_matcher.terms_found(text)}")
+
+
+def bench_term_count_scaling():
+    print("\n" + "=" * 60)
+    print("ESCALA COM O NÚMERO DE TERMOS (texto de ~13 mil caracteres)")
+    print("=" * 60)
+
+    text = PARAGRAPH * 50
+    base = BasicToxicLanguage.TOXIC_TERMS
+    for n_terms in (len(base), 140, 1400):
+        terms = base + [f"termo{i:04d}" for i in range(n_terms - len(base))]
+        matcher = TermMatcher(terms)
+        print(f"\n{n_terms} termos:")
+        naive = bench("ingênua", lambda: naive_redact(terms, text), 50)
+        fast = bench("TermMatcher", lambda: matcher.redact(text), 50)
+        print(f"  {'speedup':<28}{naive / fast:>12.1f}x")
+
+
+def bench_grounding():
+    print("\n" + "=" * 60)
+    print("BASE NO CONTEXTO: substring por frase vs índice de radicais")
+    print("(todas as frases da resposta, todos os documentos)")
+    print("=" * 60)
+
+    validator = HallucinationDetection()
+    for sentences, docs in ((5, 5), (20, 20), (80, 50)):
+        answer = PARAGRAPH * (sentences // 2)
+        context = "\n".join(PARAGRAPH * 6 for _ in range(docs))
+        number = max(1, 400 // (sentences * docs // 25))
+        print(f"\nResposta com {len(answer):,} e contexto com {len(context):,} caracteres:")
+        naive = bench("ingênua", lambda: naive_grounding(answer, context), number)
+        fast = bench(
+            "índice de radicais",
+            lambda: validator.score_sentences(answer, build_context_terms(context)),
+            number,
+        )
+        print(f"  {'speedup':<28}{naive / fast:>12.1f}x")
+
+
+def bench_quote_index():
+    print("\n" + "=" * 60)
+    print("CITAÇÕES LITERAIS: construção do QuoteIndex e verificação")
+    print("=" * 60)
+
+    quote = "> " + PARAGRAPH * 2
+    answer = ("**Conforme a Súmula Nº 70:**\n" + quote + "\n\n") * 3
+    validator = VerbatimQuoteCheck()
+    for docs in (5, 20, 50):
+        context = "\n".join(PARAGRAPH * 6 for _ in range(docs))
+        print(f"\nContexto com {len(context):,} caracteres:")
+        bench("construção do índice", lambda: QuoteIndex(context), 20)
+        index = QuoteIndex(context)
+        bench(
+            "verificação (3 blocos)",
+            lambda: validator.validate(answer, {"quote_index": index}),
+            500,
+        )
+
+
+def bench_pipeline_reuse():
+    print("\n" + "=" * 60)
+    print("VALIDATE_OUTPUT: pipeline novo por chamada vs reutilizado")
+    print("=" * 60)
+
+    docs = [
+        Document(page_content=PARAGRAPH * 3, metadata={"num_sumula": str(70 + i)})
+        for i in range(5)
+    ]
+    answer = PARAGRAPH * 4 + "(Status da Súmula: VIGENTE, Número da Súmula: 70)"
+
+    fresh = bench(
+        "pipeline por chamada",
+        lambda: ValidationPipeline().validate(answer, context_docs=docs),
+        500,
+    )
+    pipeline = get_validation_pipeline()
+    reused = bench(
+        "pipeline reutilizado",
+        lambda: pipeline.validate(answer, context_docs=docs),
+        500,
+    )
+    print(f"  {'speedup':<28}{fresh / reused:>12.1f}x")
+    print(f"  tempos por validator (ms): {pipeline.validate(answer, docs)['timings_ms']}")
+
+    cache = ValidationCache()
+    pipeline.validate(answer, context_docs=docs, cache=cache)
+    cached = bench(
+        "resultado em cache",
+        lambda: pipeline.validate(answer, context_docs=docs, cache=cache),
+        5000,
+    )
+    print(f"  {'speedup (cache)':<28}{reused / cached:>12.1f}x")
+
+
+def bench_batch_validation():
+    print("\n" + "=" * 60)
+    print("VALIDAÇÃO EM LOTE: 2.000 respostas sobre 20 contextos")
+    print("=" * 60)
+
+    contexts = [
+        [Document(page_content=PARAGRAPH * 6, metadata={"num_sumula": str(70 + i), "_id": f"{i}-{j}"})
+         for j in range(5)]
+        for i in range(20)
+    ]
+    items = [
+        {"id": n, "answer": PARAGRAPH * 3 + f" Súmula {70 + n % 20}.", "context_docs": contexts[n % 20]}
+        for n in range(2000)
+    ]
+    pipeline = ValidationPipeline()
+
+    def one_by_one():
+        for item in items:
+            pipeline.validate(item["answer"], context_docs=item["context_docs"])
+
+    single = bench("uma a uma", one_by_one, 1)
+    batched = bench("em lote (1 processo)", lambda: validate_output_batch(items), 1)
+    parallel = bench("em lote (4 processos)", lambda: validate_output_batch(items, processes=4), 1)
+    print(f"  {'speedup (lote)':<28}{single / batched:>12.1f}x")
+    print(f"  {'speedup (lote, 4 processos)':<28}{single / parallel:>12.1f}x")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MICROBENCHMARKS DE GUARDRAILS")
+    print("=" * 60)
+    bench_term_matching()
+    bench_term_count_scaling()
+    bench_grounding()
+    bench_quote_index()
+    bench_pipeline_reuse()
+    bench_batch_validation()
+    print("=" * 60)
@@ -0,0 +1,176 @@
+"""
+Benchmark dos parâmetros do HNSW: construção (m, ef_construct) e busca (hnsw_ef, exact).
+
+Para cada combinação de construção cria uma coleção e varre `hnsw_ef` e a
+busca exata (`SelfQueryConfig.hnsw_ef` / `exact`), com e sem filtro. O
+filtro reproduz o caso de um status raro (ex.: `status_atual == REVOGADA`,
+~10% dos pontos), em que a busca exata ou o `full_scan_threshold` podem ser
+melhores que o grafo. Reporta recall@k contra a busca exata (numpy) e
+latência p50/p95.
+
+Requer um Qdrant servidor: o modo local (":memory:") ignora o HNSW e faz
+busca exata, então serve apenas para conferir o script.
+
+Como executar:
+    docker compose up -d qdrant
+    uv run python tests/bench_hnsw.py --points 20000
+    uv run python tests/bench_hnsw.py --full-scan-threshold 1000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest.payload_schema import PAYLOAD_SCHEMA, create_indexes
+from app.ingest.storage import VectorStorageConfig, search_params
+from bench_vector_storage import synthetic_vectors
+
+# (m, ef_construct); o primeiro é o padrão do Qdrant
+BUILD_CONFIGS = [(16, 100), (8, 64), (32, 256), (64, 512)]
+# hnsw_ef avaliados na busca (None = padrão da coleção); "exata" ignora o grafo
+EF_VALUES = [None, 16, 32, 64, 128, 256]
+
+RARE_STATUS = "REVOGADA"
+STATUS_FILTER = models.Filter(
+    must=[models.FieldCondition(key="metadata.status_atual", match=models.MatchValue(value=RARE_STATUS))]
+)
+
+
+def build_collection(
+    client: QdrantClient, name: str, storage: VectorStorageConfig, vectors: np.ndarray, statuses: List[str]
+) -> List[str]:
+    """Cria a coleção com os parâmetros de construção, insere os vetores e espera a indexação."""
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(name, vectors_config={"text-dense": storage.vector_params(vectors.shape[1])})
+    create_indexes(client, name, tuple(f for f in PAYLOAD_SCHEMA if f.name == "status_atual"))
+
+    ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+    for start in range(0, len(vectors), 256):
+        client.upsert(
+            name,
+            points=[
+                models.PointStruct(
+                    id=ids[i],
+                    vector={"text-dense": vectors[i].tolist()},
+                    payload={"metadata": {"status_atual": statuses[i]}},
+                )
+                for i in range(start, min(start + 256, len(vectors)))
+            ],
+            wait=True,
+        )
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(0.5)
+    return ids
+
+
+def exact_top_k(queries: np.ndarray, base: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Índices dos k vizinhos exatos (cosseno), opcionalmente só entre os pontos de `mask`."""
+    scores = queries @ base.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def measure(
+    client: QdrantClient,
+    name: str,
+    queries: np.ndarray,
+    truth: List[set],
+    k: int,
+    params: Optional[models.SearchParams],
+    query_filter: Optional[models.Filter] = None,
+) -> Tuple[float, float, float]:
+    """Retorna (recall@k, p50 ms, p95 ms)."""
+    hits, latencies = 0, []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = client.query_points(
+            name, query=query.tolist(), using="text-dense", limit=k,
+            search_params=params, query_filter=query_filter,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {str(p.id) for p in result.points})
+    recall = hits / sum(len(t) for t in truth)
+    return recall, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def run_benchmark(
+    url: str = "http://localhost:6333",
+    points: int = 20000,
+    dim: int = 3072,
+    queries: int = 100,
+    k: int = 10,
+    rare_fraction: float = 0.1,
+    full_scan_threshold: Optional[int] = None,
+) -> Dict[str, Dict[str, float]]:
+    client = QdrantClient(":memory:") if url == ":memory:" else QdrantClient(url=url, timeout=300)
+    if url == ":memory:":
+        print("⚠️  Qdrant local: o HNSW é ignorado (busca exata)")
+
+    vectors = synthetic_vectors(points + queries, dim)
+    base, query_vectors = vectors[:-queries], vectors[-queries:]
+    rng = np.random.default_rng(7)
+    rare = rng.random(len(base)) < rare_fraction
+    statuses = [RARE_STATUS if r else "VIGENTE" for r in rare]
+    print(
+        f"\nPontos: {len(base)} ({rare.sum()} com status {RARE_STATUS}) | Consultas: {len(query_vectors)} "
+        f"| Dimensão: {dim} | k={k}"
+    )
+
+    exact_all = exact_top_k(query_vectors, base, k)
+    exact_rare = exact_top_k(query_vectors, base, k, rare)
+
+    header = f"{'Construção':<22}{'Filtro':<10}{'Busca':<12}{'Recall@k':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    results = {}
+    for m, ef_construct in BUILD_CONFIGS:
+        storage = VectorStorageConfig(hnsw_m=m, ef_construct=ef_construct, full_scan_threshold=full_scan_threshold)
+        build = f"m={m} ef_c={ef_construct}"
+        name = f"bench_hnsw_m{m}_ef{ef_construct}"
+        start = time.perf_counter()
+        ids = build_collection(client, name, storage, base, statuses)
+        print(f"{build:<22}(construção: {time.perf_counter() - start:.1f}s)")
+
+        for label, query_filter, exact in (("nenhum", None, exact_all), (RARE_STATUS, STATUS_FILTER, exact_rare)):
+            truth = [{ids[i] for i in row} for row in exact]
+            for ef in EF_VALUES + ["exata"]:
+                params = search_params(exact=True) if ef == "exata" else search_params(hnsw_ef=ef)
+                search = ef if ef == "exata" else f"ef={ef or 'padrão'}"
+                recall, p50, p95 = measure(client, name, query_vectors, truth, k, params, query_filter)
+                results[f"{build} | {label} | {search}"] = {"recall": recall, "p50_ms": p50, "p95_ms": p95}
+                print(f"{'':<22}{label:<10}{search:<12}{recall:>10.3f}{p50:>10.2f}{p95:>10.2f}")
+        client.delete_collection(name)
+    print("-" * len(header))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos parâmetros de construção e busca do HNSW")
+    parser.add_argument("--url", default="http://localhost:6333", help='URL do Qdrant (":memory:" para o modo local)')
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--rare-fraction", type=float, default=0.1, help="Fração de pontos com o status filtrado")
+    parser.add_argument("--full-scan-threshold", type=int, help="full_scan_threshold das coleções (KB)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DO HNSW (construção e busca)")
+    print("=" * 60)
+    run_benchmark(
+        args.url, args.points, args.dim, args.queries, args.k, args.rare_fraction, args.full_scan_threshold
+    )
+    print("=" * 60)
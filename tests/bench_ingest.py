@@ -0,0 +1,240 @@
+"""
+Benchmark offline do pipeline de ingestão (app/ingest/extract_text.py).
+
+Roda os estágios reais (conversão, extração, embeddings, upsert) trocando
+apenas os serviços externos:
+- LLM falso e determinístico, que separa as seções pelos títulos do texto
+- Embeddings falsos com vetores de dimensão fixa
+- Qdrant local em memória
+
+Reporta, por estágio: tempo de parede, tempo de CPU, pico de memória e
+documentos/segundo.
+
+Como executar:
+    uv run python tests/bench_ingest.py                      # PDFs de sumulas/
+    uv run python tests/bench_ingest.py --synthetic 10000    # corpus sintético
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.ingest.extract_text import (
+    convert_pdf,
+    embed_chunks,
+    ensure_collection,
+    extract_chunks,
+    upsert_chunks,
+)
+
+STAGES = ("converted", "extracted", "embedded", "upserted")
+
+_HEADER_PATTERN = re.compile(r"S[ÚU]MULA\s+(\d+)", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"(\d{2})/(\d{2})/(\d{2})")
+
+
+class FakeExtractorLLM:
+    """LLM falso: extrai metadados e seções por regex, no formato do prompt real."""
+
+    def invoke(self, prompt: str):
+        pdf_name = prompt.split('"pdf_name": "', 1)[1].split('"', 1)[0]
+        text = prompt.split("Texto da súmula:", 1)[1]
+
+        principal, _, rest = text.partition("REFERÊNCIAS NORMATIVAS:")
+        referencias, _, precedentes = rest.partition("PRECEDENTES:")
+
+        numero = _HEADER_PATTERN.search(text)
+        datas = _DATE_PATTERN.findall(text)
+        ultima = datas[-1] if datas else ("01", "01", "00")
+        ano = int(ultima[2])
+        data = {
+            "metadados": {
+                "num_sumula": numero.group(1) if numero else "0",
+                "data_status": "/".join(ultima),
+                "data_status_ano": str(2000 + ano if ano < 50 else 1900 + ano),
+                "status_atual": "VIGENTE",
+                "pdf_name": pdf_name,
+            },
+            "chunks": {
+                "conteudo_principal": principal.strip(),
+                "referencias_normativas": referencias.strip(),
+                "precedentes": precedentes.strip(),
+            },
+        }
+        return SimpleNamespace(content="```json\n" + json.dumps(data) + "\n```")
+
+
+class FakeEmbeddings:
+    """Embeddings falsos: vetores determinísticos (semente = hash do texto)."""
+
+    def __init__(self, dim: int = 3072):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest())
+            vectors.append(np.random.default_rng(seed).random(self.dim, dtype=np.float32).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class StageTimer:
+    """Acumula tempo de parede, CPU e pico de memória por estágio."""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.wall = {stage: 0.0 for stage in STAGES}
+        self.cpu = {stage: 0.0 for stage in STAGES}
+        self.peak = {stage: 0 for stage in STAGES}
+        self.docs = {stage: 0 for stage in STAGES}
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield
+        self.wall[name] += time.perf_counter() - wall
+        self.cpu[name] += time.process_time() - cpu
+        if self.trace_memory:
+            self.peak[name] = max(self.peak[name], tracemalloc.get_traced_memory()[1])
+        self.docs[name] += 1
+
+    def _mb(self, value: int) -> str:
+        return f"{value / 2**20:.1f}" if self.trace_memory else "n/d"
+
+    def report(self, total_docs: int, total_wall: float) -> None:
+        print(f"\n{'Estágio':<12}{'Parede (s)':>12}{'CPU (s)':>10}{'Pico (MB)':>11}{'Docs/s':>10}")
+        print("-" * 55)
+        for stage in STAGES:
+            if not self.docs[stage]:
+                continue
+            rate = self.docs[stage] / self.wall[stage] if self.wall[stage] else float("inf")
+            print(
+                f"{stage:<12}{self.wall[stage]:>12.3f}{self.cpu[stage]:>10.3f}"
+                f"{self._mb(self.peak[stage]):>11}{rate:>10.1f}"
+            )
+        print("-" * 55)
+        print(
+            f"{'total':<12}{total_wall:>12.3f}{sum(self.cpu.values()):>10.3f}"
+            f"{self._mb(max(self.peak.values())):>11}{total_docs / total_wall:>10.1f}"
+        )
+
+
+def load_corpus(pasta_pdfs: str, synthetic: int) -> Tuple[List[Tuple[str, Path]], List[Tuple[str, str]]]:
+    """
+    Retorna (pdfs, textos).
+
+    No modo sintético, converte os PDFs reais uma vez e replica os textos
+    (com número de súmula e nome de arquivo próprios) até `synthetic` documentos.
+    """
+    pdf_files = sorted(Path(pasta_pdfs).glob("*.pdf"))
+    if not synthetic:
+        return [(p.name, p) for p in pdf_files], []
+
+    base = [convert_pdf(str(p)) for p in pdf_files]
+    texts = []
+    for i in range(synthetic):
+        text = _HEADER_PATTERN.sub(f"SÚMULA {i + 1}", base[i % len(base)], count=1)
+        texts.append((f"Súmula {i + 1:05d}-sintetica.pdf", text))
+    return [], texts
+
+
+def run_benchmark(
+    pasta_pdfs: str = "sumulas",
+    synthetic: int = 0,
+    dim: int = 3072,
+    collection: str = "bench_sumulas",
+    trace_memory: bool = True,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Executa o pipeline real com serviços falsos e imprime o relatório.
+
+    O tracemalloc (pico de memória) deixa os estágios em Python puro mais
+    lentos; use `trace_memory=False` para tempos mais fiéis. A coleção é nova,
+    então o upsert não faz a limpeza de sub-chunks antigos (no Qdrant em
+    memória o delete por filtro é uma varredura linear, sem índice).
+    """
+    embedder = SimpleNamespace(
+        llm=FakeExtractorLLM(),
+        model=FakeEmbeddings(dim),
+        client=QdrantClient(":memory:"),
+        dim=dim,
+    )
+    ensure_collection(embedder, collection)
+
+    pdfs, texts = load_corpus(pasta_pdfs, synthetic)
+    timer = StageTimer(trace_memory)
+    total_chunks = 0
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+
+    documents = pdfs or texts
+    for pdf_name, source in documents:
+        if pdfs:
+            with timer.stage("converted"):
+                text_content = convert_pdf(str(source))
+        else:
+            text_content = source
+
+        with timer.stage("extracted"):
+            chunks = extract_chunks(text_content, pdf_name, embedder)
+        with timer.stage("embedded"):
+            vectors = embed_chunks(chunks, embedder)
+        with timer.stage("upserted"):
+            upsert_chunks(embedder, collection, chunks, vectors, replace_existing=False)
+        total_chunks += len(chunks)
+
+    total_wall = time.perf_counter() - start
+    if trace_memory:
+        tracemalloc.stop()
+
+    print(f"\nDocumentos: {len(documents)} | Chunks: {total_chunks} | Dimensão: {dim}")
+    timer.report(len(documents), total_wall)
+
+    return {"wall": timer.wall, "cpu": timer.cpu, "peak": timer.peak}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline da ingestão")
+    parser.add_argument("--pasta", default="sumulas")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Gera N documentos sintéticos a partir dos PDFs reais (ex.: 10000)",
+    )
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="Desliga o tracemalloc (tempos mais fiéis, sem pico de memória)",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK OFFLINE DA INGESTÃO")
+    print("=" * 60)
+    run_benchmark(args.pasta, args.synthetic, args.dim, trace_memory=args.trace_memory)
+    print("=" * 60)
@@ -0,0 +1,142 @@
+"""
+Benchmark do transporte do Qdrant: REST (JSON) vs gRPC (protobuf).
+
+Cria uma coleção temporária com vetores `text-dense` e payloads do tamanho dos
+chunks reais, e mede para cada transporte (com os parâmetros de
+`qdrant_connection_kwargs`):
+- upsert: pontos/segundo em lotes
+- busca: latência p50/p95 sem payload e com o payload completo
+
+Requer um Qdrant servidor com as portas REST (6333) e gRPC (6334) expostas;
+o modo local (":memory:") não tem transporte.
+
+Como executar:
+    docker compose up -d qdrant
+    uv run python tests/bench_qdrant_transport.py --points 2000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest.embed_qdrant import qdrant_connection_kwargs
+from app.utils.settings import settings
+
+# Texto de um chunk típico (~1.500 caracteres)
+CHUNK_TEXT = "Súmula do Tribunal de Contas do Estado de Minas Gerais. " * 27
+
+
+def make_client(host: str, port: int, prefer_grpc: bool) -> QdrantClient:
+    return QdrantClient(
+        host=host,
+        port=port,
+        **qdrant_connection_kwargs(settings.QDRANT_INGEST_TIMEOUT, prefer_grpc=prefer_grpc),
+    )
+
+
+def make_points(vectors: np.ndarray, start: int, end: int):
+    return [
+        models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector={"text-dense": vectors[i].tolist()},
+            payload={
+                "page_content": CHUNK_TEXT,
+                "metadata": {
+                    "num_sumula": str(i % 130 + 1),
+                    "status_atual": "VIGENTE",
+                    "data_status_ano": 1990 + i % 35,
+                    "pdf_name": f"Súmula {i % 130 + 1:03d}.pdf",
+                    "chunk_index": i % 5,
+                },
+            },
+        )
+        for i in range(start, end)
+    ]
+
+
+def run_benchmark(
+    host: str = "localhost",
+    port: int = 6333,
+    points: int = 2000,
+    dim: int = 3072,
+    queries: int = 200,
+    batch_size: int = 64,
+    k: int = 10,
+) -> Dict[str, Dict[str, float]]:
+    rng = np.random.default_rng(42)
+    vectors = rng.normal(size=(points + queries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    base, query_vectors = vectors[:points], vectors[points:]
+    print(f"\nPontos: {points} | Consultas: {queries} | Dimensão: {dim} | Lote: {batch_size} | k={k}")
+
+    print(f"\n{'Transporte':<12}{'Upsert (pts/s)':>16}{'Busca p50':>12}{'p95':>9}{'+payload p50':>15}{'p95':>9}")
+    print("-" * 73)
+    results = {}
+    for label, prefer_grpc in (("REST", False), ("gRPC", True)):
+        client = make_client(host, port, prefer_grpc)
+        name = f"bench_transport_{label.lower()}"
+        if client.collection_exists(name):
+            client.delete_collection(name)
+        client.create_collection(
+            name, vectors_config={"text-dense": models.VectorParams(size=dim, distance=models.Distance.COSINE)}
+        )
+
+        start = time.perf_counter()
+        for offset in range(0, points, batch_size):
+            client.upsert(name, points=make_points(base, offset, min(offset + batch_size, points)), wait=True)
+        upsert_rate = points / (time.perf_counter() - start)
+
+        row = {"upsert_pts_s": upsert_rate}
+        for with_payload in (False, True):
+            latencies = []
+            for query in query_vectors:
+                t0 = time.perf_counter()
+                client.query_points(
+                    name, query=query.tolist(), using="text-dense", limit=k, with_payload=with_payload
+                )
+                latencies.append((time.perf_counter() - t0) * 1000)
+            key = "payload" if with_payload else "ids"
+            row[f"{key}_p50_ms"] = float(np.percentile(latencies, 50))
+            row[f"{key}_p95_ms"] = float(np.percentile(latencies, 95))
+
+        client.delete_collection(name)
+        client.close()
+        results[label] = row
+        print(
+            f"{label:<12}{row['upsert_pts_s']:>16.0f}{row['ids_p50_ms']:>10.2f}ms{row['ids_p95_ms']:>7.2f}ms"
+            f"{row['payload_p50_ms']:>13.2f}ms{row['payload_p95_ms']:>7.2f}ms"
+        )
+    print("-" * 73)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark REST vs gRPC do Qdrant")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333, help="Porta REST (gRPC: QDRANT_GRPC_PORT)")
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DO TRANSPORTE DO QDRANT (REST vs gRPC)")
+    print("=" * 60)
+    try:
+        run_benchmark(args.host, args.port, args.points, args.dim, args.queries, args.batch_size, args.k)
+    except Exception as e:
+        print(f"\n❌ Qdrant indisponível em {args.host}:{args.port} ({e})")
+        sys.exit(1)
+    print("=" * 60)
@@ -0,0 +1,176 @@
+"""
+Benchmark dos layouts de armazenamento dos vetores densos (app/ingest/storage.py).
+
+Compara o layout atual (float32 em RAM) com quantização escalar/binária,
+vetores originais e HNSW em disco, e os parâmetros de busca `rescore` e
+`oversampling` (SelfQueryConfig). Para cada combinação reporta recall@k contra
+a busca exata (numpy), latência p50/p95 e RAM estimada por vetor.
+
+Os vetores são sintéticos (agrupados, como embeddings reais) ou copiados de
+uma coleção existente (`--source-collection`).
+
+Requer um Qdrant servidor: o modo local (":memory:") ignora quantização e HNSW
+e faz busca exata, então serve apenas para conferir o script.
+
+Como executar:
+    docker compose up -d qdrant
+    uv run python tests/bench_vector_storage.py --points 5000
+    uv run python tests/bench_vector_storage.py --source-collection sumulas_tcemg
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest.storage import VectorStorageConfig, search_params
+
+LAYOUTS = {
+    "float32 (atual)": VectorStorageConfig(),
+    "scalar int8": VectorStorageConfig(quantization="scalar"),
+    "scalar + disco": VectorStorageConfig(quantization="scalar", on_disk=True),
+    "binary": VectorStorageConfig(quantization="binary"),
+    "binary + disco + hnsw": VectorStorageConfig(quantization="binary", on_disk=True, hnsw_on_disk=True),
+}
+
+# (rescore, oversampling) avaliados nos layouts quantizados
+SEARCH_VARIANTS = [(False, None), (True, None), (True, 2.0), (True, 4.0)]
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 50, seed: int = 42) -> np.ndarray:
+    """Vetores agrupados em torno de centróides (mais próximos de embeddings reais)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def source_vectors(client: QdrantClient, collection: str, limit: int) -> np.ndarray:
+    """Copia até `limit` vetores `text-dense` de uma coleção existente."""
+    rows, offset = [], None
+    while len(rows) < limit:
+        points, offset = client.scroll(
+            collection, limit=min(256, limit - len(rows)), offset=offset,
+            with_payload=False, with_vectors=["text-dense"],
+        )
+        rows.extend(p.vector["text-dense"] for p in points if p.vector)
+        if offset is None:
+            break
+    vectors = np.asarray(rows, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_collection(client: QdrantClient, name: str, storage: VectorStorageConfig, vectors: np.ndarray) -> List[str]:
+    """Cria a coleção com o layout, insere os vetores e espera a indexação."""
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(name, vectors_config={"text-dense": storage.vector_params(vectors.shape[1])})
+
+    ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+    for start in range(0, len(vectors), 256):
+        client.upsert(
+            name,
+            points=[
+                models.PointStruct(id=ids[i], vector={"text-dense": vectors[i].tolist()})
+                for i in range(start, min(start + 256, len(vectors)))
+            ],
+            wait=True,
+        )
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(0.5)
+    return ids
+
+
+def measure(
+    client: QdrantClient,
+    name: str,
+    queries: np.ndarray,
+    truth: List[set],
+    ids: List[str],
+    k: int,
+    params: Optional[models.SearchParams],
+) -> Tuple[float, float, float]:
+    """Retorna (recall@k, p50 ms, p95 ms)."""
+    hits, latencies = 0, []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = client.query_points(
+            name, query=query.tolist(), using="text-dense", limit=k, search_params=params
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {str(p.id) for p in result.points})
+    recall = hits / (len(truth) * k)
+    return recall, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+
+def run_benchmark(
+    url: str = "http://localhost:6333",
+    points: int = 5000,
+    dim: int = 3072,
+    queries: int = 100,
+    k: int = 10,
+    source_collection: Optional[str] = None,
+) -> Dict[str, Dict[str, float]]:
+    client = QdrantClient(":memory:") if url == ":memory:" else QdrantClient(url=url, timeout=120)
+    if url == ":memory:":
+        print("⚠️  Qdrant local: quantização e HNSW são ignorados (busca exata)")
+
+    if source_collection:
+        vectors = source_vectors(client, source_collection, points + queries)
+    else:
+        vectors = synthetic_vectors(points + queries, dim)
+    base, query_vectors = vectors[:-queries], vectors[-queries:]
+    print(f"\nPontos: {len(base)} | Consultas: {len(query_vectors)} | Dimensão: {base.shape[1]} | k={k}")
+
+    # Busca exata (cosseno) como referência
+    scores = query_vectors @ base.T
+    exact = np.argsort(-scores, axis=1)[:, :k]
+
+    print(f"\n{'Layout':<24}{'Busca':<22}{'Recall@k':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'RAM/vetor':>11}")
+    print("-" * 87)
+    results = {}
+    for label, storage in LAYOUTS.items():
+        name = f"bench_storage_{storage.quantization}_{int(storage.on_disk)}{int(storage.hnsw_on_disk)}"
+        ids = build_collection(client, name, storage, base)
+        truth = [{ids[i] for i in row} for row in exact]
+        ram = storage.ram_bytes_per_vector(base.shape[1])
+
+        variants = SEARCH_VARIANTS if storage.quantization != "none" else [(True, None)]
+        for rescore, oversampling in variants:
+            search = "padrão" if storage.quantization == "none" else f"rescore={rescore} over={oversampling or 1.0}"
+            recall, p50, p95 = measure(
+                client, name, query_vectors, truth, ids, k,
+                search_params(rescore=rescore, oversampling=oversampling),
+            )
+            results[f"{label} | {search}"] = {"recall": recall, "p50_ms": p50, "p95_ms": p95, "ram_bytes": ram}
+            print(f"{label:<24}{search:<22}{recall:>10.3f}{p50:>10.2f}{p95:>10.2f}{ram / 1024:>9.2f}KB")
+        client.delete_collection(name)
+    print("-" * 87)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de quantização e armazenamento em disco")
+    parser.add_argument("--url", default="http://localhost:6333", help='URL do Qdrant (":memory:" para o modo local)')
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--source-collection", help="Usa os vetores de uma coleção existente")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DE ARMAZENAMENTO DOS VETORES")
+    print("=" * 60)
+    run_benchmark(args.url, args.points, args.dim, args.queries, args.k, args.source_collection)
+    print("=" * 60)
@@ -1,6 +1,10 @@
 """
 Script para adicionar índices de payload à coleção existente do Qdrant.
 Resolve o erro: "Index required but not found for metadata.num_sumula"
+
+Os índices são os do esquema declarativo (app/ingest/payload_schema.py), sob
+`metadata.*`; só os que faltam são criados, então o script pode ser rodado
+várias vezes.
 """
 
 import sys
@@ -10,13 +14,16 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from app.ingest.aliases import resolve_alias
 from app.ingest.embed_qdrant import EmbeddingSelfQuery
+from app.ingest.payload_schema import migrate
+from app.utils.settings import settings
 
 def add_indexes_to_existing_collection():
     """Adiciona índices necessários para self-query filtering na coleção existente."""
 
     embedder = EmbeddingSelfQuery()
-    collection_name = "sumulas_tcemg"
+    collection_name = resolve_alias(embedder.client, settings.QDRANT_COLLECTION) or settings.QDRANT_COLLECTION
 
     print(f"Verificando coleção '{collection_name}'...")
 
@@ -28,39 +35,20 @@ def add_indexes_to_existing_collection():
     print("\nCriando índices de payload para filtros...")
 
     try:
-        # Índice para num_sumula (keyword)
-        print("  → Criando índice para 'num_sumula' (keyword)...")
-        embedder.client.create_payload_index(
-            collection_name=collection_name,
-            field_name="num_sumula",
-            field_schema="keyword"
-        )
-        print("    ✅ Índice 'num_sumula' criado")
-
-        # Índice para status_atual (keyword)
-        print("  → Criando índice para 'status_atual' (keyword)...")
-        embedder.client.create_payload_index(
-            collection_name=collection_name,
-            field_name="status_atual",
-            field_schema="keyword"
-        )
-        print("    ✅ Índice 'status_atual' criado")
-
-        # Índice para data_status_ano (integer)
-        print("  → Criando índice para 'data_status_ano' (integer)...")
-        embedder.client.create_payload_index(
-            collection_name=collection_name,
-            field_name="data_status_ano",
-            field_schema="integer"
-        )
-        print("    ✅ Índice 'data_status_ano' criado")
+        result = migrate(embedder.client, collection_name)
+        for key in result["created"]:
+            print(f"    ✅ Índice '{key}' criado")
+        if not result["created"]:
+            print("    ✅ Nenhum índice faltando")
+        if result["mismatched"]:
+            print(f"    ⚠️ Índices diferentes do esquema: {result['mismatched']}")
+            print("       Use: uv run python -m app.ingest.payload_schema --recreate-mismatched")
 
         print("\n✅ Todos os índices foram criados com sucesso!")
         print("🎯 Self-query filtering agora funcionará corretamente.")
 
     except Exception as e:
         print(f"\n⚠️ Erro ao criar índices: {e}")
-        print("Nota: Se o índice já existir, esse erro pode ser ignorado.")
 
 
 if __name__ == "__main__":
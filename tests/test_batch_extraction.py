@@ -0,0 +1,146 @@
+"""
+Testes para a extração em lote (várias súmulas por chamada ao LLM).
+
+Usa um LLM falso: nenhuma chamada à OpenAI é feita.
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.ingest.extract_text import extract_chunks_batch, pack_documents
+
+
+def fake_extraction(pdf_name: str) -> dict:
+    numero = pdf_name.split()[1].split("-")[0]
+    return {
+        "metadados": {
+            "num_sumula": numero,
+            "data_status": "07/04/14",
+            "data_status_ano": "2014",
+            "status_atual": "VIGENTE",
+            "pdf_name": pdf_name,
+        },
+        "chunks": {
+            "conteudo_principal": f"Texto da súmula {numero}.",
+            "referencias_normativas": "",
+            "precedentes": f"Precedentes da súmula {numero}.",
+        },
+    }
+
+
+class FakeStructuredLLM:
+    """Responde o lote omitindo os documentos em `drop`."""
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def invoke(self, prompt):
+        self.parent.batch_calls += 1
+        names = [
+            line.split("### DOCUMENTO: ", 1)[1].strip()
+            for line in prompt.splitlines()
+            if line.startswith("### DOCUMENTO: ")
+        ]
+        return {
+            "documentos": [
+                fake_extraction(name) for name in names if name not in self.parent.drop
+            ]
+        }
+
+
+class FakeLLM:
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    def with_structured_output(self, schema, **kwargs):
+        assert schema["properties"]["documentos"]["type"] == "array"
+        return FakeStructuredLLM(self)
+
+    def invoke(self, prompt):
+        self.single_calls += 1
+        pdf_name = prompt.split('"pdf_name": "', 1)[1].split('"', 1)[0]
+        return SimpleNamespace(content=json.dumps(fake_extraction(pdf_name)))
+
+
+DOCUMENTS = [(f"Súmula {i:03d}-89.pdf", "Texto curto da súmula. " * 30) for i in range(1, 11)]
+
+
+def test_pack_documents_respects_budget():
+    """Testa o agrupamento por orçamento de tokens e número máximo de documentos."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Agrupamento por orçamento de tokens")
+    print("=" * 60)
+
+    batches = pack_documents(DOCUMENTS, token_budget=1200, max_docs=4)
+    sizes = [len(b) for b in batches]
+    print(f"Tamanho dos lotes: {sizes}")
+
+    assert sum(sizes) == len(DOCUMENTS)
+    assert max(sizes) <= 4
+    assert len(batches) > 1
+
+    long_doc = [("Súmula 124-19.pdf", "texto longo " * 5000)]
+    assert pack_documents(long_doc + DOCUMENTS[:2], token_budget=1200)[0] == long_doc
+    print("\n✅ TESTE PASSOU")
+
+
+def test_batch_maps_results_by_pdf_name():
+    """Testa que os resultados do lote são mapeados de volta por pdf_name."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Mapeamento por pdf_name")
+    print("=" * 60)
+
+    embedder = SimpleNamespace(llm=FakeLLM())
+    results = extract_chunks_batch(DOCUMENTS, embedder, token_budget=6000, max_docs=5)
+
+    print(f"Chamadas em lote: {embedder.llm.batch_calls}")
+    print(f"Chamadas individuais: {embedder.llm.single_calls}")
+
+    assert embedder.llm.batch_calls == 2 and embedder.llm.single_calls == 0
+    assert set(results) == {name for name, _ in DOCUMENTS}
+    chunk = results["Súmula 007-89.pdf"][0]
+    assert chunk["metadata"]["num_sumula"] == "7"  # número canônico
+    assert chunk["metadata"]["pdf_name"] == "Súmula 007-89.pdf"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_partial_failure_falls_back_to_single_calls():
+    """Testa o fallback para chamadas individuais em falha parcial do lote."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Fallback para chamadas individuais")
+    print("=" * 60)
+
+    dropped = {"Súmula 002-89.pdf", "Súmula 009-89.pdf"}
+    embedder = SimpleNamespace(llm=FakeLLM(drop=dropped))
+
+    results = extract_chunks_batch(DOCUMENTS, embedder, token_budget=6000, max_docs=5)
+    print(f"Chamadas individuais: {embedder.llm.single_calls}")
+    assert embedder.llm.single_calls == len(dropped)
+    assert set(results) == {name for name, _ in DOCUMENTS}
+
+    without_fallback = extract_chunks_batch(
+        DOCUMENTS, SimpleNamespace(llm=FakeLLM(drop=dropped)), fallback=False
+    )
+    assert not dropped & set(without_fallback), "Sem fallback, faltantes ficam de fora"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DE EXTRAÇÃO EM LOTE")
+    print("=" * 60)
+
+    test_pack_documents_respects_budget()
+    test_batch_maps_results_by_pdf_name()
+    test_partial_failure_falls_back_to_single_calls()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
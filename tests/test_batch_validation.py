@@ -0,0 +1,144 @@
+"""
+Testes para a validação em lote (avaliação offline dos Guardrails).
+"""
+
+import csv
+import sys
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.guardrails import batch
+from app.guardrails.batch import validate_output_batch
+from app.guardrails.guards import validate_output
+
+CONTEXT_70 = [
+    {
+        "page_content": "A Súmula 70 trata da aplicação mínima de recursos em educação pelo Município.",
+        "metadata": {"num_sumula": "70", "_id": "p70", "_collection_name": "sumulas"},
+    }
+]
+CONTEXT_85 = [
+    {
+        "page_content": "A Súmula 85 trata da contratação temporária de servidores.",
+        "metadata": {"num_sumula": "85", "_id": "p85", "_collection_name": "sumulas"},
+    }
+]
+
+GROUNDED = "Conforme a Súmula 70, a aplicação mínima de recursos em educação pelo Município é obrigatória. " * 2
+INVENTED = "Conforme a Súmula 150, os tribunais superiores decidiram pela inconstitucionalidade completa da cobrança. " * 2
+
+
+def build_items():
+    return [
+        {"id": "a", "answer": GROUNDED, "context": CONTEXT_70},
+        {"id": "b", "answer": INVENTED, "context": CONTEXT_85},
+        {"id": "c", "answer": INVENTED, "context": CONTEXT_70},
+        {"id": "d", "answer": "Resposta curta.", "context": []},
+    ]
+
+
+def test_batch_columns():
+    """Testa as colunas, a ordem e o pré-processamento compartilhado por contexto."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Validação em lote")
+    print("=" * 60)
+
+    calls = []
+    original = batch.build_context_metadata
+    batch.build_context_metadata = lambda docs: calls.append(docs) or original(docs)
+    try:
+        columns = validate_output_batch(build_items())
+    finally:
+        batch.build_context_metadata = original
+
+    print(f"\nColunas: {list(columns)}")
+    print(f"Scores: {columns['hallucination_score']}")
+
+    assert columns["item_id"] == ["a", "b", "c", "d"]
+    assert len(calls) == 2, "Um pré-processamento por contexto distinto"
+    assert columns["context_id"][0] == columns["context_id"][2]
+
+    expected = [
+        validate_output(item["answer"], context_docs=batch._group_by_context([item])[0][0])["is_valid"]
+        for item in build_items()
+    ]
+    assert columns["is_valid"] == expected
+    assert columns["HallucinationDetection_passed"] == [True, False, False, None]
+    assert columns["cited_sumulas"][1] == "150"
+    assert columns["ResponseLength_issues"][3].startswith("Resposta muito curta")
+    print("\n✅ TESTE PASSOU")
+
+
+def test_batch_output_and_processes():
+    """Testa a gravação em CSV e a execução com vários processos."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Saída CSV e multiprocessamento")
+    print("=" * 60)
+
+    items = build_items() * 5
+    single = validate_output_batch(items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "resultados.csv"
+        parallel = validate_output_batch(items, processes=2, output_path=str(output))
+        with open(output, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    print(f"\nLinhas gravadas: {len(rows)}")
+    assert parallel["is_valid"] == single["is_valid"]
+    assert parallel["hallucination_score"] == single["hallucination_score"]
+    assert len(rows) == len(items)
+    assert rows[1]["item_id"] == "b" and rows[1]["is_valid"] == "False"
+
+    try:
+        validate_output_batch(items, output_path="resultados.xlsx")
+        assert False, "Formato não suportado deveria falhar"
+    except ValueError:
+        pass
+
+    # Parquet sem o pyarrow: CSV com o mesmo nome
+    with tempfile.TemporaryDirectory() as tmp:
+        written = batch.write_columns(single, str(Path(tmp) / "resultados.parquet"))
+        print(f"Parquet: gravado em {Path(written).name}")
+        assert Path(written).exists()
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            assert written.endswith("resultados.csv")
+    print("\n✅ TESTE PASSOU")
+
+
+def test_same_ids_different_context():
+    """Testa que itens com os mesmos ids e textos diferentes não compartilham o contexto."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Mesmos ids, outro texto")
+    print("=" * 60)
+
+    # Mesmo ponto re-ingerido com outro texto entre os dois registros
+    reingested = [dict(CONTEXT_85[0], metadata=dict(CONTEXT_70[0]["metadata"], num_sumula="85"))]
+    items = [
+        {"id": "antes", "answer": GROUNDED, "context": CONTEXT_70},
+        {"id": "depois", "answer": GROUNDED, "context": reingested},
+    ]
+    columns = validate_output_batch(items)
+    print(f"\nVálidas: {columns['is_valid']} | Contextos: {columns['context_id']}")
+    assert columns["context_id"][0] != columns["context_id"][1]
+    assert columns["is_valid"] == [True, False], "Cada item contra o próprio contexto"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA VALIDAÇÃO EM LOTE")
+    print("=" * 60)
+
+    test_batch_columns()
+    test_batch_output_and_processes()
+    test_same_ids_different_context()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,158 @@
+"""
+Testes para a divisão de seções em sub-chunks limitados por tokens.
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.ingest.chunking import count_tokens, split_text
+from app.ingest.extract_text import extract_chunks, split_sections
+
+
+PRECEDENTES = "\n\n".join(
+    f"- Parecer Prévio sobre Prestação de Contas nº {i}/88, sessão de 04/07/89;"
+    for i in range(1, 80)
+)
+
+
+def test_short_text_single_chunk():
+    """Testa que textos curtos geram um único chunk sem alteração."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Texto curto gera um único chunk")
+    print("=" * 60)
+
+    text = "A falta de aplicação anual pelo Município de 25% da receita."
+    chunks = split_text(text, max_tokens=100, overlap_tokens=10)
+
+    print(f"Chunks: {chunks}")
+
+    assert chunks == [text], "Texto curto não deveria ser dividido"
+    assert split_text("   ") == [], "Texto vazio não deveria gerar chunks"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_long_text_bounded_chunks():
+    """Testa que todos os sub-chunks respeitam o limite de tokens."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Sub-chunks limitados por tokens")
+    print("=" * 60)
+
+    max_tokens = 120
+    chunks = split_text(PRECEDENTES, max_tokens=max_tokens, overlap_tokens=20)
+    sizes = [count_tokens(c) for c in chunks]
+
+    print(f"Tokens no texto: {count_tokens(PRECEDENTES)}")
+    print(f"Sub-chunks: {len(chunks)}")
+    print(f"Tokens por sub-chunk: {sizes}")
+
+    assert len(chunks) > 1, "Texto longo deveria ser dividido"
+    assert max(sizes) <= max_tokens + 5, "Sub-chunk excedeu o limite de tokens"
+    assert "nº 1/88" in chunks[0] and "nº 79/88" in chunks[-1], "Conteúdo perdido"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_overlap_between_chunks():
+    """Testa que sub-chunks consecutivos compartilham texto."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Sobreposição entre sub-chunks")
+    print("=" * 60)
+
+    text = " ".join(f"palavra{i}" for i in range(400))
+    chunks = split_text(text, max_tokens=60, overlap_tokens=15)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        last_word = previous.split()[-1]
+        assert last_word in current.split(), "Sub-chunks consecutivos sem sobreposição"
+
+    no_overlap = split_text(text, max_tokens=60, overlap_tokens=0)
+    joined = " ".join(no_overlap).split()
+
+    print(f"Sub-chunks com sobreposição: {len(chunks)}")
+    print(f"Sub-chunks sem sobreposição: {len(no_overlap)}")
+
+    assert joined == text.split(), "Sem sobreposição, o texto deveria ser reconstruído"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_invalid_parameters():
+    """Testa validação dos parâmetros."""
+    print("\n" + "=" * 60)
+    print("TESTE 4: Parâmetros inválidos")
+    print("=" * 60)
+
+    for max_tokens, overlap in [(0, 0), (50, 50), (50, -1)]:
+        try:
+            split_text("texto", max_tokens=max_tokens, overlap_tokens=overlap)
+        except ValueError as e:
+            print(f"  ({max_tokens}, {overlap}) → {e}")
+        else:
+            raise AssertionError("Parâmetros inválidos deveriam gerar ValueError")
+
+    print("\n✅ TESTE PASSOU")
+
+
+class TruncatingLLM:
+    """Resposta completa cortada pelo max_tokens; a de metadados cabe."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        if len(self.prompts) == 1:
+            return SimpleNamespace(
+                content='{"metadados": {"num_sumula": "70"}, "chunks": {"conteudo_principal": "A falta de',
+                response_metadata={"finish_reason": "length"},
+            )
+        data = {"metadados": {"num_sumula": "70", "status_atual": "VIGENTE", "pdf_name": "Súmula 070-89.pdf"}}
+        return SimpleNamespace(content=json.dumps(data), response_metadata={"finish_reason": "stop"})
+
+
+def test_truncated_extraction():
+    """Testa a extração cortada pelo limite de tokens de saída (seções divididas localmente)."""
+    print("\n" + "=" * 60)
+    print("TESTE 5: Extração cortada pelo max_tokens")
+    print("=" * 60)
+
+    text = (
+        "SÚMULA 70\n\nA falta de aplicação anual pelo Município...\n\n"
+        "REFERÊNCIAS NORMATIVAS:\n\n- Art. 212, caput da Constituição da República de 1988;\n\n"
+        "PRECEDENTES:\n\n" + PRECEDENTES
+    )
+    sections = split_sections(text)
+    assert sections["conteudo_principal"].endswith("Município...")
+    assert sections["referencias_normativas"].startswith("- Art. 212")
+    assert sections["precedentes"] == PRECEDENTES
+    assert split_sections("Sem títulos")["conteudo_principal"] == "Sem títulos"
+
+    llm = TruncatingLLM()
+    chunks = extract_chunks(text, "Súmula 070-89.pdf", SimpleNamespace(llm=llm), max_chunk_tokens=200)
+    types = [c["metadata"]["chunk_type"] for c in chunks]
+    print(f"\nChamadas ao LLM: {len(llm.prompts)} | Sub-chunks por seção: {dict((t, types.count(t)) for t in types)}")
+
+    assert len(llm.prompts) == 2 and '"chunks"' not in llm.prompts[1], "Segunda chamada só pede metadados"
+    assert all(c["metadata"]["num_sumula"] == "70" for c in chunks)
+    assert types.count("precedentes") > 1, "Texto inteiro preservado, em sub-chunks"
+    assert "nº 79/88" in chunks[-1]["text"]
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DE SUB-CHUNKING")
+    print("=" * 60)
+
+    test_short_text_single_chunk()
+    test_long_text_bounded_chunks()
+    test_overlap_between_chunks()
+    test_invalid_parameters()
+    test_truncated_extraction()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,296 @@
+"""
+Testes para a reindexação blue/green (coleções versionadas atrás de um alias).
+
+Usa LLM/embeddings falsos e o Qdrant em memória, sem chamadas à OpenAI.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest import aliases
+from app.ingest.extract_text import ensure_collection, rebuild_collection
+from app.ingest.storage import DEFAULT_INDEXING_THRESHOLD
+from app.ingest.journal import IngestJournal
+from app.ingest.versioning import get_collection_version, rebuild_in_progress
+from app.ingest.watch import SumulasWatcher
+
+PDFS = ["Súmula 070-89.pdf", "Súmula 071-89.pdf", "Súmula 072-89.pdf"]
+
+
+class FakeLLM:
+    def invoke(self, prompt):
+        pdf_name = prompt.split('"pdf_name": "', 1)[1].split('"', 1)[0]
+        data = {
+            "metadados": {"num_sumula": pdf_name[7:10], "pdf_name": pdf_name},
+            "chunks": {"conteudo_principal": f"Conteúdo de {pdf_name}"},
+        }
+        return SimpleNamespace(content=json.dumps(data))
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0] * 3072 for _ in texts]
+
+
+class CrashingEmbeddings(FakeEmbeddings):
+    """Interrompe a ingestão (Ctrl+C) no segundo PDF."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls == 2:
+            raise KeyboardInterrupt
+        return super().embed_documents(texts)
+
+
+def track_indexing(client):
+    """
+    Guarda o `indexing_threshold` gravado por `update_collection` e o devolve
+    em `get_collection` (o Qdrant local ignora a configuração dos otimizadores).
+    """
+    state = {"indexing_threshold": DEFAULT_INDEXING_THRESHOLD}
+    update_collection = client.update_collection
+    get_collection = client.get_collection
+
+    def recording_update_collection(collection_name, optimizers_config=None, **kwargs):
+        if optimizers_config is not None and optimizers_config.indexing_threshold is not None:
+            state["indexing_threshold"] = optimizers_config.indexing_threshold
+        return update_collection(collection_name, optimizers_config=optimizers_config, **kwargs)
+
+    def recording_get_collection(collection_name):
+        info = get_collection(collection_name)
+        info.config.optimizer_config.indexing_threshold = state["indexing_threshold"]
+        return info
+
+    client.update_collection = recording_update_collection
+    client.get_collection = recording_get_collection
+    return state
+
+
+def make_embedder():
+    return SimpleNamespace(llm=FakeLLM(), model=FakeEmbeddings(), client=QdrantClient(":memory:"))
+
+
+def copy_pdfs(pasta, names):
+    pasta.mkdir(exist_ok=True)
+    for path in pasta.glob("*.pdf"):
+        path.unlink()
+    for name in names:
+        shutil.copy(project_root / "sumulas" / name, pasta / name)
+
+
+def test_blue_green_rebuild():
+    """Testa a reconstrução em nova versão, a troca do alias e a coleta das antigas."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Reconstrução blue/green")
+    print("=" * 60)
+
+    embedder = make_embedder()
+    client = embedder.client
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        journal = str(Path(tmp) / "journal.jsonl")
+
+        copy_pdfs(pasta, PDFS)
+        summary = rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+        print(f"\nPrimeira versão: {summary['promoted']}")
+        assert aliases.resolve_alias(client, "teste") == "teste_v1"
+        assert summary["promoted"]["count"] == 3
+        assert client.count("teste", exact=True).count == 4, "3 chunks + manifesto, lidos pelo alias"
+
+        # Leitores continuam na v1 enquanto a v2 é construída; a troca é atômica
+        summary = rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+        assert aliases.resolve_alias(client, "teste") == "teste_v2"
+        assert summary["promoted"]["previous"] == "teste_v1"
+        assert get_collection_version(client, "teste") > get_collection_version(client, "teste_v1")
+
+        summary = rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+        names = [name for _, name in aliases.list_versions(client, "teste")]
+        print(f"Versões após a terceira troca: {names}")
+        assert names == ["teste_v2", "teste_v3"], "Mantém só a anterior para rollback"
+
+        # Reconstrução muito menor que a ativa: o alias não é trocado
+        copy_pdfs(pasta, PDFS[:1])
+        try:
+            rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+            assert False, "Redução acima do limite deveria falhar"
+        except RuntimeError as e:
+            print(f"Bloqueada: {e}")
+        assert aliases.resolve_alias(client, "teste") == "teste_v3"
+        assert aliases.pending_version(client, "teste") == "teste_v4"
+
+        # Ingestão incremental grava pelo alias, na versão ativa
+        ensure_collection(embedder, "teste")
+        assert client.collection_exists("teste") and not client.collection_exists("teste_v5")
+
+        # Reconstruções abandonadas não se acumulam: só a pendente mais nova fica para o --resume
+        ensure_collection(embedder, "teste_v5")
+        assert aliases.garbage_collect(client, "teste") == ["teste_v4"]
+        assert aliases.pending_version(client, "teste") == "teste_v5"
+
+        # Nova reconstrução sem --resume descarta a pendente
+        copy_pdfs(pasta, PDFS)
+        rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+        names = [name for _, name in aliases.list_versions(client, "teste")]
+        print(f"Versões após descartar a pendente: {names}")
+        assert names == ["teste_v3", "teste_v4"] and aliases.resolve_alias(client, "teste") == "teste_v4"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_promote_validation():
+    """Testa a validação de contagem e a substituição de uma coleção antiga sem alias."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Validação da troca")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    embedder = SimpleNamespace(client=client)
+    ensure_collection(embedder, "teste")  # layout antigo: coleção comum com o nome do alias
+    ensure_collection(embedder, "teste_v1")
+    client.upsert(
+        "teste_v1",
+        points=[models.PointStruct(id=i, vector={"text-dense": [1.0] * 3072}) for i in range(1, 4)],
+    )
+
+    try:
+        aliases.promote(client, "teste", "teste_v1", expected_count=5)
+        assert False, "Contagem divergente deveria falhar"
+    except RuntimeError:
+        pass
+    try:
+        aliases.promote(client, "teste", "teste_v1", expected_count=3)
+        assert False, "Coleção antiga com o nome do alias exige drop_legacy"
+    except RuntimeError:
+        pass
+
+    result = aliases.promote(client, "teste", "teste_v1", expected_count=3, drop_legacy=True)
+    print(f"\nTroca: {result}")
+    assert aliases.resolve_alias(client, "teste") == "teste_v1"
+    assert result["previous"] is None and result["version"] == 1
+    print("\n✅ TESTE PASSOU")
+
+
+def test_resume_after_crash():
+    """Testa a indexação religada após uma reconstrução interrompida e retomada."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Retomada após interrupção")
+    print("=" * 60)
+
+    embedder = make_embedder()
+    embedder.model = CrashingEmbeddings()
+    client = embedder.client
+    indexing = track_indexing(client)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        journal = str(Path(tmp) / "journal.jsonl")
+        copy_pdfs(pasta, PDFS)
+
+        try:
+            rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+            assert False, "A interrupção deveria propagar"
+        except KeyboardInterrupt:
+            pass
+        print(f"\nApós Ctrl+C: {indexing}")
+        assert indexing["indexing_threshold"] == DEFAULT_INDEXING_THRESHOLD, "Indexação religada no finally"
+        assert aliases.pending_version(client, "teste") == "teste_v1"
+
+        # Processo morto sem chegar ao finally (kill -9): a versão fica com a indexação desligada
+        indexing["indexing_threshold"] = 0
+        try:
+            aliases.wait_until_indexed(client, "teste_v1")
+            assert False, "Coleção sem indexação não pode ir para o alias"
+        except RuntimeError as e:
+            print(f"Bloqueada: {e}")
+
+        summary = rebuild_collection(embedder, "teste", str(pasta), resume=True, journal_path=journal)
+        print(f"Retomada: {summary['promoted']}")
+        assert indexing["indexing_threshold"] == DEFAULT_INDEXING_THRESHOLD, "Não restaura o 0 lido da coleção"
+        assert summary["promoted"]["active"] == "teste_v1" and summary["promoted"]["count"] == 3
+    print("\n✅ TESTE PASSOU")
+
+
+class HookEmbeddings(FakeEmbeddings):
+    """Chama `hook` uma vez, no primeiro embedding (no meio da reconstrução)."""
+
+    def __init__(self, hook):
+        self.hook = hook
+
+    def embed_documents(self, texts):
+        hook, self.hook = self.hook, None
+        if hook:
+            hook()
+        return super().embed_documents(texts)
+
+
+def test_watch_paused_during_rebuild():
+    """Testa que o watch não grava na versão que vai sair durante uma reconstrução."""
+    print("\n" + "=" * 60)
+    print("TESTE 4: Watch durante a reconstrução")
+    print("=" * 60)
+
+    embedder = make_embedder()
+    client = embedder.client
+    new_pdf = "Súmula 073-89.pdf"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        journal = str(Path(tmp) / "journal.jsonl")
+        copy_pdfs(pasta, PDFS)
+        rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+
+        watcher = SumulasWatcher(str(pasta), embedder, "teste", IngestJournal(str(Path(tmp) / "watch.jsonl")), debounce=0)
+        watcher.sync()
+        paused = []
+
+        def during_rebuild():
+            # PDF novo depois que a reconstrução listou a pasta
+            shutil.copy(project_root / "sumulas" / new_pdf, pasta / new_pdf)
+            paused.append(rebuild_in_progress(client, "teste"))
+            paused.append(watcher.sync())
+
+        embedder.model = HookEmbeddings(during_rebuild)
+        summary = rebuild_collection(embedder, "teste", str(pasta), journal_path=journal)
+        print(f"\nDurante a reconstrução: marca={paused[0]}, sync={paused[1]}")
+        assert paused == [True, None], "Watch pausado enquanto a v1 está marcada"
+        assert summary["promoted"]["active"] == "teste_v2"
+        assert not rebuild_in_progress(client, "teste"), "Marca removida ao final"
+
+        # Depois da troca, o watch aplica o PDF novo na versão ativa (v2)
+        assert watcher.sync() is not None
+        count = client.count(
+            "teste",
+            count_filter=models.Filter(
+                must=[models.FieldCondition(key="metadata.pdf_name", match=models.MatchValue(value=new_pdf))]
+            ),
+        ).count
+        print(f"Pontos de '{new_pdf}' na v2: {count}")
+        assert count == 1
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA REINDEXAÇÃO BLUE/GREEN")
+    print("=" * 60)
+
+    test_blue_green_rebuild()
+    test_promote_validation()
+    test_resume_after_crash()
+    test_watch_paused_during_rebuild()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,126 @@
+"""
+Testes para os embeddings de dimensão reduzida (Matryoshka) e a migração da coleção.
+
+Usa o Qdrant em memória e vetores sintéticos.
+"""
+
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.guardrails.guards import SemanticGrounding
+from app.ingest.extract_text import ensure_collection
+from app.ingest.migrate_dimension import migrate_collection, truncate_embeddings
+from app.ingest.versioning import bump_collection_version, get_collection_version
+
+
+class FakeEmbeddings:
+    """Embeddings falsos de dimensão fixa (determinísticos pelo texto)."""
+
+    def __init__(self, dim):
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        return [
+            np.random.default_rng(sum(map(ord, text))).normal(size=self.dim).tolist()
+            for text in texts
+        ]
+
+
+def build_source(n=30):
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client), "origem")
+    vectors = truncate_embeddings(np.random.default_rng(0).normal(size=(n, 3072)), 3072)
+    client.upsert(
+        "origem",
+        points=[
+            models.PointStruct(
+                id=str(uuid.uuid4()),
+                vector={"text-dense": vector.tolist()},
+                payload={"page_content": f"Chunk {i}", "metadata": {"num_sumula": str(i)}},
+            )
+            for i, vector in enumerate(vectors)
+        ],
+    )
+    bump_collection_version(client, "origem")
+    return client
+
+
+def test_migration_by_truncation():
+    """Testa a migração truncando os vetores armazenados."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Migração por truncamento")
+    print("=" * 60)
+
+    client = build_source()
+    result = migrate_collection(client, "origem", "destino", 256, batch_size=8)
+    print(f"\nResultado: {result}")
+
+    assert result["source_count"] == result["target_count"] == 30
+    assert get_collection_version(client, "destino") == result["version"] == 1
+    assert client.get_collection("destino").config.params.vectors["text-dense"].size == 256
+
+    point_id = next(p.id for p in client.scroll("origem", limit=5, with_vectors=True)[0] if p.vector)
+    original = client.retrieve("origem", [point_id], with_vectors=True)[0]
+    migrated = client.retrieve("destino", [point_id], with_vectors=True)[0]
+    expected = truncate_embeddings([original.vector["text-dense"]], 256)[0]
+    assert migrated.payload == original.payload
+    assert np.allclose(migrated.vector["text-dense"], expected, atol=1e-5)
+
+    try:
+        migrate_collection(client, "origem", "destino", 256)
+        assert False, "Coleção de destino existente deveria falhar"
+    except ValueError:
+        pass
+    print("\n✅ TESTE PASSOU")
+
+
+def test_reembed_and_semantic_grounding():
+    """Testa a migração com novos embeddings e o SemanticGrounding em coleção encurtada."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Re-embedding e SemanticGrounding")
+    print("=" * 60)
+
+    client = build_source(n=5)
+    migrate_collection(client, "origem", "destino", 512, embeddings=FakeEmbeddings(512))
+    migrated = [p for p in client.scroll("destino", limit=10, with_vectors=True)[0] if p.vector]
+    assert len(migrated) == 5 and all(len(p.vector["text-dense"]) == 512 for p in migrated)
+
+    try:
+        migrate_collection(client, "origem", "errada", 512, embeddings=FakeEmbeddings(3072))
+        assert False, "Embeddings de outra dimensão deveriam falhar"
+    except ValueError:
+        pass
+
+    # Frases embedadas com 3072 dimensões contra chunks de 256: usa o prefixo
+    sentence = "O gestor municipal deve aplicar os recursos no ensino fundamental"
+    full = FakeEmbeddings(3072).embed_documents([sentence])
+    chunk_vectors = truncate_embeddings(full, 256)
+    result = SemanticGrounding(FakeEmbeddings(3072)).validate(sentence, {"chunk_vectors": chunk_vectors})
+    print(f"\nSimilaridades: {result.metadata['sentence_similarities']}")
+    assert result.outcome == "pass" and result.metadata["checked"]
+    assert result.metadata["sentence_similarities"][0]["similarity"] == 1.0
+
+    result = SemanticGrounding(FakeEmbeddings(128)).validate(sentence, {"chunk_vectors": chunk_vectors})
+    assert result.metadata == {"checked": False, "reason": "dimension_mismatch"}
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA MIGRAÇÃO DE DIMENSÃO")
+    print("=" * 60)
+
+    test_migration_by_truncation()
+    test_reembed_and_semantic_grounding()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,114 @@
+"""
+Testes para a geração com tamanho limitado (alinhada ao ResponseLength).
+
+Usa streams falsos no lugar do LLM.
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.messages import AIMessageChunk
+
+from app.graph.generation import (
+    drop_incomplete_sentence,
+    max_tokens_for_length,
+    stream_bounded,
+    truncate_at_sentence,
+)
+from app.guardrails.guards import ResponseLength
+
+SENTENCE = "A Súmula 70 trata da aplicação mínima de recursos no ensino. "
+
+
+def test_truncate_at_sentence():
+    """Testa o corte na última fronteira de frase."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Corte na fronteira de frase")
+    print("=" * 60)
+
+    text = SENTENCE * 10
+    cut = truncate_at_sentence(text, 200)
+    print(f"\nCortado ({len(cut)} chars): '...{cut[-40:]}'")
+
+    assert len(cut) <= 200
+    assert cut.endswith("ensino.")
+    assert truncate_at_sentence("curto", 200) == "curto"
+
+    # Sem fronteira de frase: corta no último espaço
+    words = "palavra " * 50
+    cut = truncate_at_sentence(words, 100)
+    assert len(cut) <= 100 and cut.endswith("palavra")
+
+    assert max_tokens_for_length(2000) == 800
+    print("\n✅ TESTE PASSOU")
+
+
+def test_stream_bounded():
+    """Testa a interrupção do stream ao atingir o limite."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Stream interrompido no limite")
+    print("=" * 60)
+
+    consumed = []
+    closed = []
+
+    def fake_stream():
+        try:
+            for i in range(1000):
+                consumed.append(i)
+                yield SENTENCE
+        finally:
+            closed.append(True)
+
+    text, truncated = stream_bounded(fake_stream(), 2000)
+    print(f"\nChunks consumidos: {len(consumed)} de 1000 | Tamanho: {len(text)}")
+
+    assert truncated
+    assert len(consumed) < 40, "O stream deve parar logo após o limite"
+    assert closed == [True], "O stream do LLM deve ser fechado"
+    assert ResponseLength(min_length=100, max_length=2000).validate(text, {}).outcome == "pass"
+
+    text, truncated = stream_bounded(iter([SENTENCE, SENTENCE]), 2000)
+    assert text == SENTENCE * 2 and not truncated
+    print("\n✅ TESTE PASSOU")
+
+
+def test_token_limit_cut():
+    """Testa o corte pelo max_tokens do LLM (finish_reason == "length")."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Corte pelo max_tokens")
+    print("=" * 60)
+
+    # Texto com muitos números: menos caracteres por token, o max_tokens corta antes
+    digits = "Precedentes: Processo nº 12.345/87, Rel. Cons. X, sessão de 17/12/87. "
+    cut_mid_sentence = [AIMessageChunk(content=digits) for _ in range(5)] + [
+        AIMessageChunk(content="Processo nº 45.6", response_metadata={"finish_reason": "length"})
+    ]
+    text, truncated = stream_bounded(iter(cut_mid_sentence), 2000)
+    print(f"\nCortado pelo max_tokens ({len(text)} chars): '...{text[-30:]}'")
+    assert truncated, "Corte pelo max_tokens deve ser sinalizado"
+    assert text == (digits * 5).rstrip()
+
+    finished = [AIMessageChunk(content=SENTENCE), AIMessageChunk(content="", response_metadata={"finish_reason": "stop"})]
+    assert stream_bounded(iter(finished), 2000) == (SENTENCE, False)
+
+    assert drop_incomplete_sentence("Frase completa. Outra incomple") == "Frase completa."
+    assert drop_incomplete_sentence("Frase completa.\n") == "Frase completa."
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA GERAÇÃO LIMITADA")
+    print("=" * 60)
+
+    test_truncate_at_sentence()
+    test_stream_bounded()
+    test_token_limit_cut()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
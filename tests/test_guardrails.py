@@ -3,13 +3,30 @@ Script de teste para validar a implementação do Guardrails.
 """
 
 import sys
+import threading
 from pathlib import Path
 
 # Adiciona o diretório raiz do projeto ao PYTHONPATH
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.guardrails.guards import validate_input, validate_output, create_basic_guard
+from app.guardrails.guards import (
+    BasicToxicLanguage,
+    HallucinationDetection,
+    ProfanityCheck,
+    QuoteIndex,
+    TermMatcher,
+    ValidationCache,
+    ValidationPipeline,
+    VerbatimQuoteCheck,
+    build_context_metadata,
+    get_validation_pipeline,
+    validate_input,
+    validate_output,
+    create_basic_guard,
+)
+from langchain_core.documents import Document
+import numpy as np
 
 
 def test_input_validation():
@@ -81,10 +98,251 @@ def test_output_validation():
     print(f"  Info: {result4['validation_info']}")
 
 
+def test_term_matcher():
+    """Testa o matcher de termos (palavras inteiras, sem acento, passada única)"""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Matcher de termos ofensivos")
+    print("=" * 60)
+
+    # Termos curtos não podem casar dentro de palavras comuns em textos jurídicos
+    legal_text = "Em qualquer circunstância, a acumulação de cargos é vedada."
+    result = validate_input(legal_text)
+    print(f"\n✓ Texto jurídico: '{legal_text}'")
+    print(f"  Válido: {result['is_valid']}")
+    assert result["is_valid"], "'cu' não deveria casar dentro de outras palavras"
+
+    # Maiúsculas, acentos e espaços extras
+    toxic_text = "Que MERDA, seu Estupido! Vai tomar no  cu."
+    toxic = BasicToxicLanguage().validate(toxic_text, {})
+    clean_text, _ = BasicToxicLanguage.MATCHER.redact(toxic_text)
+    print(f"\n✗ Texto tóxico: {toxic.metadata['toxic_terms_found']}")
+    print(f"  Limpo: '{clean_text}'")
+    assert toxic.outcome == "fail"
+    assert clean_text == "Que [removido], seu [removido]! [removido]."
+    assert toxic.metadata["toxic_terms_found"] == ["merda", "estúpido", "vai tomar no cu"]
+
+    profanity = ProfanityCheck().validate("porra, que porra é essa?", {})
+    assert profanity.metadata["profanity_found"] == ["porra"]
+
+    matcher = TermMatcher(["ab", "abc"], replacement="*")
+    assert matcher.redact("abc ab abcd") == ("* * abcd", ["abc", "ab"])
+    print("\n✅ TESTE PASSOU")
+
+
+def test_validation_pipeline():
+    """Testa o pipeline de validação pré-construído e reutilizável"""
+    print("\n" + "=" * 60)
+    print("TESTE 4: Pipeline de validação reutilizável")
+    print("=" * 60)
+
+    pipeline = get_validation_pipeline()
+    assert get_validation_pipeline() is pipeline, "Pipeline deve ser construído uma vez"
+    assert get_validation_pipeline(max_length=500) is not pipeline
+
+    # As correções (fix) dos validators são aplicadas
+    toxic = pipeline.validate("A súmula diz que você é um idiota se não seguir... " * 3)
+    print(f"\n✗ Texto tóxico limpo: '{toxic['cleaned_text'][:60]}...'")
+    assert "idiota" not in toxic["cleaned_text"]
+    assert "[removido]" in toxic["cleaned_text"]
+
+    long_result = ValidationPipeline(max_length=500).validate("A" * 800)
+    assert len(long_result["cleaned_text"]) <= 503
+    assert long_result["validation_info"][0]["validator"] == "ResponseLength"
+
+    # Com contexto, os validators da Fase 2 também rodam e são medidos
+    docs = [
+        Document(
+            page_content="A Súmula 70 trata da aplicação mínima em ensino.",
+            metadata={"num_sumula": "70"},
+        )
+    ]
+    answer = "Conforme a Súmula 70, a aplicação mínima em ensino é obrigatória. " * 3
+    result = pipeline.validate(answer, context_docs=docs)
+    print(f"  Tempos (ms): {result['timings_ms']}")
+    assert set(result["timings_ms"]) == {
+        "BasicToxicLanguage",
+        "ResponseLength",
+        "HallucinationDetection",
+        "ValidSumulaReference",
+        "VerbatimQuoteCheck",
+    }
+    assert validate_output(answer, context_docs=docs)["is_valid"] == result["is_valid"]
+    print("\n✅ TESTE PASSOU")
+
+
+def test_grounding_check():
+    """Testa a verificação de base no contexto (todas as frases, todos os documentos)"""
+    print("\n" + "=" * 60)
+    print("TESTE 5: Verificação de base no contexto")
+    print("=" * 60)
+
+    # A súmula relevante está depois dos 5 primeiros documentos
+    docs = [
+        Document(page_content=f"Documento sobre licitações número {i}.", metadata={"num_sumula": str(i)})
+        for i in range(1, 8)
+    ]
+    docs.append(
+        Document(
+            page_content="A aplicação mínima de recursos em educação é obrigatória para o Município.",
+            metadata={"num_sumula": "70"},
+        )
+    )
+    metadata = build_context_metadata(docs)
+    validator = HallucinationDetection(threshold=0.7)
+
+    grounded = "A aplicação mínima de recursos em educação é obrigatória para o Município."
+    result = validator.validate(grounded, metadata)
+    scores = result.metadata["sentence_scores"]
+    print(f"\n✓ Resposta fundamentada: {scores}")
+    assert scores[0]["score"] == 1.0, "Documento após o 5º deve fazer parte do contexto"
+
+    # Acentos e flexões não impedem a correspondência (comparação por radical)
+    inflected = validator.score_sentences("Aplicacoes minimas obrigatorias do municipio", metadata["context_terms"])
+    assert inflected[0]["score"] == 1.0
+
+    # Frases sem base depois da 5ª também são pontuadas
+    invented = " ".join(
+        [grounded] * 2 + ["Os tribunais superiores decidiram pela inconstitucionalidade completa."] * 8
+    )
+    result = validator.validate(invented, metadata)
+    scores = result.metadata["sentence_scores"]
+    print(f"✗ Resposta com invenções: {len(scores)} frases, base = {result.metadata['grounding_ratio']}")
+    assert len(scores) == 10
+    assert result.metadata["grounding_ratio"] == 0.2
+    assert "Resposta parece não ter base no contexto recuperado" in result.metadata["issues"]
+    print("\n✅ TESTE PASSOU")
+
+
+def test_verbatim_quotes():
+    """Testa a verificação literal das citações (blocos `>` e trechos entre aspas)"""
+    print("\n" + "=" * 60)
+    print("TESTE 6: Citações literais")
+    print("=" * 60)
+
+    docs = [
+        Document(page_content="A falta de aplicação anual, pelo Município, de 25% da receita."),
+        Document(page_content="Poderá ensejar a responsabilização do gestor."),
+    ]
+    metadata = build_context_metadata(docs)
+    index = metadata["quote_index"]
+
+    assert index.contains("aplicação anual pelo MUNICÍPIO")
+    assert not index.contains("aplicação mensal pelo Município")
+    assert not index.contains("receita poderá ensejar"), "Citação não pode unir dois documentos"
+
+    answer = (
+        "**Conforme a Súmula Nº 70:**\n"
+        "> A falta de aplicação anual, pelo\n"
+        "> Município, de 25% (...) receita.\n"
+        "\n"
+        "O texto diz que \"o gestor será sempre punido com multa\" e \"ok\"."
+    )
+    result = VerbatimQuoteCheck().validate(answer, metadata)
+    fabricated = result.metadata["fabricated_quotes"]
+    print(f"\n✗ Citações inventadas: {fabricated}")
+    print(f"  Limpo: '{result.fix_value}'")
+
+    assert result.outcome == "fail"
+    assert result.metadata["quotes_checked"] == 2, "Aspas curtas são ignoradas"
+    assert [q["text"] for q in fabricated] == ["o gestor será sempre punido com multa"]
+    start, end = fabricated[0]["start"], fabricated[0]["end"]
+    assert answer[start:end] == '"o gestor será sempre punido com multa"'
+    assert "> A falta de aplicação anual" in result.fix_value
+    assert "[citação não encontrada no contexto]" in result.fix_value
+
+    assert VerbatimQuoteCheck().validate("> Poderá ensejar a responsabilização do gestor.", metadata).outcome == "pass"
+    assert QuoteIndex("a b a b c").longest_match(["x", "a", "b", "c", "d"]) == 3
+
+    # Sub-chunks do mesmo chunk com sobreposição (ver `split_text`)
+    def sub_chunk(index, text):
+        return Document(
+            page_content=text,
+            metadata={"pdf_name": "Súmula 070-89.pdf", "chunk_index": 0, "sub_chunk_index": index},
+        )
+
+    sub_chunks = [
+        sub_chunk(2, "Sanções previstas em lei."),
+        sub_chunk(1, "de 25% da receita, poderá ensejar a responsabilização do gestor,"),
+        sub_chunk(0, "A falta de aplicação anual, pelo Município, de 25% da receita,"),
+    ]
+    boundary = "> pelo Município, de 25% da receita, poderá ensejar a responsabilização"
+    merged = build_context_metadata(sub_chunks[1:])
+    print(f"\nSub-chunks unidos: {merged['quote_index'].documents} documento(s)")
+    assert merged["quote_index"].documents == 1
+    assert not merged["quote_index"].contains("receita de 25% da receita"), "Sobreposição removida"
+    assert VerbatimQuoteCheck().validate(boundary, merged).outcome == "pass"
+
+    # Sub-chunks não consecutivos continuam separados
+    gap = build_context_metadata([sub_chunks[0], sub_chunks[2]])
+    assert not gap["quote_index"].contains("de 25% da receita sanções previstas")
+    print("\n✅ TESTE PASSOU")
+
+
+def test_validation_cache():
+    """Testa o cache de resultados de validação"""
+    print("\n" + "=" * 60)
+    print("TESTE 7: Cache de validação")
+    print("=" * 60)
+
+    docs = [
+        Document(
+            page_content="A Súmula 70 trata da aplicação mínima em ensino.",
+            metadata={"num_sumula": "70", "_id": "a1", "_collection_name": "sumulas"},
+        )
+    ]
+    answer = "Conforme a Súmula 70, a aplicação mínima em ensino é obrigatória. " * 3
+    cache = ValidationCache(max_size=2)
+
+    first = validate_output(answer, context_docs=docs, cache=cache)
+    second = validate_output(answer, context_docs=docs, cache=cache)
+    print(f"\n✓ Estatísticas: {cache.stats()}")
+    assert "cached" not in first and second["cached"]
+    assert second["cleaned_text"] == first["cleaned_text"]
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    # Alterar o resultado recebido (ex.: no reask) não corrompe os próximos acertos
+    timings = dict(second["timings_ms"])
+    second["timings_ms"]["alterado"] = 1.0
+    second["validation_info"].append({"validator": "alterado"})
+    first["timings_ms"]["alterado"] = 1.0
+    third = validate_output(answer, context_docs=docs, cache=cache)
+    assert third["timings_ms"] == timings
+    assert all(info.get("validator") != "alterado" for info in third["validation_info"])
+
+    # Outros documentos ou outra configuração geram outra chave
+    other_docs = [Document(page_content=docs[0].page_content, metadata={"_id": "b2"})]
+    validate_output(answer, context_docs=other_docs, cache=cache)
+    validate_output(answer, context_docs=docs, cache=cache, enable_hallucination_detection=False)
+    assert cache.stats()["misses"] == 3
+
+    # Mesmo id com outro texto (re-ingestão ou troca de alias) não reaproveita o veredito
+    reingested = [Document(page_content="A Súmula 70 foi revogada.", metadata=dict(docs[0].metadata))]
+    assert validate_output(answer, context_docs=reingested, cache=cache).get("cached") is None
+    assert cache.stats()["misses"] == 4
+
+    # Com e sem os vetores dos chunks (SemanticGrounding) são resultados diferentes
+    pipeline = ValidationPipeline()
+    with_vectors = pipeline.validate(answer, context_docs=docs, cache=cache, chunk_vectors=np.ones((1, 4)))
+    assert with_vectors.get("cached") is None
+
+    # Tamanho limitado (LRU), também com várias threads
+    def validate_many(offset):
+        for i in range(50):
+            validate_output(f"{answer} {offset + i}", context_docs=docs, cache=cache)
+
+    threads = [threading.Thread(target=validate_many, args=(n * 100,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 2
+    print("\n✅ TESTE PASSOU")
+
+
 def test_guard_creation():
     """Testa criação do Guard completo"""
     print("\n" + "=" * 60)
-    print("TESTE 3: Criação do Guard Completo")
+    print("TESTE 8: Criação do Guard Completo")
     print("=" * 60)
 
     try:
@@ -103,6 +361,11 @@ if __name__ == "__main__":
 
     test_input_validation()
     test_output_validation()
+    test_term_matcher()
+    test_validation_pipeline()
+    test_grounding_check()
+    test_verbatim_quotes()
+    test_validation_cache()
     test_guard_creation()
 
     print("\n" + "=" * 60)
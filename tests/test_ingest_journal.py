@@ -0,0 +1,195 @@
+"""
+Testes para o journal de ingestão e a retomada (--resume).
+
+Usa um embedder falso (LLM e embeddings determinísticos) e o Qdrant em memória,
+sem chamadas à OpenAI.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient
+
+from app.ingest.extract_text import ensure_collection, ingest_pdf
+from app.ingest.journal import STAGES, IngestJournal
+
+
+PDF_FILE = project_root / "sumulas" / "Súmula 070-89.pdf"
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        data = {
+            "metadados": {
+                "num_sumula": "70",
+                "data_status": "07/04/14",
+                "data_status_ano": "2014",
+                "status_atual": "VIGENTE",
+                "pdf_name": PDF_FILE.name,
+            },
+            "chunks": {
+                "conteudo_principal": "A falta de aplicação anual pelo Município...",
+                "referencias_normativas": "Art. 212, caput da Constituição...",
+                "precedentes": "Auditoria nº 41/87, sessões de 30/05/89...",
+            },
+        }
+        return SimpleNamespace(content="```json\n" + json.dumps(data) + "\n```")
+
+
+class FakeEmbeddings:
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("429 Too Many Requests")
+        return [[float(len(t) % 7 + 1)] * 3072 for t in texts]
+
+
+def make_embedder(fail_times: int = 0):
+    return SimpleNamespace(
+        llm=FakeLLM(),
+        model=FakeEmbeddings(fail_times),
+        client=QdrantClient(":memory:"),
+    )
+
+
+def test_journal_replay_and_file_change():
+    """Testa a reconstrução do estado a partir do JSONL."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Replay do journal")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "journal.jsonl"
+        journal = IngestJournal(str(path))
+        journal.record("a.pdf", "h1", "converted", text="abc")
+        journal.record("a.pdf", "h1", "extracted", chunks=[{"text": "abc"}])
+        journal.record_failure("a.pdf", "h1", "embedded", RuntimeError("timeout"))
+
+        # Simula crash no meio da escrita de uma linha
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"pdf_name": "b.pdf", "sha2')
+
+        resumed = IngestJournal(str(path), resume=True)
+        summary = resumed.summary()
+        print(f"Resumo: {summary}")
+
+        assert resumed.last_stage("a.pdf", "h1") == "extracted"
+        assert resumed.data("a.pdf")["text"] == "abc"
+        assert resumed.last_stage("a.pdf", "h2") is None, "PDF alterado recomeça do zero"
+        assert summary["failures"][0]["error"] == "RuntimeError: timeout"
+
+        fresh = IngestJournal(str(path))
+        assert fresh.last_stage("a.pdf", "h1") is None, "Sem --resume o journal é reiniciado"
+
+    print("\n✅ TESTE PASSOU")
+
+
+def test_resume_after_embedding_failure():
+    """Testa que a retomada não repete a extração via LLM nem duplica pontos."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Retomada após falha de embedding")
+    print("=" * 60)
+
+    embedder = make_embedder(fail_times=1)
+    ensure_collection(embedder, "teste")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "journal.jsonl")
+
+        journal = IngestJournal(path)
+        try:
+            ingest_pdf(PDF_FILE, embedder, "teste", journal)
+        except RuntimeError as e:
+            print(f"Falha simulada: {e}")
+        else:
+            raise AssertionError("A falha de embedding deveria ser propagada")
+
+        assert journal.summary()["failures"][0]["stage"] == "embedded"
+
+        journal = IngestJournal(path, resume=True)
+        inserted = ingest_pdf(PDF_FILE, embedder, "teste", journal)
+        again = ingest_pdf(PDF_FILE, embedder, "teste", journal)
+        count = embedder.client.count("teste").count
+
+        print(f"Chamadas ao LLM: {embedder.llm.calls}")
+        print(f"Chunks inseridos: {inserted} | Pontos na coleção: {count}")
+
+        assert embedder.llm.calls == 1, "A extração não deveria ser repetida"
+        assert inserted == 3 and again == 0
+        assert count == 3, "Pontos não deveriam ser duplicados"
+        assert not journal.summary()["failures"]
+
+    print("\n✅ TESTE PASSOU")
+
+
+def test_journal_compaction():
+    """Testa a compactação do journal (um evento por PDF, sem artefatos já gravados)."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Compactação do journal")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "journal.jsonl"
+        journal = IngestJournal(str(path), compact_every=0)
+        for round_ in range(5):
+            for name in ("a.pdf", "b.pdf"):
+                sha = f"{name}-{round_}"
+                journal.record(name, sha, "converted", text="texto " * 100)
+                journal.record(name, sha, "extracted", chunks=[{"text": "texto"}])
+                journal.record(name, sha, "embedded", vectors=[[0.5] * 3072])
+                journal.record(name, sha, "upserted", num_chunks=1)
+        journal.record("c.pdf", "c1", "converted", text="pendente")
+        journal.record_failure("c.pdf", "c1", "extracted", ValueError("JSON inválido"))
+        journal.record("d.pdf", "d1", "converted", text="removido")
+        journal.record_removal("d.pdf")
+        assert journal.data("a.pdf") == {"num_chunks": 1}, "Artefatos descartados após upserted"
+
+        size = path.stat().st_size
+        resumed = IngestJournal(str(path), resume=True)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        print(f"\nTamanho: {size} → {path.stat().st_size} bytes ({len(lines)} eventos)")
+        assert len(lines) == 4, "Um evento por PDF (a, b, c) e um por falha pendente"
+        assert path.stat().st_size * 50 < size
+        assert sorted(resumed.known_files()) == ["a.pdf", "b.pdf", "c.pdf"]
+        assert resumed.last_stage("b.pdf", "b.pdf-4") == "upserted"
+        assert resumed.last_stage("c.pdf", "c1") == "converted"
+        assert resumed.data("c.pdf")["text"] == "pendente"
+        assert resumed.summary()["failures"][0]["pdf_name"] == "c.pdf"
+
+        # Compactação automática a cada `compact_every` eventos
+        journal = IngestJournal(str(path), resume=True, compact_every=4)
+        for i in range(4):
+            journal.record("a.pdf", "a-novo", STAGES[i], **({"num_chunks": 1} if i == 3 else {}))
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+        assert IngestJournal(str(path), resume=True).last_stage("a.pdf", "a-novo") == "upserted"
+
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO JOURNAL DE INGESTÃO")
+    print("=" * 60)
+
+    test_journal_replay_and_file_change()
+    test_resume_after_embedding_failure()
+    test_journal_compaction()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,125 @@
+"""
+Testes para a normalização tipada dos metadados e o backfill dos pontos gravados.
+
+Usa o Qdrant em memória.
+"""
+
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest.extract_text import build_chunks, ensure_collection
+from app.ingest.payload import SumulaMetadata, backfill_payloads
+from app.ingest.versioning import get_collection_version
+
+
+def test_metadata_coercion():
+    """Testa a conversão dos campos devolvidos pelo LLM."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Conversão dos metadados")
+    print("=" * 60)
+
+    metadata = SumulaMetadata.from_raw(
+        {
+            "num_sumula": "Súmula nº 070",
+            "data_status": "07/04/14",
+            "data_status_ano": "2014",
+            "status_atual": "  vigente ",
+        },
+        "Súmula 070-89.pdf",
+    )
+    print(f"\n{metadata}")
+    assert metadata.num_sumula == "70"
+    assert metadata.data_status_ano == 2014
+    assert metadata.data_status_iso == "2014-04-07"
+    assert metadata.status_atual == "VIGENTE"
+    assert metadata.pdf_name == "Súmula 070-89.pdf"
+
+    # Ano derivado da data (anos de 2 dígitos: súmulas a partir de 1987)
+    metadata = SumulaMetadata.from_raw({"num_sumula": "12", "data_status": "17/12/87", "data_status_ano": ""})
+    assert metadata.data_status_ano == 1987 and metadata.data_status_iso == "1987-12-17"
+
+    # Data inválida não impede a ingestão; número vem do nome do PDF
+    metadata = SumulaMetadata.from_raw({"data_status": "31/02/14", "data_status_ano": "n/d"}, "Súmula 105-07.pdf")
+    assert metadata.num_sumula == "105"
+    assert metadata.data_status_iso is None and metadata.data_status_ano is None
+
+    try:
+        SumulaMetadata.from_raw({"num_sumula": "sem número"}, "anexo.pdf")
+        assert False, "Súmula sem número deveria falhar"
+    except ValueError:
+        pass
+
+    chunks = build_chunks(
+        {"metadados": {"num_sumula": "007", "data_status_ano": "2001"}, "chunks": {"conteudo_principal": "Texto."}},
+        "Súmula 007-89.pdf",
+    )
+    assert chunks[0]["metadata"]["num_sumula"] == "7"
+    assert chunks[0]["metadata"]["data_status_ano"] == 2001
+    assert chunks[0]["metadata"]["chunk_type"] == "conteudo_principal"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_backfill_enables_range_filters():
+    """Testa o backfill dos pontos antigos e o filtro por intervalo de anos."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Backfill e filtro 'antes de 2010'")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client), "teste")
+    raw = [("070", "2014"), ("12", "1987"), ("85", "2008"), ("sem número", "2000")]
+    client.upsert(
+        "teste",
+        points=[
+            models.PointStruct(
+                id=str(uuid.uuid4()),
+                vector={},
+                payload={
+                    "page_content": f"Súmula {num}",
+                    "metadata": {"num_sumula": num, "data_status_ano": year, "status_atual": "vigente", "chunk_index": 0},
+                },
+            )
+            for num, year in raw
+        ],
+    )
+
+    before_2010 = models.Filter(
+        must=[models.FieldCondition(key="metadata.data_status_ano", range=models.Range(lt=2010))]
+    )
+    assert client.count("teste", count_filter=before_2010).count == 0, "Anos em texto não casam com o intervalo"
+
+    dry = backfill_payloads(client, "teste", batch_size=2, dry_run=True)
+    assert dry["updated"] == 3 and client.count("teste", count_filter=before_2010).count == 0
+
+    result = backfill_payloads(client, "teste", batch_size=2)
+    print(f"\nBackfill: {result}")
+    assert result["scanned"] == 4 and result["updated"] == 3 and len(result["invalid"]) == 1
+    assert result["version"] == get_collection_version(client, "teste") == 1
+
+    matches = client.scroll("teste", scroll_filter=before_2010, with_payload=True)[0]
+    assert sorted(p.payload["metadata"]["num_sumula"] for p in matches) == ["12", "85"]
+    assert matches[0].payload["metadata"]["status_atual"] == "VIGENTE"
+    assert matches[0].payload["metadata"]["chunk_index"] == 0, "Campos existentes preservados"
+
+    assert backfill_payloads(client, "teste")["updated"] == 0, "Segunda execução não altera nada"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA NORMALIZAÇÃO DOS METADADOS")
+    print("=" * 60)
+
+    test_metadata_coercion()
+    test_backfill_enables_range_filters()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,111 @@
+"""
+Testes para o esquema declarativo de índices de payload e o comando migrate.
+
+O Qdrant local não mantém índices de payload, então um cliente de teste
+registra os índices criados (como o Qdrant servidor os reporta).
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_community.query_constructors.qdrant import QdrantTranslator
+from langchain_core.structured_query import Comparator, Comparison, StructuredQuery
+from qdrant_client import models
+
+from app.ingest.payload_schema import PAYLOAD_SCHEMA, diff_indexes, migrate
+from app.retrieval.self_query import metadata_field_info
+
+
+class IndexRecordingClient:
+    """Registra os índices de payload no formato de `get_collection().payload_schema`."""
+
+    def __init__(self):
+        self.payload_schema = {}
+        self.calls = []
+
+    def get_collection(self, collection_name):
+        return SimpleNamespace(payload_schema=dict(self.payload_schema))
+
+    def create_payload_index(self, collection_name, field_name, field_schema, wait=True):
+        self.calls.append(("create", field_name))
+        self.payload_schema[field_name] = models.PayloadIndexInfo(
+            data_type=field_schema.type.value, params=field_schema, points=0
+        )
+
+    def delete_payload_index(self, collection_name, field_name, wait=True):
+        self.calls.append(("delete", field_name))
+        self.payload_schema.pop(field_name)
+
+
+def test_schema_covers_self_query():
+    """Testa se todo filtro que o self-query pode gerar tem índice."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Cobertura dos filtros do self-query")
+    print("=" * 60)
+
+    translator = QdrantTranslator(metadata_key="metadata")
+    indexed = {field.key: field.type for field in PAYLOAD_SCHEMA}
+    for attribute in metadata_field_info:
+        value = 2010 if attribute.type == "integer" else "VIGENTE"
+        comparator = Comparator.LT if attribute.type == "integer" else Comparator.EQ
+        _, kwargs = translator.visit_structured_query(
+            StructuredQuery(
+                query="x",
+                filter=Comparison(comparator=comparator, attribute=attribute.name, value=value),
+            )
+        )
+        key = kwargs["filter"].must[0].key
+        print(f"  {attribute.name:<18} → {key}")
+        assert key in indexed, f"Filtro sem índice: {key}"
+        assert indexed[key] == ("integer" if attribute.type == "integer" else "keyword")
+    print("\n✅ TESTE PASSOU")
+
+
+def test_migrate_is_idempotent():
+    """Testa a criação do que falta, a repetição sem mudanças e a recriação de divergentes."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Migração idempotente")
+    print("=" * 60)
+
+    client = IndexRecordingClient()
+    # Coleção antiga: índices na raiz do payload e um índice com parâmetros errados
+    client.create_payload_index("c", "num_sumula", models.KeywordIndexParams(type="keyword"))
+    client.create_payload_index(
+        "c", "metadata.data_status_ano", models.IntegerIndexParams(type="integer", lookup=True, range=False)
+    )
+
+    dry = migrate(client, "c", dry_run=True)
+    assert len(client.calls) == 2, "dry-run não altera a coleção"
+    assert "metadata.chunk_type" in dry["created"]
+
+    result = migrate(client, "c")
+    print(f"\nPrimeira execução: {result}")
+    assert len(result["created"]) == len(PAYLOAD_SCHEMA) - 1
+    assert result["mismatched"] == ["metadata.data_status_ano"]
+
+    calls = len(client.calls)
+    assert migrate(client, "c") == {"created": [], "recreated": [], "mismatched": ["metadata.data_status_ano"]}
+    assert len(client.calls) == calls, "Segunda execução não cria nada"
+
+    result = migrate(client, "c", recreate_mismatched=True)
+    assert result["recreated"] == ["metadata.data_status_ano"]
+    assert diff_indexes(client, "c") == {"missing": [], "mismatched": []}
+    assert client.payload_schema["metadata.data_status_ano"].params.range is True
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO ESQUEMA DE ÍNDICES DE PAYLOAD")
+    print("=" * 60)
+
+    test_schema_covers_self_query()
+    test_migrate_is_idempotent()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,79 @@
+"""
+Testes para os parâmetros de transporte do QdrantClient (REST/gRPC, pool, timeouts).
+
+Não precisa de um Qdrant no ar: as requisições REST são respondidas por um
+transporte falso do httpx.
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+from qdrant_client import QdrantClient
+
+from app.ingest.embed_qdrant import qdrant_connection_kwargs
+from app.utils.settings import settings
+
+
+def test_rest_timeouts():
+    """Testa o timeout de conexão separado e os timeouts de consulta/ingestão."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Timeouts e pool do transporte REST")
+    print("=" * 60)
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"result": {"collections": []}, "status": "ok", "time": 0.0})
+
+    for timeout in (None, settings.QDRANT_INGEST_TIMEOUT):
+        kwargs = qdrant_connection_kwargs(timeout, prefer_grpc=False)
+        assert kwargs["limits"].max_connections == settings.QDRANT_POOL_SIZE
+        assert kwargs["limits"].keepalive_expiry == settings.QDRANT_KEEPALIVE_SECONDS
+
+        kwargs["transport"] = httpx.MockTransport(handler)
+        client = QdrantClient(host="localhost", port=6333, check_compatibility=False, **kwargs)
+        client.get_collections()
+
+    print(f"\nConsulta: {seen[0]}")
+    print(f"Ingestão: {seen[1]}")
+    assert seen[0]["connect"] == settings.QDRANT_CONNECT_TIMEOUT
+    assert seen[0]["read"] == settings.QDRANT_QUERY_TIMEOUT
+    assert seen[1]["read"] == settings.QDRANT_INGEST_TIMEOUT
+    assert seen[1]["connect"] == settings.QDRANT_CONNECT_TIMEOUT
+    print("\n✅ TESTE PASSOU")
+
+
+def test_grpc_options():
+    """Testa o pool de canais e o keep-alive do transporte gRPC."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Parâmetros do transporte gRPC")
+    print("=" * 60)
+
+    kwargs = qdrant_connection_kwargs(prefer_grpc=True)
+    print(f"\n{kwargs['grpc_options']}")
+    assert kwargs["prefer_grpc"] and kwargs["grpc_port"] == settings.QDRANT_GRPC_PORT
+    assert kwargs["pool_size"] == settings.QDRANT_POOL_SIZE and "limits" not in kwargs
+    assert kwargs["grpc_options"]["grpc.keepalive_time_ms"] == int(settings.QDRANT_KEEPALIVE_SECONDS * 1000)
+
+    # Os canais são abertos sob demanda: criar o cliente não conecta
+    client = QdrantClient(host="localhost", port=6333, check_compatibility=False, **kwargs)
+    client.close()
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO TRANSPORTE DO QDRANT")
+    print("=" * 60)
+
+    test_rest_timeouts()
+    test_grpc_options()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,165 @@
+"""
+Testes para a regeneração corretiva ("reask") com orçamento de latência.
+
+Usa geradores falsos no lugar do LLM e o pipeline de validação real.
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+
+from app.graph.reask import ReaskPolicy, run_reask_loop
+from app.guardrails.guards import ValidationPipeline
+
+DOCS = [
+    Document(
+        page_content=(
+            "A falta de aplicação anual, pelo Município, de 25% da receita de impostos "
+            "na manutenção e desenvolvimento do ensino poderá ensejar a responsabilização do gestor."
+        ),
+        metadata={"num_sumula": "70"},
+    )
+]
+
+INVENTED = (
+    "Conforme a Súmula 150, os tribunais superiores decidiram pela inconstitucionalidade "
+    "completa da cobrança. A decisão vinculante obriga todos os entes federados imediatamente."
+)
+# Bem fundamentada no texto, mas atribuída a uma súmula que não foi recuperada
+MISATTRIBUTED = (
+    "Conforme a Súmula 150, a falta de aplicação anual, pelo Município, de 25% da receita "
+    "de impostos na manutenção e desenvolvimento do ensino poderá ensejar a "
+    "responsabilização do gestor."
+)
+GROUNDED = (
+    "Conforme a Súmula 70, a falta de aplicação anual, pelo Município, de 25% da receita "
+    "de impostos na manutenção e desenvolvimento do ensino poderá ensejar a "
+    "responsabilização do gestor."
+)
+
+
+class FakeGenerator:
+    """Devolve as respostas na ordem e registra os problemas recebidos."""
+
+    def __init__(self, answers, clock=None, seconds_per_call=0.0):
+        self.answers = list(answers)
+        self.calls = []
+        self.clock = clock
+        self.seconds_per_call = seconds_per_call
+
+    def __call__(self, previous_answer, issues):
+        self.calls.append((previous_answer, list(issues)))
+        if self.clock is not None:
+            self.clock.now += self.seconds_per_call
+        return self.answers[min(len(self.calls), len(self.answers)) - 1]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def validate(answer):
+    return ValidationPipeline().validate(answer, context_docs=DOCS)
+
+
+def test_reask_until_passing():
+    """Testa a regeneração com os problemas específicos no novo prompt."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Regeneração até a resposta passar")
+    print("=" * 60)
+
+    generate = FakeGenerator([INVENTED, GROUNDED])
+    outcome = run_reask_loop(generate, validate, ReaskPolicy(max_attempts=3))
+    print(f"\nTentativas: {outcome['attempts']}")
+
+    assert outcome["stop_reason"] == "passed"
+    assert outcome["answer"] == GROUNDED
+    assert len(outcome["attempts"]) == 2
+    assert generate.calls[0] == (None, [])
+    previous_answer, issues = generate.calls[1]
+    assert previous_answer == INVENTED
+    assert any("150" in issue for issue in issues), "Problemas específicos no reask"
+    assert outcome["attempts"][0]["issues"] == issues
+    print("\n✅ TESTE PASSOU")
+
+
+def test_reask_budget():
+    """Testa os limites de tentativas e de prazo e a escolha da melhor candidata."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Limites de tentativas e prazo")
+    print("=" * 60)
+
+    # Nenhuma passa: fica com a de menos problemas
+    short = "Conforme a Súmula 150."  # curta demais (sem correção possível) e sem base
+    invented_and_toxic = INVENTED + " Que idiota."
+    generate = FakeGenerator([invented_and_toxic, INVENTED, short])
+    outcome = run_reask_loop(generate, validate, ReaskPolicy(max_attempts=3))
+    print(f"\nSem aprovação: {[a['issues'] for a in outcome['attempts']]}")
+    assert outcome["stop_reason"] == "max_attempts"
+    assert len(generate.calls) == 3
+    assert [a["needs_reask"] for a in outcome["attempts"]] == [True, True, True]
+    assert outcome["answer"] == INVENTED, "Mesmo nº de pedidos de reask, menos falhas no total"
+
+    # Prazo: a próxima geração (tão lenta quanto a última) não cabe no orçamento
+    clock = FakeClock()
+    generate = FakeGenerator([INVENTED, GROUNDED], clock=clock, seconds_per_call=12.0)
+    outcome = run_reask_loop(
+        generate, validate, ReaskPolicy(max_attempts=5, deadline_seconds=20.0), clock=clock
+    )
+    print(f"Prazo: {outcome['stop_reason']} após {outcome['elapsed_ms']} ms")
+    assert outcome["stop_reason"] == "deadline"
+    assert len(generate.calls) == 1
+    assert outcome["answer"] == INVENTED
+    assert outcome["attempts"][0]["elapsed_ms"] == 12000.0
+    print("\n✅ TESTE PASSOU")
+
+
+def test_reask_triggers():
+    """Testa que súmula não recuperada e citação inventada, sozinhas, pedem regeneração."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Gatilhos do reask")
+    print("=" * 60)
+
+    validation = validate(MISATTRIBUTED)
+    print(f"\nSúmula não recuperada: {[info['validator'] for info in validation['validation_info']]}")
+    assert validation["needs_reask"]
+    assert [info["validator"] for info in validation["validation_info"]] == ["ValidSumulaReference"]
+
+    generate = FakeGenerator([MISATTRIBUTED, GROUNDED])
+    outcome = run_reask_loop(generate, validate, ReaskPolicy(max_attempts=2))
+    assert outcome["stop_reason"] == "passed" and outcome["answer"] == GROUNDED
+    assert generate.calls[1][1] == ["Súmulas citadas mas não presentes no contexto: 150"]
+
+    fabricated_quote = GROUNDED + '\n\n> O gestor será sempre punido com multa e afastamento do cargo.'
+    generate = FakeGenerator([fabricated_quote, GROUNDED])
+    outcome = run_reask_loop(generate, validate, ReaskPolicy(max_attempts=2))
+    print(f"Citação inventada: {outcome['attempts'][0]['issues']}")
+    assert outcome["stop_reason"] == "passed" and len(generate.calls) == 2
+    assert "Citação não encontrada literalmente" in generate.calls[1][1][0]
+
+    # Sem novas tentativas, fica a resposta com a citação trocada pelo aviso
+    outcome = run_reask_loop(FakeGenerator([fabricated_quote]), validate, ReaskPolicy(max_attempts=1))
+    assert "[citação não encontrada no contexto]" in outcome["answer"]
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO REASK")
+    print("=" * 60)
+
+    test_reask_until_passing()
+    test_reask_budget()
+    test_reask_triggers()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,152 @@
+"""
+Testes para a verificação semântica de base no contexto (SemanticGrounding).
+
+Usa embeddings falsos (saco de palavras com hash) e o Qdrant em memória,
+sem chamadas à OpenAI.
+"""
+
+import hashlib
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from langchain_core.documents import Document
+from qdrant_client import QdrantClient, models
+
+from app.guardrails.guards import SemanticGrounding, ValidationPipeline
+from app.ingest.extract_text import ensure_collection
+from app.retrieval.retriever import fetch_chunk_vectors
+
+CHUNKS = [
+    "A falta de aplicação anual pelo Município de 25% da receita de impostos em ensino.",
+    "Poderá ensejar a responsabilização do gestor sem prejuízo de outras sanções.",
+]
+
+
+class FakeEmbeddings:
+    """Saco de palavras com hash: frases com as mesmas palavras têm cosseno alto."""
+
+    def __init__(self, dim: int = 3072):
+        self.dim = dim
+        self.calls = 0
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            digest = hashlib.blake2b(word.strip(".,").encode(), digest_size=4).digest()
+            vector[int.from_bytes(digest) % self.dim] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+
+
+def build_collection(embeddings):
+    """Cria a coleção em memória e retorna (client, docs como vindos do retriever)."""
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client), "teste")
+
+    docs = []
+    points = []
+    for text, vector in zip(CHUNKS, embeddings.embed_documents(CHUNKS)):
+        point_id = str(uuid.uuid4())
+        points.append(
+            models.PointStruct(
+                id=point_id,
+                vector={"text-dense": vector},
+                payload={"page_content": text, "metadata": {"num_sumula": "70"}},
+            )
+        )
+        docs.append(
+            Document(
+                page_content=text,
+                metadata={"num_sumula": "70", "_id": point_id, "_collection_name": "teste"},
+            )
+        )
+    client.upsert("teste", points=points)
+    return client, docs
+
+
+def test_fetch_chunk_vectors():
+    """Testa a busca dos vetores armazenados (na ordem dos documentos)."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Vetores armazenados dos chunks")
+    print("=" * 60)
+
+    embeddings = FakeEmbeddings()
+    client, docs = build_collection(embeddings)
+
+    vectors = fetch_chunk_vectors(client, list(reversed(docs)) + [Document(page_content="sem id")])
+    print(f"Matriz: {vectors.shape}")
+
+    assert vectors.shape == (2, 3072)
+    expected = np.asarray(embeddings.embed_documents(CHUNKS[::-1]), dtype=np.float32)
+    cosine = (vectors * expected).sum(axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(expected, axis=1)
+    )
+    assert np.allclose(cosine, 1.0, atol=1e-5)
+    assert fetch_chunk_vectors(client, []).shape == (0, 0)
+    print("\n✅ TESTE PASSOU")
+
+
+def test_semantic_grounding():
+    """Testa a detecção de frases sem correspondência semântica no contexto."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Base semântica no contexto")
+    print("=" * 60)
+
+    embeddings = FakeEmbeddings()
+    client, docs = build_collection(embeddings)
+    chunk_vectors = fetch_chunk_vectors(client, docs)
+    validator = SemanticGrounding(embeddings)
+
+    grounded = " ".join(CHUNKS)
+    embeddings.calls = 0
+    result = validator.validate(grounded, {"chunk_vectors": chunk_vectors})
+    print(f"\n✓ Resposta fundamentada: {result.metadata['sentence_similarities']}")
+    assert result.outcome == "pass"
+    assert embeddings.calls == 1, "Todas as frases em uma única chamada de embeddings"
+    assert [s["best_chunk"] for s in result.metadata["sentence_similarities"]] == [0, 1]
+
+    invented = (
+        "O Supremo Tribunal Federal julgou inconstitucional a cobrança da taxa. "
+        "Os recursos foram devolvidos integralmente aos contribuintes afetados. "
+        + CHUNKS[0]
+    )
+    result = validator.validate(invented, {"chunk_vectors": chunk_vectors})
+    print(f"✗ Frases sem base: {result.metadata['unsupported_sentences']}")
+    assert result.outcome == "fail"
+    assert len(result.metadata["unsupported_sentences"]) == 2
+
+    # Sem vetores, o validator não bloqueia a resposta
+    assert validator.validate(invented, {}).outcome == "pass"
+
+    # No pipeline, o validator só entra quando há modelo de embeddings
+    pipeline = ValidationPipeline(embeddings=embeddings)
+    pipeline_result = pipeline.validate(
+        invented * 2, context_docs=docs, chunk_vectors=chunk_vectors
+    )
+    assert "SemanticGrounding" in pipeline_result["timings_ms"]
+    assert "SemanticGrounding" not in ValidationPipeline().validate(
+        invented * 2, context_docs=docs
+    )["timings_ms"]
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DA BASE SEMÂNTICA")
+    print("=" * 60)
+
+    test_fetch_chunk_vectors()
+    test_semantic_grounding()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
@@ -0,0 +1,162 @@
+"""
+Testes para as opções de Qdrant com vários nós (shards, réplicas e consistência).
+
+O Qdrant local ignora shards e réplicas e não suporta chaves de shard, então
+um cliente de teste registra os parâmetros enviados e repassa o resto ao
+Qdrant em memória.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient, models
+
+from app.ingest.extract_text import ensure_collection, upsert_chunks
+from app.ingest.sharding import ShardingConfig, read_consistency
+from app.ingest.versioning import bump_collection_version
+from app.retrieval.retriever import SelfQueryConfig
+
+DIM = 8
+
+
+class ShardRecordingClient:
+    """Registra shards, chaves e seletores; o restante vai para o Qdrant em memória."""
+
+    def __init__(self):
+        self.client = QdrantClient(":memory:")
+        self.created = {}
+        self.shard_keys = []
+        self.selectors = []
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def create_collection(self, collection_name, **kwargs):
+        self.created = {k: kwargs.get(k) for k in ("shard_number", "replication_factor", "write_consistency_factor", "sharding_method")}
+        return self.client.create_collection(collection_name, **kwargs)
+
+    def create_shard_key(self, collection_name, shard_key, **kwargs):
+        self.shard_keys.append((shard_key, kwargs))
+
+    def upsert(self, collection_name, points, shard_key_selector=None, **kwargs):
+        self.selectors.append(("upsert", shard_key_selector))
+        return self.client.upsert(collection_name, points, **kwargs)
+
+    def delete(self, collection_name, points_selector, shard_key_selector=None, **kwargs):
+        self.selectors.append(("delete", shard_key_selector))
+        return self.client.delete(collection_name, points_selector, **kwargs)
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_query(self, text):
+        return [1.0] + [0.0] * (DIM - 1)
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+def test_sharding_config():
+    """Testa a validação e os parâmetros de criação e de consulta."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Configuração de shards, réplicas e consistência")
+    print("=" * 60)
+
+    assert ShardingConfig().collection_kwargs() == {}, "Sem opções: padrões do servidor"
+    config = ShardingConfig(shard_number=6, replication_factor=2, write_consistency_factor=2)
+    print(f"\n{config.describe()}")
+    assert config.collection_kwargs() == {"shard_number": 6, "replication_factor": 2, "write_consistency_factor": 2}
+    assert ShardingConfig(shard_key="sumulas").collection_kwargs() == {"sharding_method": models.ShardingMethod.CUSTOM}
+
+    for invalid in ({"shard_number": 0}, {"replication_factor": 2, "write_consistency_factor": 3}):
+        try:
+            ShardingConfig(**invalid)
+            assert False, f"Configuração inválida aceita: {invalid}"
+        except ValueError:
+            pass
+
+    assert read_consistency("") is None
+    assert read_consistency("majority") == models.ReadConsistencyType.MAJORITY
+    assert read_consistency("2") == 2
+
+    kwargs = SelfQueryConfig(read_consistency="quorum", shard_key="sumulas").search_kwargs()
+    assert kwargs["consistency"] == models.ReadConsistencyType.QUORUM
+    assert kwargs["shard_key_selector"] == "sumulas"
+    assert "consistency" not in SelfQueryConfig(read_consistency="", shard_key=None).search_kwargs()
+    print("\n✅ TESTE PASSOU")
+
+
+def test_custom_shard_key_ingestion():
+    """Testa a criação da coleção com chave de shard e a gravação nos shards da chave."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Ingestão com sharding customizado")
+    print("=" * 60)
+
+    client = ShardRecordingClient()
+    embedder = SimpleNamespace(client=client, dim=DIM)
+    sharding = ShardingConfig(shard_number=2, replication_factor=2, shard_key="sumulas")
+    ensure_collection(embedder, "teste", sharding=sharding)
+    assert client.created["sharding_method"] == models.ShardingMethod.CUSTOM
+    assert client.created["replication_factor"] == 2
+    assert client.shard_keys == [("sumulas", {"shards_number": 2, "replication_factor": 2})]
+
+    chunks = [
+        {"text": "Súmula 70", "metadata": {"pdf_name": "Súmula 070-89.pdf", "num_sumula": "70", "chunk_type": "conteudo_principal", "chunk_index": 0}}
+    ]
+    upsert_chunks(embedder, "teste", chunks, FakeEmbeddings().embed_documents(["x"]), shard_key="sumulas")
+    bump_collection_version(client, "teste", shard_key="sumulas")
+    print(f"\nSeletores: {client.selectors}")
+    assert client.selectors == [("upsert", "sumulas"), ("delete", "sumulas"), ("upsert", "sumulas")]
+    print("\n✅ TESTE PASSOU")
+
+
+def test_query_options_reach_qdrant():
+    """Testa se consistência e chave de shard chegam à busca do vector store."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Opções de consulta no vector store")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client, dim=DIM), "teste")
+    upsert_chunks(
+        SimpleNamespace(client=client),
+        "teste",
+        [{"text": "Súmula 70", "metadata": {"pdf_name": "a.pdf", "num_sumula": "70", "chunk_type": "conteudo_principal", "chunk_index": 0}}],
+        FakeEmbeddings().embed_documents(["x"]),
+        replace_existing=False,
+    )
+    store = QdrantVectorStore(client=client, collection_name="teste", embedding=FakeEmbeddings(), vector_name="text-dense")
+
+    seen = {}
+    query_points = client.query_points
+
+    def recording_query_points(*args, **kwargs):
+        seen.update(consistency=kwargs.get("consistency"), shard_key_selector=kwargs.get("shard_key_selector"))
+        kwargs.pop("shard_key_selector", None)  # o modo local não tem chaves de shard
+        return query_points(*args, **kwargs)
+
+    client.query_points = recording_query_points
+    docs = store.similarity_search("súmula 70", **SelfQueryConfig(k=3, read_consistency="majority", shard_key="sumulas").search_kwargs())
+    print(f"\n{seen}")
+    assert docs and docs[0].metadata["num_sumula"] == "70"
+    assert seen == {"consistency": models.ReadConsistencyType.MAJORITY, "shard_key_selector": "sumulas"}
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DE SHARDS, RÉPLICAS E CONSISTÊNCIA")
+    print("=" * 60)
+
+    test_sharding_config()
+    test_custom_shard_key_ingestion()
+    test_query_options_reach_qdrant()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
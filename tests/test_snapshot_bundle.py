@@ -0,0 +1,192 @@
+"""
+Testes para a exportação/importação da coleção em bundle compacto.
+
+Usa o Qdrant em memória (sem OpenAI).
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.ingest.bundle import (
+    DENSE_FILE,
+    export_bundle,
+    import_bundle,
+    payload_columns,
+    payload_rows,
+    verify_bundle,
+)
+from app.ingest.extract_text import ensure_collection
+from app.ingest.storage import DEFAULT_INDEXING_THRESHOLD
+from app.ingest.text_store import TextStore
+from app.ingest.versioning import bump_collection_version, get_collection_version
+
+DIM = 16
+
+
+def make_source(client: QdrantClient, name: str = "origem") -> None:
+    """Coleção com vetores densos, esparsos em parte dos pontos e versão 3."""
+    ensure_collection(SimpleNamespace(client=client, dim=DIM), name)
+    rng = np.random.default_rng(3)
+    points = []
+    for i in range(1, 31):
+        vector = {"text-dense": rng.normal(size=DIM).tolist()}
+        if i % 3 == 0:
+            vector["text-sparse"] = models.SparseVector(indices=[i, 1000 + i], values=[0.5, 1.5])
+        metadata = {"pdf_name": f"Súmula {i:03d}-89.pdf", "num_sumula": str(i), "chunk_index": 0}
+        if i % 2 == 0:
+            metadata["status_atual"] = None
+        points.append(models.PointStruct(id=i, vector=vector, payload={"page_content": f"Súmula {i}", "metadata": metadata}))
+    client.upsert(name, points=points, wait=True)
+    for _ in range(3):
+        bump_collection_version(client, name)
+
+
+def test_payload_columns():
+    """Testa a ida e volta dos payloads em colunas (campos ausentes x nulos)."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Payloads em colunas")
+    print("=" * 60)
+
+    payloads = [
+        {"page_content": "a", "metadata": {"num_sumula": "1", "status_atual": None}},
+        {"page_content": "b", "metadata": {"num_sumula": "2", "revogada_por": ["10"]}},
+        {},
+    ]
+    columns = payload_columns(payloads)
+    print(f"\nColunas: {sorted(columns)}")
+    assert columns["metadata.status_atual"]["missing"] == [1, 2]
+    assert payload_rows(columns, len(payloads)) == payloads
+    print("\n✅ TESTE PASSOU")
+
+
+def test_round_trip():
+    """Testa export + import (float32 e float16) com vetores, payloads e versão."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Exportação e importação")
+    print("=" * 60)
+
+    source = QdrantClient(":memory:")
+    make_source(source)
+    # Vetores como gravados (a distância cosseno normaliza na inserção)
+    expected = {p.id: p for p in source.scroll("origem", limit=100, with_vectors=True)[0] if isinstance(p.id, int)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype, tolerance in (("float32", 1e-6), ("float16", 1e-2)):
+            out = Path(tmp) / dtype
+            manifest = export_bundle(source, "origem", str(out), dtype=dtype, batch_size=7)
+            print(f"\n{dtype}: {manifest['points']} pontos, {manifest['files'][DENSE_FILE]['bytes']} bytes de vetores")
+            assert manifest["points"] == 30 and manifest["collection_version"] == 3
+            assert manifest["dim"] == DIM and manifest["sparse"]
+
+            target = QdrantClient(":memory:")
+            store = TextStore(":memory:")
+            result = import_bundle(target, str(out), "destino", batch_size=8, text_store=store)
+            print(f"Importação: {result}")
+            assert result["count"] == 30
+            assert result["version"] == get_collection_version(target, "destino") == 4
+            assert len(store) == 30
+
+            for record in target.retrieve("destino", list(expected), with_payload=True, with_vectors=True):
+                original = expected[record.id]
+                assert record.payload == original.payload
+                assert np.allclose(record.vector["text-dense"], original.vector["text-dense"], atol=tolerance)
+                sparse = record.vector.get("text-sparse")
+                if "text-sparse" in original.vector:
+                    assert sparse.indices == original.vector["text-sparse"].indices
+                    assert sparse.values == original.vector["text-sparse"].values
+                else:
+                    assert sparse is None
+
+        assert (Path(tmp) / "float16" / DENSE_FILE).stat().st_size < (Path(tmp) / "float32" / DENSE_FILE).stat().st_size
+    print("\n✅ TESTE PASSOU")
+
+
+def test_corrupted_bundle():
+    """Testa a recusa de bundles alterados e de destinos já existentes."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Bundle corrompido")
+    print("=" * 60)
+
+    source = QdrantClient(":memory:")
+    make_source(source)
+    with tempfile.TemporaryDirectory() as tmp:
+        export_bundle(source, "origem", tmp)
+        verify_bundle(tmp)
+
+        try:
+            import_bundle(source, tmp, "origem")
+            raise AssertionError("Importação sobre coleção existente deveria falhar")
+        except ValueError as e:
+            print(f"\nDestino existente: {e}")
+
+        dense = Path(tmp) / DENSE_FILE
+        data = bytearray(dense.read_bytes())
+        data[-1] ^= 0xFF
+        dense.write_bytes(bytes(data))
+        try:
+            import_bundle(QdrantClient(":memory:"), tmp, "destino")
+            raise AssertionError("Bundle alterado deveria falhar")
+        except ValueError as e:
+            print(f"Checksum: {e}")
+            assert DENSE_FILE in str(e)
+    print("\n✅ TESTE PASSOU")
+
+
+def test_failed_import_restores_indexing():
+    """Testa a indexação religada quando a carga falha no meio."""
+    print("\n" + "=" * 60)
+    print("TESTE 4: Falha durante a importação")
+    print("=" * 60)
+
+    source = QdrantClient(":memory:")
+    make_source(source)
+    target = QdrantClient(":memory:")
+    thresholds = []
+    update_collection = target.update_collection
+    upsert = target.upsert
+
+    def recording_update_collection(collection_name, optimizers_config=None, **kwargs):
+        if optimizers_config is not None:
+            thresholds.append(optimizers_config.indexing_threshold)
+        return update_collection(collection_name, optimizers_config=optimizers_config, **kwargs)
+
+    def failing_upsert(*args, **kwargs):
+        if len(thresholds) == 1:
+            raise ConnectionError("Qdrant indisponível")
+        return upsert(*args, **kwargs)
+
+    target.update_collection = recording_update_collection
+    target.upsert = failing_upsert
+    with tempfile.TemporaryDirectory() as tmp:
+        export_bundle(source, "origem", tmp)
+        try:
+            import_bundle(target, tmp, "destino")
+            raise AssertionError("Falha no upsert deveria propagar")
+        except ConnectionError:
+            pass
+    print(f"\nindexing_threshold gravados: {thresholds}")
+    assert thresholds == [0, DEFAULT_INDEXING_THRESHOLD]
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO BUNDLE DE EXPORTAÇÃO/IMPORTAÇÃO")
+    print("=" * 60)
+
+    test_payload_columns()
+    test_round_trip()
+    test_corrupted_bundle()
+    test_failed_import_restores_indexing()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
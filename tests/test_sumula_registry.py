@@ -0,0 +1,163 @@
+"""
+Testes para o registro de súmulas (existência e status) usado na validação de citações.
+
+Usa o Qdrant em memória.
+"""
+
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient, models
+
+from app.guardrails.guards import ValidSumulaReference, ValidationPipeline, describe_reask_issues
+from app.guardrails.registry import SumulaRegistry, get_sumula_registry
+from app.ingest.extract_text import ensure_collection
+from app.ingest.versioning import bump_collection_version
+
+# (num_sumula, status_atual, data_status_ano)
+SUMULAS = [
+    ("070", "VIGENTE", "2010"),
+    ("85", "VIGENTE", "2008"),
+    ("85", "ALTERADA", "2014"),  # outro chunk/PDF, status mais recente
+    ("100", "REVOGADA", "2019"),
+    ("112", "VIGENTE", "2012"),
+]
+
+
+def build_collection(sumulas=SUMULAS):
+    """Cria a coleção em memória com um ponto (sem vetores) por chunk."""
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client), "teste")
+    add_points(client, sumulas)
+    return client
+
+
+def add_points(client, sumulas):
+    client.upsert(
+        "teste",
+        points=[
+            models.PointStruct(
+                id=str(uuid.uuid4()),
+                vector={},
+                payload={
+                    "page_content": f"Súmula {num}",
+                    "metadata": {"num_sumula": num, "status_atual": status, "data_status_ano": year},
+                },
+            )
+            for num, status, year in sumulas
+        ],
+    )
+
+
+def test_registry_loading():
+    """Testa a carga da coleção, o snapshot e a recarga após re-ingestão."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Carga do registro")
+    print("=" * 60)
+
+    client = build_collection()
+    bump_collection_version(client, "teste")
+    registry = SumulaRegistry.from_collection(client, "teste", batch_size=2)
+
+    print(f"\nSúmulas: {len(registry)} | Maior número: {registry.max_number}")
+    assert len(registry) == 4
+    assert registry.max_number == 112
+    assert registry.version == 1
+    assert registry.exists(70) and not registry.exists(71) and not registry.exists(500)
+    assert registry.status(85) == "ALTERADA", "Vale o status mais recente"
+    assert registry.is_revoked(100) and not registry.is_revoked(70)
+
+    # Número inválido (payload ou citação): não aloca uma tabela desse tamanho
+    bogus = SumulaRegistry([(70, "VIGENTE"), (99999999, "VIGENTE")])
+    assert len(bogus) == 1 and bogus.max_number == 70
+    assert not bogus.exists(99999999) and bogus.status(99999999) is None
+    assert len(bogus._table) == 71
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "registro.json"
+        registry.save(str(path))
+        loaded = SumulaRegistry.from_snapshot(str(path))
+    assert loaded.version == registry.version
+    assert [loaded.status(n) for n in range(120)] == [registry.status(n) for n in range(120)]
+
+    # Carregado uma vez; recarregado só quando a versão da coleção muda
+    cached = get_sumula_registry(client, "teste")
+    assert get_sumula_registry(client, "teste") is cached
+    add_points(client, [("150", "VIGENTE", "2020")])
+    assert get_sumula_registry(client, "teste") is cached
+    bump_collection_version(client, "teste", changed=["sumula_150.pdf"])
+    reloaded = get_sumula_registry(client, "teste")
+    assert reloaded is not cached and reloaded.exists(150)
+    print("\n✅ TESTE PASSOU")
+
+
+def test_validation_with_registry():
+    """Testa súmulas inexistentes e revogadas no ValidSumulaReference e no pipeline."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Validação com o registro")
+    print("=" * 60)
+
+    registry = SumulaRegistry([(70, "VIGENTE"), (100, "REVOGADA"), (112, "VIGENTE")])
+    validator = ValidSumulaReference(registry=registry)
+
+    result = validator.validate("Conforme a Súmula 70 e a Súmula 112.", {})
+    assert result.outcome == "pass"
+
+    result = validator.validate("Conforme a Súmula 71, o prazo é de 30 dias.", {})
+    print(f"\nInexistente: {result.error_message}")
+    assert result.outcome == "fail"
+    assert result.metadata["invalid_sumulas"] == ["71"]
+
+    result = validator.validate("Conforme a Súmula 100, o gestor deve ser responsabilizado.", {})
+    print(f"Revogada: {result.error_message}")
+    assert result.outcome == "fail"
+    assert result.metadata["revoked_sumulas"] == ["100"]
+
+    result = validator.validate("A Súmula 100 foi revogada em 2019.", {})
+    assert result.outcome == "pass", "Citar a revogação é legítimo"
+
+    result = validator.validate("Conforme a Súm. 100, revogada pela Súmula 112, o prazo mudou.", {})
+    assert result.outcome == "pass", "Menção na mesma frase da citação"
+
+    # A menção à revogação precisa estar na frase da súmula revogada
+    answer = "A Súmula 112 não foi revogada. Conforme a Súmula 100, o gestor deve ser responsabilizado."
+    result = validator.validate(answer, {})
+    print(f"Revogação mencionada em outra frase: {result.error_message}")
+    assert result.outcome == "fail"
+    assert result.metadata["unacknowledged_revoked"] == ["100"]
+
+    # O registro também é aceito por chamada, via pipeline (com o máximo do registro)
+    answer = (
+        "Conforme a Súmula 100, a falta de aplicação anual de recursos no ensino "
+        "poderá ensejar a responsabilização do gestor municipal."
+    )
+    pipeline_result = ValidationPipeline().validate(
+        answer, context_metadata={"retrieved_sumulas": ["100"]}, sumula_registry=registry
+    )
+    issues = describe_reask_issues(pipeline_result["validation_info"])
+    print(f"Problemas para o reask: {issues}")
+    assert pipeline_result["needs_reask"]
+    assert any("REVOGADAS" in issue and "100" in issue for issue in issues)
+
+    result = validator.validate("A Súmula 150 trata de licitações.", {})
+    assert result.metadata["out_of_range_sumulas"] == ["150"], "Acima do maior número registrado"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO REGISTRO DE SÚMULAS")
+    print("=" * 60)
+
+    test_registry_loading()
+    test_validation_with_registry()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
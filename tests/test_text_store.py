@@ -0,0 +1,190 @@
+"""
+Testes para o text store local e a busca projetada (sem textos no payload).
+
+Usa embeddings falsos e o Qdrant em memória.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient, models
+
+from app.ingest.extract_text import ensure_collection, upsert_chunks
+from app.ingest.text_store import ProjectedQdrantVectorStore, TextStore, sync_text_store, text_digest
+from app.ingest.versioning import get_collection_version
+
+DIM = 8
+PRECEDENTES = "Precedentes: Processo nº 12.345, Rel. Conselheiro, sessão de 17/12/87. " * 40
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_query(self, text):
+        return [1.0] + [0.0] * (DIM - 1)
+
+    def embed_documents(self, texts):
+        return [[1.0, float(i)] + [0.0] * (DIM - 2) for i, _ in enumerate(texts)]
+
+
+def make_chunks():
+    return [
+        {
+            "text": f"Súmula {n}. {PRECEDENTES}",
+            "metadata": {"pdf_name": f"Súmula {n:03d}-89.pdf", "num_sumula": str(n), "chunk_type": "precedentes", "chunk_index": 0},
+        }
+        for n in (70, 71, 72)
+    ]
+
+
+def test_text_store():
+    """Testa gravação, deduplicação por conteúdo e leitura após reabrir o arquivo."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Text store endereçado pelo conteúdo")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "textos.sqlite")
+        store = TextStore(path)
+        digests = store.put_many(["a", "b", "a"])
+        assert digests[0] == digests[2] == text_digest("a")
+        assert len(store) == 2, "Textos iguais gravados uma vez"
+        store.close()
+
+        store = TextStore(path)
+        assert store.get(text_digest("b")) == "b"
+        assert store.get_many([text_digest("a"), "inexistente"]) == {text_digest("a"): "a"}
+        assert "inexistente" not in store
+        store.close()
+
+    # Cache de textos de pontos sem hash: limitado, descarta os menos usados
+    store = TextStore(":memory:", point_cache_size=2)
+    store.put_point_texts("teste", {"1": "a", "2": "b"})
+    assert store.get_point_texts("teste", ["1"]) == {"1": "a"}
+    store.put_point_texts("teste", {"3": "c"})
+    assert store.get_point_texts("teste", ["1", "2", "3"]) == {"1": "a", "3": "c"}
+    assert store.get_point_texts("outra", ["1"]) == {}, "Chave inclui a coleção"
+    print("\n✅ TESTE PASSOU")
+
+
+def test_projected_search():
+    """Testa a busca só com metadata e os textos vindos do store."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Busca projetada")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    embedder = SimpleNamespace(client=client, dim=DIM)
+    ensure_collection(embedder, "teste")
+    store = TextStore(":memory:")
+    chunks = make_chunks()
+    upsert_chunks(embedder, "teste", chunks, FakeEmbeddings().embed_documents([c["text"] for c in chunks]), text_store=store)
+    assert len(store) == 3
+
+    payloads = {}
+    query_points = client.query_points
+
+    def recording_query_points(*args, **kwargs):
+        response = query_points(*args, **kwargs)
+        payloads[str(kwargs.get("with_payload"))] = sum(
+            len(json.dumps(p.payload, ensure_ascii=False).encode()) for p in response.points
+        )
+        return response
+
+    client.query_points = recording_query_points
+    vectorstore = ProjectedQdrantVectorStore(
+        client=client, collection_name="teste", embedding=FakeEmbeddings(), vector_name="text-dense", text_store=store
+    )
+    docs = vectorstore.similarity_search("súmula", k=3)
+    full = vectorstore.similarity_search("súmula", k=3, with_payload=True)
+
+    print(f"\nBytes de payload por busca: {payloads}")
+    assert [d.page_content for d in docs] == [d.page_content for d in full]
+    assert docs[0].metadata["text_sha256"] == text_digest(docs[0].page_content)
+    assert payloads["['metadata']"] * 5 < payloads["True"], "Resposta sem os textos"
+
+    # Texto ausente do store (ex.: ingerido em outra máquina): vem do Qdrant e é guardado
+    empty_store = TextStore(":memory:")
+    vectorstore.text_store = empty_store
+    docs = vectorstore.similarity_search("súmula", k=3)
+    assert all(d.page_content.startswith("Súmula") for d in docs)
+    assert len(empty_store) == 3
+    print("\n✅ TESTE PASSOU")
+
+
+def test_sync_legacy_collection():
+    """Testa o preenchimento do store e do hash a partir de pontos antigos."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Sincronização de uma coleção existente")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client, dim=DIM), "teste")
+    client.upsert(
+        "teste",
+        points=[
+            models.PointStruct(
+                id=i,
+                vector={"text-dense": [1.0, float(i)] + [0.0] * (DIM - 2)},
+                payload={"page_content": c["text"], "metadata": c["metadata"]},
+            )
+            for i, c in enumerate(make_chunks(), start=1)
+        ],
+    )
+
+    # Antes da sincronização: pontos sem hash, textos buscados no Qdrant uma única vez
+    store = TextStore(":memory:")
+    retrieved = []
+    retrieve = client.retrieve
+
+    def recording_retrieve(*args, **kwargs):
+        retrieved.append(kwargs.get("ids"))
+        return retrieve(*args, **kwargs)
+
+    client.retrieve = recording_retrieve
+
+    def search():
+        # Um vector store novo por consulta, como em `rag_graph.retrieve`
+        vectorstore = ProjectedQdrantVectorStore(
+            client=client, collection_name="teste", embedding=FakeEmbeddings(), vector_name="text-dense", text_store=store
+        )
+        return vectorstore.similarity_search("súmula", k=3)
+
+    first = search()
+    second = search()
+    client.retrieve = retrieve
+    print(f"\nBuscas de texto no Qdrant: {retrieved}")
+    assert len(retrieved) == 1, "Textos de pontos sem hash ficam em cache no store, pelo ID"
+    assert [d.page_content for d in first] == [d.page_content for d in second]
+    assert all(d.page_content.startswith("Súmula") for d in second)
+    assert len(store) == 0, "Nada gravado no store sob um hash que o ponto não tem"
+
+    result = sync_text_store(client, "teste", store, batch_size=2)
+    print(f"\nSincronização: {result}")
+    assert result["scanned"] == 3 and result["stored"] == 3 and result["updated"] == 3
+    assert result["version"] == get_collection_version(client, "teste") == 1
+
+    point = client.retrieve("teste", [1], with_payload=True)[0]
+    assert point.payload["metadata"]["text_sha256"] == text_digest(point.payload["page_content"])
+    assert point.payload["metadata"]["num_sumula"] == "70", "Demais campos preservados"
+    assert sync_text_store(client, "teste", store)["updated"] == 0, "Segunda execução não altera nada"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO TEXT STORE E DA BUSCA PROJETADA")
+    print("=" * 60)
+
+    test_text_store()
+    test_projected_search()
+    test_sync_legacy_collection()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
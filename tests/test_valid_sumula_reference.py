@@ -9,7 +9,9 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.guardrails.guards import ValidSumulaReference
+from langchain_core.documents import Document
+
+from app.guardrails.guards import HallucinationDetection, ValidSumulaReference, build_context_metadata
 
 
 def test_valid_sumulas_in_range():
@@ -95,12 +97,13 @@ def test_sumula_not_retrieved():
     print(f"\nResultado: {result.outcome}")
     print(f"Súmulas citadas: {result.metadata.get('cited_sumulas')}")
     print(f"Não recuperadas: {result.metadata.get('not_retrieved_sumulas')}")
-    print(f"Warning: {result.metadata.get('warning', 'None')}")
+    print(f"Erro: {result.error_message if result.outcome == 'fail' else 'None'}")
 
-    # Não é crítico, mas gera warning
-    assert result.outcome == "pass", "Deveria passar mas com warning"
+    # Conteúdo atribuído a uma súmula fora do contexto: pede regeneração
+    assert result.outcome == "fail", "Súmula 150 não foi recuperada"
     assert "150" in result.metadata.get('not_retrieved_sumulas', [])
-    print("\n✅ TESTE PASSOU - Warning gerado corretamente")
+    assert "150" in result.error_message
+    print("\n✅ TESTE PASSOU - Súmula não recuperada detectada")
 
 
 def test_invalid_sumula_number():
@@ -220,6 +223,30 @@ def test_with_valid_sumulas_list():
     print("\n✅ TESTE PASSOU - Súmula inexistente detectada")
 
 
+def test_leading_zeros():
+    """Testa números com zeros à esquerda na resposta e no payload."""
+    print("\n" + "=" * 60)
+    print("TESTE 8: Zeros à esquerda")
+    print("=" * 60)
+
+    docs = [Document(page_content="A Súmula 7 trata do assunto.", metadata={"num_sumula": "007"})]
+    metadata = build_context_metadata(docs)
+    print(f"Recuperadas: {metadata['retrieved_sumulas']}")
+    assert metadata["retrieved_sumulas"] == ["7"], "Número canônico, como no payload normalizado"
+
+    response = "Conforme a Súmula nº 07, a Súmula 7 trata do assunto."
+    metadata.update({"retrieved_sumulas": ["7"], "all_valid_sumulas": ["07"]})
+    result = ValidSumulaReference().validate(response, metadata)
+    print(f"ValidSumulaReference: {result.outcome} {result.metadata.get('not_retrieved_sumulas')}")
+    assert result.outcome == "pass"
+    assert result.metadata["not_retrieved_sumulas"] == []
+
+    result = HallucinationDetection().validate(response, metadata)
+    print(f"HallucinationDetection: {result.metadata.get('issues')}")
+    assert not any("não recuperadas" in issue for issue in result.metadata["issues"])
+    print("\n✅ TESTE PASSOU")
+
+
 def run_all_tests():
     """Executa todos os testes."""
     print("\n" + "=" * 60)
@@ -234,6 +261,7 @@ def run_all_tests():
         test_incorrect_citation_format()
         test_no_sumulas_cited()
         test_with_valid_sumulas_list()
+        test_leading_zeros()
 
         print("\n" + "=" * 60)
         print("✅ TODOS OS TESTES CONCLUÍDOS")
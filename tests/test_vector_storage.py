@@ -0,0 +1,118 @@
+"""
+Testes para as opções de quantização e armazenamento em disco da coleção.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest.extract_text import build_arg_parser, ensure_collection
+from app.ingest.storage import VectorStorageConfig
+from app.retrieval.retriever import SelfQueryConfig
+
+
+def test_collection_layout():
+    """Testa a criação da coleção com quantização e vetores/HNSW em disco."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Layout da coleção")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    embedder = SimpleNamespace(client=client)
+
+    ensure_collection(embedder, "padrao")
+    dense = client.get_collection("padrao").config.params.vectors["text-dense"]
+    assert dense.size == 3072 and dense.quantization_config is None and not dense.on_disk
+
+    args = build_arg_parser().parse_args(["--quantization", "scalar", "--on-disk-vectors", "--hnsw-on-disk"])
+    storage = VectorStorageConfig(
+        quantization=args.quantization, on_disk=args.on_disk_vectors, hnsw_on_disk=args.hnsw_on_disk
+    )
+    ensure_collection(embedder, "quantizada", storage)
+    dense = client.get_collection("quantizada").config.params.vectors["text-dense"]
+    print(f"\nVetor denso: {dense}")
+    assert isinstance(dense.quantization_config, models.ScalarQuantization)
+    assert dense.quantization_config.scalar.type == models.ScalarType.INT8
+    assert dense.on_disk and dense.hnsw_config.on_disk
+
+    assert storage.ram_bytes_per_vector(3072) == 3072, "Só o int8 fica em RAM"
+    assert VectorStorageConfig(quantization="binary").ram_bytes_per_vector(3072) == 3072 * 4 + 384
+
+    try:
+        VectorStorageConfig(quantization="pq")
+        assert False, "Quantização desconhecida deveria falhar"
+    except ValueError:
+        pass
+    print("\n✅ TESTE PASSOU")
+
+
+def test_search_params():
+    """Testa os parâmetros de busca (rescore/oversampling) do SelfQueryConfig."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Parâmetros de busca")
+    print("=" * 60)
+
+    assert SelfQueryConfig(k=5).search_kwargs() == {"k": 5}, "Padrão do Qdrant"
+
+    kwargs = SelfQueryConfig(k=5, oversampling=2.0).search_kwargs()
+    print(f"\nsearch_kwargs: {kwargs}")
+    quantization = kwargs["search_params"].quantization
+    assert quantization.rescore is True and quantization.oversampling == 2.0
+
+    params = SelfQueryConfig(rescore=False).search_params()
+    assert params.quantization.rescore is False
+    print("\n✅ TESTE PASSOU")
+
+
+def test_hnsw_params():
+    """Testa os parâmetros de construção do HNSW e hnsw_ef/exact na busca."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: Parâmetros do HNSW")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    embedder = SimpleNamespace(client=client, dim=4)
+    args = build_arg_parser().parse_args(["--hnsw-m", "32", "--ef-construct", "256", "--full-scan-threshold", "20000"])
+    storage = VectorStorageConfig(
+        hnsw_m=args.hnsw_m, ef_construct=args.ef_construct, full_scan_threshold=args.full_scan_threshold
+    )
+    print(f"\nLayout: {storage.describe()}")
+    ensure_collection(embedder, "hnsw", storage)
+    hnsw = client.get_collection("hnsw").config.params.vectors["text-dense"].hnsw_config
+    assert (hnsw.m, hnsw.ef_construct, hnsw.full_scan_threshold, hnsw.on_disk) == (32, 256, 20000, None)
+    assert VectorStorageConfig().hnsw_config() is None, "Sem opções: padrão da coleção"
+
+    try:
+        VectorStorageConfig(ef_construct=2)
+        assert False, "ef_construct < 4 deveria falhar"
+    except ValueError:
+        pass
+
+    kwargs = SelfQueryConfig(k=5, hnsw_ef=128).search_kwargs()
+    assert kwargs["search_params"].hnsw_ef == 128 and kwargs["search_params"].quantization is None
+    params = SelfQueryConfig(exact=True, oversampling=2.0).search_params()
+    assert params.exact is True and params.quantization.oversampling == 2.0
+
+    client.upsert("hnsw", points=[models.PointStruct(id=1, vector={"text-dense": [1.0, 0.0, 0.0, 0.0]})])
+    result = client.query_points("hnsw", query=[1.0, 0.0, 0.0, 0.0], using="text-dense", search_params=params)
+    assert [p.id for p in result.points] == [1]
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO ARMAZENAMENTO DOS VETORES")
+    print("=" * 60)
+
+    test_collection_layout()
+    test_search_params()
+    test_hnsw_params()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)
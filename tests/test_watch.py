@@ -0,0 +1,258 @@
+"""
+Testes para o modo watch (ingestão incremental da pasta de súmulas).
+
+Usa LLM/embeddings falsos e o Qdrant em memória, sem chamadas à OpenAI.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from qdrant_client import QdrantClient, models
+
+from app.ingest.extract_text import ensure_collection
+from app.ingest.journal import IngestJournal
+from app.ingest.versioning import bump_collection_version, get_collection_version
+from app.ingest.watch import SumulasWatcher, diff_snapshots, take_snapshot
+
+
+class FakeLLM:
+    def invoke(self, prompt):
+        pdf_name = prompt.split('"pdf_name": "', 1)[1].split('"', 1)[0]
+        data = {
+            "metadados": {"num_sumula": pdf_name[7:10], "pdf_name": pdf_name},
+            "chunks": {"conteudo_principal": f"Conteúdo de {pdf_name}"},
+        }
+        return SimpleNamespace(content=json.dumps(data))
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0] * 3072 for _ in texts]
+
+
+class FailingLLM(FakeLLM):
+    """Falha sempre na extração de um PDF, contando as tentativas."""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.attempts = 0
+
+    def invoke(self, prompt):
+        if self.failing in prompt:
+            self.attempts += 1
+            raise ValueError("JSON inválido")
+        return super().invoke(prompt)
+
+
+def count_pdf_points(client, pdf_name):
+    return client.count(
+        "teste",
+        count_filter=models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="metadata.pdf_name", match=models.MatchValue(value=pdf_name)
+                )
+            ]
+        ),
+    ).count
+
+
+def test_diff_snapshots():
+    """Testa a detecção de arquivos adicionados, alterados e removidos."""
+    print("\n" + "=" * 60)
+    print("TESTE 1: Diferença entre snapshots")
+    print("=" * 60)
+
+    old = {"a.pdf": (1, 10), "b.pdf": (1, 10), "c.pdf": (1, 10)}
+    new = {"a.pdf": (1, 10), "b.pdf": (2, 11), "d.pdf": (1, 10)}
+    added, changed, removed = diff_snapshots(old, new)
+    print(f"Adicionados: {added} | Alterados: {changed} | Removidos: {removed}")
+
+    assert (added, changed, removed) == (["d.pdf"], ["b.pdf"], ["c.pdf"])
+    print("\n✅ TESTE PASSOU")
+
+
+def test_incremental_sync():
+    """Testa a aplicação incremental das mudanças e a versão da coleção."""
+    print("\n" + "=" * 60)
+    print("TESTE 2: Sincronização incremental")
+    print("=" * 60)
+
+    embedder = SimpleNamespace(
+        llm=FakeLLM(), model=FakeEmbeddings(), client=QdrantClient(":memory:")
+    )
+    ensure_collection(embedder, "teste")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        pasta.mkdir()
+        for name in ["Súmula 070-89.pdf", "Súmula 071-89.pdf"]:
+            shutil.copy(project_root / "sumulas" / name, pasta / name)
+
+        journal = IngestJournal(str(Path(tmp) / "journal.jsonl"))
+        watcher = SumulasWatcher(str(pasta), embedder, "teste", journal, debounce=0)
+
+        assert watcher.sync() == 1, "Primeira sincronização gera a versão 1"
+        assert count_pdf_points(embedder.client, "Súmula 070-89.pdf") == 1
+        assert watcher.sync() is None, "Sem mudanças, a versão não muda"
+
+        # Altera um PDF e remove outro
+        with open(pasta / "Súmula 070-89.pdf", "ab") as f:
+            f.write(b"\n%% alterado\n")
+        (pasta / "Súmula 071-89.pdf").unlink()
+
+        version = watcher.sync()
+        print(f"Versão após alterações: {version}")
+
+        assert version == 2 == get_collection_version(embedder.client, "teste")
+        assert count_pdf_points(embedder.client, "Súmula 070-89.pdf") == 1
+        assert count_pdf_points(embedder.client, "Súmula 071-89.pdf") == 0
+        assert journal.known_files() == ["Súmula 070-89.pdf"]
+
+    print("\n✅ TESTE PASSOU")
+
+
+def test_failed_pdf_retried_with_backoff():
+    """Testa a nova tentativa de um PDF com falha (espera exponencial ou arquivo alterado)."""
+    print("\n" + "=" * 60)
+    print("TESTE 3: PDF com falha")
+    print("=" * 60)
+
+    llm = FailingLLM("Súmula 071-89.pdf")
+    embedder = SimpleNamespace(llm=llm, model=FakeEmbeddings(), client=QdrantClient(":memory:"))
+    ensure_collection(embedder, "teste")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        pasta.mkdir()
+        for name in ["Súmula 070-89.pdf", "Súmula 071-89.pdf"]:
+            shutil.copy(project_root / "sumulas" / name, pasta / name)
+
+        journal = IngestJournal(str(Path(tmp) / "journal.jsonl"))
+        watcher = SumulasWatcher(str(pasta), embedder, "teste", journal, debounce=0)
+        name = "Súmula 071-89.pdf"
+        assert watcher.sync() == 1
+        assert llm.attempts == 1
+        assert watcher.failed[name][0] == 1
+
+        # Antes do fim da espera: nada a refazer
+        assert take_snapshot(str(pasta)) == watcher.applied
+        assert not watcher.retry_due()
+        assert watcher.sync() is None and llm.attempts == 1
+
+        # Espera vencida (falha transitória): nova tentativa, com espera dobrada
+        watcher.failed[name] = (1, 0.0)
+        assert watcher.retry_due()
+        before = time.monotonic()
+        watcher.sync()
+        attempts, due = watcher.failed[name]
+        print(f"\nTentativas: {attempts}, próxima em {due - before:.0f}s")
+        assert llm.attempts == 2 and attempts == 2
+        assert due - before >= 2 * watcher.retry_delay
+
+        # Arquivo alterado: nova tentativa imediata
+        with open(pasta / "Súmula 071-89.pdf", "ab") as f:
+            f.write(b"\n%% corrigido\n")
+        llm.failing = "inexistente"
+        watcher.sync()
+        print(f"\nFalhas após a correção: {watcher.failed}")
+        assert watcher.failed == {}
+        assert count_pdf_points(embedder.client, "Súmula 071-89.pdf") == 1
+
+    print("\n✅ TESTE PASSOU")
+
+
+def test_failed_removal_retried():
+    """Testa que a remoção que falhou fica pendente e é refeita na próxima varredura."""
+    print("\n" + "=" * 60)
+    print("TESTE 4: Remoção com falha")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    embedder = SimpleNamespace(llm=FakeLLM(), model=FakeEmbeddings(), client=client)
+    ensure_collection(embedder, "teste")
+    delete = client.delete
+    failures = [ConnectionError("timeout do Qdrant")]
+
+    def flaky_delete(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return delete(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "sumulas"
+        pasta.mkdir()
+        for name in ["Súmula 070-89.pdf", "Súmula 071-89.pdf"]:
+            shutil.copy(project_root / "sumulas" / name, pasta / name)
+
+        journal = IngestJournal(str(Path(tmp) / "journal.jsonl"))
+        watcher = SumulasWatcher(str(pasta), embedder, "teste", journal, debounce=0)
+        watcher.sync()
+
+        client.delete = flaky_delete
+        (pasta / "Súmula 071-89.pdf").unlink()
+        assert watcher.sync() is None
+        print(f"\nRemoções pendentes: {watcher.pending_removals}")
+        assert watcher.pending_removals == {"Súmula 071-89.pdf"}
+        assert count_pdf_points(client, "Súmula 071-89.pdf") == 1
+
+        # Pasta sem mudanças, mas com remoção pendente: o loop do watch sincroniza
+        assert take_snapshot(str(pasta)) == watcher.applied and watcher.retry_due()
+        assert watcher.sync() == 2
+        assert watcher.pending_removals == set()
+        assert count_pdf_points(client, "Súmula 071-89.pdf") == 0
+        assert journal.known_files() == ["Súmula 070-89.pdf"]
+
+    print("\n✅ TESTE PASSOU")
+
+
+def test_version_on_transient_error():
+    """Testa que um erro transitório do Qdrant não zera a versão da coleção."""
+    print("\n" + "=" * 60)
+    print("TESTE 5: Versão da coleção com erro transitório")
+    print("=" * 60)
+
+    client = QdrantClient(":memory:")
+    ensure_collection(SimpleNamespace(client=client, dim=4), "teste")
+    assert get_collection_version(client, "inexistente") == 0
+    for _ in range(3):
+        bump_collection_version(client, "teste")
+
+    retrieve = client.retrieve
+
+    def failing_retrieve(*args, **kwargs):
+        raise ConnectionError("timeout do Qdrant")
+
+    client.retrieve = failing_retrieve
+    try:
+        bump_collection_version(client, "teste", changed=["Súmula 070-89.pdf"])
+        raise AssertionError("Erro de conexão deveria propagar")
+    except ConnectionError as e:
+        print(f"\nErro propagado: {e}")
+    client.retrieve = retrieve
+    assert get_collection_version(client, "teste") == 3, "Manifesto preservado"
+    print("\n✅ TESTE PASSOU")
+
+
+if __name__ == "__main__":
+    print("\n🧪 TESTES DO MODO WATCH")
+    print("=" * 60)
+
+    test_diff_snapshots()
+    test_incremental_sync()
+    test_failed_pdf_retried_with_backoff()
+    test_failed_removal_retried()
+    test_version_on_transient_error()
+
+    print("\n" + "=" * 60)
+    print("✅ TESTES CONCLUÍDOS")
+    print("=" * 60)